@@ -0,0 +1,133 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.services.inventory_service import InventoryService
+from app.services.tenant_service import TenantService
+from app.services.snowflake_service import SnowflakeService
+from app.services.warehouse_warmer import WarehouseWarmer
+from app.core.container import (
+    get_inventory_service,
+    get_snowflake_service,
+    get_tenant_service,
+    get_warehouse_warmer,
+)
+from app.core.telemetry import telemetry
+from app.core.admission import admission
+from app.core.profiler import ProfileStore
+from app.core.config import settings
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+profile_store = ProfileStore(settings.profile_dir, settings.profile_max_files)
+
+logger = logging.getLogger(__name__)
+
+
+# Sync routes: the inventory reads block on Snowflake, so they run in the
+# worker threadpool instead of on the event loop
+@router.get("/inventory")
+def get_inventory(
+    include_tables: bool = False,
+    inventory_service: InventoryService = Depends(get_inventory_service),
+):
+    """
+    Row counts, bytes and last-altered times for all tenant schemas.
+    Read from Snowflake metadata only, so no table is scanned.
+    """
+    try:
+        tables = inventory_service.list_tables()
+    except Exception as e:
+        logger.exception("Error reading inventory")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    response = {
+        "schemas": inventory_service.summarize(tables),
+        "table_count": len(tables),
+        "row_count": sum(table["row_count"] for table in tables),
+        "bytes": sum(table["bytes"] for table in tables),
+    }
+    if include_tables:
+        response["tables"] = tables
+    return response
+
+
+@router.get("/inventory/{tenant_id}")
+def get_tenant_inventory(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    inventory_service: InventoryService = Depends(get_inventory_service),
+):
+    """Inventory and data freshness for one tenant's schemas."""
+    tenant = tenant_service.get_tenant_by_id(tenant_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+
+    try:
+        return inventory_service.get_tenant_inventory(tenant_id)
+    except Exception as e:
+        logger.exception("Error reading inventory")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/query-stats")
+async def get_query_stats(top: int = 20):
+    """
+    Snowflake usage per route and per tenant: client-side connect, execute
+    and fetch times, rows, and (once joined with QUERY_HISTORY) bytes
+    scanned, warehouse time and estimated credits. Also lists the most
+    expensive recent queries.
+    """
+    return telemetry.snapshot(top=top)
+
+
+@router.get("/workload-stats")
+async def get_workload_stats(
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
+    """
+    Per workload class: its warehouse, statement timeout and session pool,
+    and the queue and execution times Snowflake reported for its queries.
+    """
+    return {
+        "routing": snowflake_service.router.stats(),
+        "queue": telemetry.workload_snapshot(),
+    }
+
+
+@router.get("/admission-stats")
+async def get_admission_stats():
+    """Metric-route admission slots and queues, overall and per tenant."""
+    return admission.stats()
+
+
+@router.get("/warmup-stats")
+async def get_warmup_stats(
+    warehouse_warmer: WarehouseWarmer = Depends(get_warehouse_warmer),
+):
+    """
+    What keeping Snowflake warm costs and buys: warehouse resumes issued
+    ahead of traffic with their estimated credits, prewarmed sessions opened
+    and used, and session pool hits and misses.
+    """
+    return {"enabled": settings.warmup_enabled, **warehouse_warmer.stats()}
+
+
+@router.get("/profiles")
+async def list_profiles(route: str = None, tenant_id: str = None):
+    """Stored slow-request profiles, newest first."""
+    profiles = profile_store.list()
+    if route:
+        profiles = [profile for profile in profiles if profile["route"] == route]
+    if tenant_id:
+        profiles = [
+            profile for profile in profiles if profile["tenant_id"] == tenant_id
+        ]
+    return {"profiles": profiles}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """Collapsed stacks of one profile, for flamegraph.pl or speedscope."""
+    path = profile_store.folded_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
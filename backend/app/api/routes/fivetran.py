@@ -1,19 +1,28 @@
-from fastapi import APIRouter, HTTPException
-import traceback
+import logging
+from fastapi import APIRouter, Depends, HTTPException
 import secrets
 from app.services.fivetran_service import FivetranService
 from app.services.tenant_service import TenantService
 from app.services.snowflake_service import SnowflakeService
+from app.core.container import (
+    get_tenant_service,
+    get_snowflake_service,
+    get_fivetran_service,
+)
 from app.core.config import settings
 
 router = APIRouter(prefix="/fivetran", tags=["fivetran"])
-fivetran_service = FivetranService()
-tenant_service = TenantService()
-snowflake_service = SnowflakeService()
+
+logger = logging.getLogger(__name__)
 
 
 @router.post("/setup/{tenant_id}")
-async def setup_fivetran_for_tenant(tenant_id: str):
+async def setup_fivetran_for_tenant(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+    fivetran_service: FivetranService = Depends(get_fivetran_service),
+):
     """
     Creates Fivetran group, destination, and Fortnox connector for tenant.
     Returns Connect Card URI for user to complete OAuth.
@@ -30,38 +39,32 @@ async def setup_fivetran_for_tenant(tenant_id: str):
 
     try:
         # Create Snowflake role FIRST
-        print(f"Creating Snowflake role for tenant {tenant_id}")
         role_name = snowflake_service.create_tenant_role(tenant_id)
-        print(f"Snowflake role created: {role_name}")
 
         # Create entitlement entry
         snowflake_service.create_entitlement_entry(tenant_id, role_name)
-        print("Entitlement entry created")
 
-        print(f"Setting up Fivetran for tenant {tenant_id}")
+        logger.info("Setting up Fivetran for tenant %s", tenant_id)
 
         # Check if group already exists
         if tenant.get("fivetran_group_id"):
             group_id = tenant["fivetran_group_id"]
-            print(f"Using existing group: {group_id}")
+            logger.info("Using existing group %s", group_id)
         else:
             # Create Fivetran group (one per tenant)
-            print(f"Creating new group for tenant {tenant_id}")
             group = await fivetran_service.create_group(
                 tenant_id=tenant_id, company_name=tenant["company_name"]
             )
             group_id = group["id"]
-            print(f"Group created: {group_id}")
+            logger.info("Group created: %s", group_id)
 
         # Create Snowflake destination for this group
-        print(f"Creating destination for group {group_id}")
         destination = await fivetran_service.create_snowflake_destination(
             group_id=group_id, tenant_id=tenant_id
         )
-        print(f"Destination created: {destination['id']}")
+        logger.info("Destination created: %s", destination["id"])
 
         # Create Fortnox connector with Connect Card
-        print(f"Creating connector for group {group_id}")
         connector = await fivetran_service.create_fortnox_connector(
             group_id=group_id, tenant_id=tenant_id
         )
@@ -69,22 +72,21 @@ async def setup_fivetran_for_tenant(tenant_id: str):
         connector_id = connector["id"]
         connect_card_uri = connector["connect_card"]["uri"]
 
-        print(f"Connector created successfully: {connector_id}")
+        logger.info("Connector created: %s", connector_id)
 
         # Create webhook for sync notifications
         webhook_secret = secrets.token_urlsafe(32)
         webhook_url = f"{settings.frontend_url.replace('3000', '8000')}/api/webhooks/fivetran/sync-status"
 
-        print(f"Creating webhook for group {group_id}")
-        print(f"Webhook URL: {webhook_url}")
-
         webhook = await fivetran_service.create_group_webhook(
             group_id=group_id, webhook_url=webhook_url, secret=webhook_secret
         )
-        print(f"Webhook created: {webhook['id']}")
+        logger.info("Webhook created: %s", webhook["id"])
     except Exception as webhook_error:
-        print(f"WARNING: Webhook creation failed: {webhook_error}")
-        print("Continuing without webhook - sync status updates will not be automatic")
+        logger.warning(
+            "Webhook creation failed, sync status updates will not be automatic: %s",
+            webhook_error,
+        )
 
         # Store Fivetran IDs in tenant record
         tenant_service.update_fivetran_ids(tenant_id, group_id, connector_id)
@@ -101,15 +103,16 @@ async def setup_fivetran_for_tenant(tenant_id: str):
         }
 
     except Exception as e:
-        print("=" * 80)
-        print("FIVETRAN SETUP ERROR:")
-        print(traceback.format_exc())
-        print("=" * 80)
+        logger.exception("Fivetran setup failed for tenant %s", tenant_id)
         raise HTTPException(status_code=500, detail=f"Fivetran setup failed: {str(e)}")
 
 
 @router.get("/status/{tenant_id}")
-async def get_tenant_connector_status(tenant_id: str):
+async def get_tenant_connector_status(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    fivetran_service: FivetranService = Depends(get_fivetran_service),
+):
     """
     Get sync status for tenant's Fortnox connector.
     """
@@ -122,9 +125,8 @@ async def get_tenant_connector_status(tenant_id: str):
         raise HTTPException(status_code=404, detail="No connector found for tenant")
 
     try:
-        print(f"Fetching status for connector: {connector_id}")
         status = await fivetran_service.get_connector_status(connector_id)
-        print(f"Status response: {status}")
+        logger.debug("Status for connector %s: %s", connector_id, status)
 
         return {
             "connector_id": connector_id,
@@ -135,5 +137,5 @@ async def get_tenant_connector_status(tenant_id: str):
             "failed_at": status.get("failed_at"),
         }
     except Exception as e:
-        print(f"Error fetching status: {str(e)}")
+        logger.warning("Error fetching status for %s: %s", connector_id, e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Request, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 import json
 from app.services.tenant_service import TenantService
+from app.services.snowflake_service import SnowflakeService
+from app.core.container import get_tenant_service, get_snowflake_service
 
 router = APIRouter(tags=["fivetran_webhooks"])
-tenant_service = TenantService()
+
+logger = logging.getLogger(__name__)
 
 
 @router.post("/webhooks/fivetran/sync-status")
-async def fivetran_sync_webhook(request: Request):
+async def fivetran_sync_webhook(
+    request: Request,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
     """
     Receives Fivetran sync status webhooks.
     Marks tenant data_ready when historical sync completes.
@@ -27,26 +36,32 @@ async def fivetran_sync_webhook(request: Request):
     is_historical_sync = data.get("status", {}).get("is_historical_sync")
     succeeded_at = data.get("succeeded_at")
 
-    print("=" * 80)
-    print(f"Fivetran webhook received:")
-    print(f"Event: {event_type}")
-    print(f"Connector: {connector_id}")
-    print(f"Sync state: {sync_state}")
-    print(f"Historical sync: {is_historical_sync}")
-    print(f"Succeeded at: {succeeded_at}")
-    print("=" * 80)
+    logger.info(
+        "Fivetran webhook %s for connector %s",
+        event_type,
+        connector_id,
+        extra={
+            "sync_state": sync_state,
+            "is_historical_sync": is_historical_sync,
+            "succeeded_at": succeeded_at,
+        },
+    )
 
     # Find tenant by connector_id
     tenant = tenant_service.get_tenant_by_connector_id(connector_id)
 
     if not tenant:
-        print(f"No tenant found for connector {connector_id}")
+        logger.info("No tenant found for connector %s", connector_id)
         return {"message": "Connector not associated with tenant", "status": "ignored"}
 
     # Mark data ready when historical sync completes successfully
     if event_type == "sync_end" and succeeded_at and is_historical_sync == True:
-        print(f"✓ Historical sync complete for tenant {tenant['tenant_id']}")
-        tenant_service.mark_data_ready(tenant["tenant_id"])
+        logger.info("Historical sync complete for tenant %s", tenant["tenant_id"])
+
+        # Blocking Snowflake DDL; off the event loop
+        await run_in_threadpool(
+            finish_historical_sync, tenant, tenant_service, snowflake_service
+        )
 
         return {
             "message": "Tenant data marked ready",
@@ -60,3 +75,15 @@ async def fivetran_sync_webhook(request: Request):
         "connector_id": connector_id,
         "status": "acknowledged",
     }
+
+
+def finish_historical_sync(
+    tenant: dict, tenant_service: TenantService, snowflake_service: SnowflakeService
+):
+    # The tenant's schemas exist now, add them to the shared secure views
+    try:
+        snowflake_service.refresh_secure_views()
+    except Exception as e:
+        logger.warning("Secure view refresh failed: %s", e)
+
+    tenant_service.mark_data_ready(tenant["tenant_id"])
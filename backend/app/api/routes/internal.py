@@ -0,0 +1,30 @@
+from typing import Optional
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.instrumentation import recent_traces, render_metrics
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request and upstream call metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/traces")
+async def get_traces(
+    route: Optional[str] = None, slowest: bool = False, limit: int = 50
+):
+    """
+    Recently completed requests with the upstream calls they made, newest
+    first, or slowest first with `slowest=true`. Filter by route template.
+    """
+    traces = [trace for trace in recent_traces if not route or trace["route"] == route]
+    if slowest:
+        traces.sort(key=lambda trace: trace["duration_ms"], reverse=True)
+    else:
+        traces.reverse()
+    return {"traces": traces[:limit]}
@@ -1,122 +1,125 @@
-from fastapi import APIRouter, HTTPException
-from app.services.snowflake_service import SnowflakeService
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.services.snowflake_service import SnowflakeService, is_missing_object
 from app.services.tenant_service import TenantService
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import serialization
-import snowflake.connector
-from datetime import datetime, timedelta
-
-router = APIRouter(prefix="/metrics", tags=["metrics"])
-tenant_service = TenantService()
-snowflake_service = SnowflakeService()
-
+from app.services.inventory_service import InventoryService
+from app.services.query_registry import fetch_shared, months_ago
+from app.core.admission import admit_query
+from app.core.container import (
+    get_inventory_service,
+    get_snowflake_service,
+    get_tenant_service,
+)
+
+# Every route queries the warehouse, so each waits for an admission slot
+router = APIRouter(
+    prefix="/metrics", tags=["metrics"], dependencies=[Depends(admit_query)]
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds a client should wait when a secure view has not been created yet
+VIEW_MISSING_RETRY_AFTER = 60
+
+
+def query_tenant(
+    tenant_id: str,
+    tenant_service: TenantService,
+    snowflake_service: SnowflakeService,
+    name: str,
+    **values,
+) -> list:
+    """
+    Rows of a registered query run as the tenant's role. Concurrent identical
+    queries for the same tenant share one execution (see fetch_shared).
 
-def get_tenant_connection(tenant_id: str):
-    """Get Snowflake connection as tenant role."""
+    A secure view only exists once some tenant has synced its source table
+    (see SnowflakeService.refresh_secure_views); until then this is a 503.
+    """
     tenant = tenant_service.get_tenant_by_id(tenant_id)
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
 
-    with open(snowflake_service.private_key_path, "rb") as key_file:
-        p_key = serialization.load_pem_private_key(
-            key_file.read(), password=None, backend=default_backend()
+    role = tenant["snowflake_role"]
+    try:
+        return fetch_shared(
+            lambda: snowflake_service.get_tenant_connection(role), role, name, **values
+        )
+    except Exception as e:
+        if not is_missing_object(e):
+            raise
+        logger.warning("View for %s is missing: %s", name, e)
+        raise HTTPException(
+            status_code=503,
+            detail="Data is not available yet, retry shortly",
+            headers={"Retry-After": str(VIEW_MISSING_RETRY_AFTER)},
         )
-
-    pkb = p_key.private_bytes(
-        encoding=serialization.Encoding.DER,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption(),
-    )
-
-    return snowflake.connector.connect(
-        user=snowflake_service.user,
-        account=snowflake_service.account,
-        private_key=pkb,
-        role=tenant["snowflake_role"],
-        warehouse=snowflake_service.warehouse,
-        database=snowflake_service.database,
-    )
 
 
 @router.get("/{tenant_id}/cash-position")
-async def get_cash_position(tenant_id: str):
+def get_cash_position(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
     """Get total cash across all bank accounts."""
-    conn = get_tenant_connection(tenant_id)
-    cursor = conn.cursor()
-
-    try:
-        tenant_short_id = tenant_id.replace("-", "_")[:8].upper()
-
-        cursor.execute(f"""
-            SELECT 
-                SUM(balance_amount) as total_balance,
-                balance_currency,
-                COUNT(*) as account_count
-            FROM ARCIMS_PROD.TINK_{tenant_short_id}.ACCOUNTS
-            GROUP BY balance_currency
-        """)
-
-        results = cursor.fetchall()
+    results = query_tenant(
+        tenant_id, tenant_service, snowflake_service, "cash_position"
+    )
 
-        if not results:
-            return {"total": 0, "currency": "SEK", "accounts": 0}
+    if not results:
+        return {"total": 0, "currency": "SEK", "accounts": 0}
 
-        return {
-            "total": float(results[0][0]) if results[0][0] else 0,
-            "currency": results[0][1],
-            "accounts": results[0][2],
-        }
-    finally:
-        cursor.close()
-        conn.close()
+    return {
+        "total": float(results[0][0]) if results[0][0] else 0,
+        "currency": results[0][1],
+        "accounts": results[0][2],
+    }
 
 
 @router.get("/{tenant_id}/burn-rate")
-async def get_burn_rate(tenant_id: str):
+def get_burn_rate(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
     """Calculate average monthly burn rate (last 3 months)."""
-    conn = get_tenant_connection(tenant_id)
-    cursor = conn.cursor()
-
-    try:
-        tenant_short_id = tenant_id.replace("-", "_")[:8].upper()
-
-        # Get last 3 months of spending
-        cursor.execute(f"""
-            SELECT 
-                DATE_TRUNC('month', booked_date) as month,
-                SUM(ABS(amount)) as monthly_spend
-            FROM ARCIMS_PROD.TINK_{tenant_short_id}.TRANSACTIONS
-            WHERE amount < 0
-              AND booked_date >= DATEADD(month, -3, CURRENT_DATE())
-            GROUP BY month
-            ORDER BY month DESC
-        """)
-
-        results = cursor.fetchall()
+    # Get last 3 months of spending from the connector's daily summary
+    results = query_tenant(
+        tenant_id,
+        tenant_service,
+        snowflake_service,
+        "monthly_spend",
+        since=months_ago(3),
+    )
 
-        if not results:
-            return {"monthly_average": 0, "currency": "SEK", "months_calculated": 0}
+    if not results:
+        return {"monthly_average": 0, "currency": "SEK", "months_calculated": 0}
 
-        total_spend = sum(row[1] for row in results)
-        avg_monthly = total_spend / len(results)
+    total_spend = sum(row[1] for row in results)
+    avg_monthly = total_spend / len(results)
 
-        return {
-            "monthly_average": float(avg_monthly),
-            "currency": "SEK",
-            "months_calculated": len(results),
-        }
-    finally:
-        cursor.close()
-        conn.close()
+    return {
+        "monthly_average": float(avg_monthly),
+        "currency": "SEK",
+        "months_calculated": len(results),
+    }
 
 
 @router.get("/{tenant_id}/runway")
-async def get_runway(tenant_id: str):
+def get_runway(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
     """Calculate runway in months (cash / burn rate)."""
-    # Get cash position
-    cash = await get_cash_position(tenant_id)
-    burn = await get_burn_rate(tenant_id)
+    cash = get_cash_position(tenant_id, tenant_service, snowflake_service)
+    burn = get_burn_rate(tenant_id, tenant_service, snowflake_service)
+    return runway_from(cash, burn)
+
 
+def runway_from(cash: dict, burn: dict) -> dict:
+    """Runway from cash-position and burn-rate results."""
     if burn["monthly_average"] == 0:
         return {"months": None, "message": "No spending data available"}
 
@@ -131,167 +134,135 @@ async def get_runway(tenant_id: str):
 
 
 @router.get("/{tenant_id}/recent-transactions")
-async def get_recent_transactions(tenant_id: str, limit: int = 10):
+def get_recent_transactions(
+    tenant_id: str,
+    limit: int = Query(10, ge=1, le=500),
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
     """Get most recent transactions."""
-    conn = get_tenant_connection(tenant_id)
-    cursor = conn.cursor()
+    results = query_tenant(
+        tenant_id, tenant_service, snowflake_service, "recent_transactions", limit=limit
+    )
 
-    try:
-        tenant_short_id = tenant_id.replace("-", "_")[:8].upper()
-
-        cursor.execute(f"""
-            SELECT 
-                booked_date,
-                description,
-                amount,
-                currency,
-                merchant_name,
-                status
-            FROM ARCIMS_PROD.TINK_{tenant_short_id}.TRANSACTIONS
-            ORDER BY booked_date DESC
-            LIMIT {limit}
-        """)
-
-        results = cursor.fetchall()
-
-        transactions = []
-        for row in results:
-            transactions.append(
-                {
-                    "date": row[0].isoformat() if row[0] else None,
-                    "description": row[1],
-                    "amount": float(row[2]) if row[2] else 0,
-                    "currency": row[3],
-                    "merchant": row[4],
-                    "status": row[5],
-                }
-            )
-
-        return {"transactions": transactions, "count": len(transactions)}
-    finally:
-        cursor.close()
-        conn.close()
+    transactions = []
+    for row in results:
+        transactions.append(
+            {
+                "date": row[0].isoformat() if row[0] else None,
+                "description": row[1],
+                "amount": float(row[2]) if row[2] else 0,
+                "currency": row[3],
+                "merchant": row[4],
+                "status": row[5],
+            }
+        )
+
+    return {"transactions": transactions, "count": len(transactions)}
 
 
 @router.get("/{tenant_id}/revenue-growth")
-async def get_revenue_growth(tenant_id: str):
+def get_revenue_growth(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
     """Calculate revenue growth (MoM and YoY)."""
-    conn = get_tenant_connection(tenant_id)
-    cursor = conn.cursor()
+    # Get monthly revenue (positive transactions) from the daily summary
+    results = query_tenant(
+        tenant_id, tenant_service, snowflake_service, "monthly_revenue", months=12
+    )
 
-    try:
-        tenant_short_id = tenant_id.replace("-", "_")[:8].upper()
-
-        # Get monthly revenue (positive transactions)
-        cursor.execute(f"""
-            SELECT 
-                DATE_TRUNC('month', booked_date) as month,
-                SUM(amount) as monthly_revenue
-            FROM ARCIMS_PROD.TINK_{tenant_short_id}.TRANSACTIONS
-            WHERE amount > 0
-            GROUP BY month
-            ORDER BY month DESC
-            LIMIT 12
-        """)
-
-        results = cursor.fetchall()
-
-        if len(results) < 2:
-            return {
-                "mom_growth": None,
-                "yoy_growth": None,
-                "message": "Insufficient data for growth calculation",
-            }
+    if len(results) < 2:
+        return {
+            "mom_growth": None,
+            "yoy_growth": None,
+            "message": "Insufficient data for growth calculation",
+        }
 
-        # Month over month
-        current_month = float(results[0][1]) if results[0][1] else 0
-        prev_month = float(results[1][1]) if results[1][1] else 0
+    # Month over month
+    current_month = float(results[0][1]) if results[0][1] else 0
+    prev_month = float(results[1][1]) if results[1][1] else 0
 
-        mom_growth = (
-            ((current_month - prev_month) / prev_month * 100) if prev_month else None
-        )
+    mom_growth = (
+        ((current_month - prev_month) / prev_month * 100) if prev_month else None
+    )
 
-        # Year over year (if 12 months available)
-        yoy_growth = None
-        if len(results) >= 12:
-            year_ago = float(results[11][1]) if results[11][1] else 0
-            yoy_growth = (
-                ((current_month - year_ago) / year_ago * 100) if year_ago else None
-            )
+    # Year over year (if 12 months available)
+    yoy_growth = None
+    if len(results) >= 12:
+        year_ago = float(results[11][1]) if results[11][1] else 0
+        yoy_growth = ((current_month - year_ago) / year_ago * 100) if year_ago else None
 
-        return {
-            "mom_growth": round(mom_growth, 2) if mom_growth else None,
-            "yoy_growth": round(yoy_growth, 2) if yoy_growth else None,
-            "current_month_revenue": current_month,
-            "currency": "SEK",
-        }
-    finally:
-        cursor.close()
-        conn.close()
+    return {
+        "mom_growth": round(mom_growth, 2) if mom_growth else None,
+        "yoy_growth": round(yoy_growth, 2) if yoy_growth else None,
+        "current_month_revenue": current_month,
+        "currency": "SEK",
+    }
 
 
 @router.get("/{tenant_id}/gross-margin")
-async def get_gross_margin(tenant_id: str):
+def get_gross_margin(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+):
     """
     Calculate gross margin using Fortnox account data.
     Gross Margin = (Revenue - COGS) / Revenue
     """
-    conn = get_tenant_connection(tenant_id)
-    cursor = conn.cursor()
+    # This is simplified - in production you'd need proper account mapping
+    # Revenue accounts typically 3000-3999 in Swedish BAS
+    # COGS accounts typically 4000-6999
 
-    try:
-        tenant_short_id = tenant_id.replace("-", "_")[:8].upper()
-
-        # This is simplified - in production you'd need proper account mapping
-        # Revenue accounts typically 3000-3999 in Swedish BAS
-        # COGS accounts typically 4000-6999
-
-        cursor.execute(f"""
-            SELECT 
-                CASE 
-                    WHEN NUMBER BETWEEN 3000 AND 3999 THEN 'revenue'
-                    WHEN NUMBER BETWEEN 4000 AND 6999 THEN 'cogs'
-                END as account_type,
-                COUNT(*) as account_count
-            FROM ARCIMS_PROD.FORTNOX_{tenant_short_id}.ACCOUNT
-            WHERE NUMBER BETWEEN 3000 AND 6999
-            GROUP BY account_type
-        """)
-
-        results = cursor.fetchall()
-
-        revenue_accounts = 0
-        cogs_accounts = 0
-
-        for row in results:
-            if row[0] == "revenue":
-                revenue_accounts = row[1]
-            elif row[0] == "cogs":
-                cogs_accounts = row[1]
+    results = query_tenant(
+        tenant_id, tenant_service, snowflake_service, "fortnox_account_structure"
+    )
 
-        return {
-            "revenue_accounts": revenue_accounts,
-            "cogs_accounts": cogs_accounts,
-            "message": "Gross margin calculation requires transaction data. Currently showing account structure.",
-            "note": "Connect to Fortnox vouchers for actual margin calculation",
-        }
-    finally:
-        cursor.close()
-        conn.close()
+    revenue_accounts = 0
+    cogs_accounts = 0
+
+    for row in results:
+        if row[0] == "revenue":
+            revenue_accounts = row[1]
+        elif row[0] == "cogs":
+            cogs_accounts = row[1]
+
+    return {
+        "revenue_accounts": revenue_accounts,
+        "cogs_accounts": cogs_accounts,
+        "message": "Gross margin calculation requires transaction data. Currently showing account structure.",
+        "note": "Connect to Fortnox vouchers for actual margin calculation",
+    }
 
 
 @router.get("/{tenant_id}/dashboard-summary")
-async def get_dashboard_summary(tenant_id: str):
+def get_dashboard_summary(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    snowflake_service: SnowflakeService = Depends(get_snowflake_service),
+    inventory_service: InventoryService = Depends(get_inventory_service),
+):
     """Get all key metrics in one call."""
-    cash = await get_cash_position(tenant_id)
-    burn = await get_burn_rate(tenant_id)
-    runway = await get_runway(tenant_id)
-    growth = await get_revenue_growth(tenant_id)
+    cash = get_cash_position(tenant_id, tenant_service, snowflake_service)
+    burn = get_burn_rate(tenant_id, tenant_service, snowflake_service)
+    # Reuses the cash and burn results instead of querying them again
+    runway = runway_from(cash, burn)
+    growth = get_revenue_growth(tenant_id, tenant_service, snowflake_service)
+
+    # When a sync last changed the tenant's data, from table metadata; None
+    # when unknown rather than claiming the data is fresh
+    try:
+        last_updated = inventory_service.last_altered(tenant_id)
+    except Exception as e:
+        logger.warning("Could not read data freshness: %s", e)
+        last_updated = None
 
     return {
         "cash_position": cash,
         "burn_rate": burn,
         "runway": runway,
         "revenue_growth": growth,
-        "last_updated": datetime.utcnow().isoformat(),
+        "last_updated": last_updated,
     }
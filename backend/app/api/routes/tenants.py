@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header
 from typing import Optional
 from app.models.tenant import TenantCreate, TenantResponse
 from app.services.tenant_service import TenantService
+from app.core.container import get_tenant_service
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
-tenant_service = TenantService()
 
 
 @router.post("/", response_model=TenantResponse)
-async def create_tenant(tenant_data: TenantCreate):
+async def create_tenant(
+    tenant_data: TenantCreate,
+    tenant_service: TenantService = Depends(get_tenant_service),
+):
     """
     Creates new tenant record.
     Called from Next.js after Clerk sign-up webhook.
@@ -33,7 +36,9 @@ async def create_tenant(tenant_data: TenantCreate):
 
 
 @router.get("/{clerk_user_id}", response_model=TenantResponse)
-async def get_tenant(clerk_user_id: str):
+async def get_tenant(
+    clerk_user_id: str, tenant_service: TenantService = Depends(get_tenant_service)
+):
     """
     Retrieves tenant by Clerk user ID.
     Used by frontend to check onboarding state.
@@ -47,7 +52,11 @@ async def get_tenant(clerk_user_id: str):
 
 
 @router.patch("/{tenant_id}/company", response_model=TenantResponse)  # Added this
-async def update_company_name(tenant_id: str, company_name: str):
+async def update_company_name(
+    tenant_id: str,
+    company_name: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+):
     """
     Updates company name during onboarding.
     Called from onboarding form in Next.js.
@@ -61,7 +70,11 @@ async def update_company_name(tenant_id: str, company_name: str):
 
 
 @router.patch("/{tenant_id}/state", response_model=TenantResponse)
-async def update_tenant_state(tenant_id: str, state: str):
+async def update_tenant_state(
+    tenant_id: str,
+    state: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+):
     """
     Updates tenant onboarding state.
     States: pending -> connecting -> syncing -> ready
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException
 import httpx
 from app.services.tink_service import TinkService
 from app.services.tenant_service import TenantService
+from app.core.container import get_tenant_service, get_tink_service
 from app.core.config import settings
 
 router = APIRouter(prefix="/tink", tags=["tink"])
-tink_service = TinkService()
-tenant_service = TenantService()
+
+logger = logging.getLogger(__name__)
 
 
 @router.post("/setup/{tenant_id}")
-async def setup_tink_for_tenant(tenant_id: str):
+async def setup_tink_for_tenant(
+    tenant_id: str,
+    tenant_service: TenantService = Depends(get_tenant_service),
+    tink_service: TinkService = Depends(get_tink_service),
+):
     """
     Step 1: Create Tink user and generate Link URL.
     Returns URL for user to connect their bank.
@@ -25,17 +31,17 @@ async def setup_tink_for_tenant(tenant_id: str):
 
         # Create Tink user if doesn't exist
         if not tink_user_id:
-            print(f"Creating Tink user for tenant {tenant_id}")
+            logger.info("Creating Tink user for tenant %s", tenant_id)
             tink_user = await tink_service.create_tink_user(
                 external_user_id=tenant_id, market="SE"
             )
 
             if not tink_user:
-                print("User creation failed, might already exist")
+                logger.info("Tink user creation failed, might already exist")
                 # User already exists in Tink, continue anyway
             else:
                 tink_user_id = tink_user["user_id"]
-                print(f"Tink user created: {tink_user_id}")
+                logger.info("Tink user created: %s", tink_user_id)
 
                 # Save tink_user_id to tenant (optional - we use tenant_id as external_user_id)
                 conn = tenant_service._get_connection()
@@ -48,10 +54,9 @@ async def setup_tink_for_tenant(tenant_id: str):
                 cursor.close()
                 conn.close()
         else:
-            print(f"Using existing Tink user: {tink_user_id}")
+            logger.info("Using existing Tink user: %s", tink_user_id)
 
         # Generate authorization code using tenant_id as external_user_id
-        print("Generating authorization code")
         auth_code = await tink_service.generate_authorization_code(
             external_user_id=tenant_id, id_hint=tenant["email"]
         )
@@ -59,8 +64,6 @@ async def setup_tink_for_tenant(tenant_id: str):
         if not auth_code:
             raise HTTPException(status_code=500, detail="Failed to generate auth code")
 
-        print(f"Authorization code generated successfully")
-
         # Build Tink Link URL
         redirect_uri = f"{settings.frontend_url}/onboarding/tink-complete"
         tink_link_url = tink_service.build_tink_link_url(
@@ -73,7 +76,7 @@ async def setup_tink_for_tenant(tenant_id: str):
         }
 
     except Exception as e:
-        print(f"Error setting up Tink: {e}")
+        logger.exception("Error setting up Tink for tenant %s", tenant_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -83,7 +86,9 @@ async def tink_callback(credentials_id: str, state: str = None):
     Step 2: Handle callback after user connects bank via Tink Link.
     Tink redirects here with credentials_id.
     """
-    print(f"Tink callback received: credentials_id={credentials_id}, state={state}")
+    logger.info(
+        "Tink callback received: credentials_id=%s, state=%s", credentials_id, state
+    )
 
     # credentials_id confirms successful bank connection
     # State can be used to identify the tenant if needed
@@ -96,7 +101,9 @@ async def tink_callback(credentials_id: str, state: str = None):
 
 
 @router.post("/activate/{tenant_id}")
-async def activate_tink_connector(tenant_id: str):
+async def activate_tink_connector(
+    tenant_id: str, tenant_service: TenantService = Depends(get_tenant_service)
+):
     """
     Step 3: Switch Tink connector from MOCK to real mode.
     Called after user completes bank connection.
@@ -110,12 +117,14 @@ async def activate_tink_connector(tenant_id: str):
         raise HTTPException(status_code=404, detail="No Tink connector found")
 
     try:
-        print(f"Activating Tink connector {connector_id} for tenant {tenant_id}")
+        logger.info(
+            "Activating Tink connector %s for tenant %s", connector_id, tenant_id
+        )
 
         # Update connector configuration using PATCH /connectors/{id}
         async with httpx.AsyncClient() as client:
             response = await client.patch(
-                f"https://api.fivetran.com/v1/connectors/{connector_id}",
+                f"{settings.fivetran_api_url}/connectors/{connector_id}",
                 headers={
                     "Authorization": f"Basic {settings.fivetran_auth_token}",
                     "Content-Type": "application/json",
@@ -128,8 +137,9 @@ async def activate_tink_connector(tenant_id: str):
                 },
             )
 
-            print(f"Update config response: {response.status_code}")
-            print(f"Update config body: {response.text}")
+            logger.debug(
+                "Update config response %s: %s", response.status_code, response.text
+            )
 
             if response.status_code != 200:
                 raise HTTPException(
@@ -138,16 +148,16 @@ async def activate_tink_connector(tenant_id: str):
                 )
 
             # Trigger immediate sync
-            print(f"Triggering sync for connector {connector_id}")
+            logger.info("Triggering sync for connector %s", connector_id)
             sync_response = await client.post(
-                f"https://api.fivetran.com/v1/connectors/{connector_id}/sync",
+                f"{settings.fivetran_api_url}/connectors/{connector_id}/sync",
                 headers={
                     "Authorization": f"Basic {settings.fivetran_auth_token}",
                     "Content-Type": "application/json",
                 },
             )
 
-            print(f"Sync trigger response: {sync_response.status_code}")
+            logger.info("Sync trigger response: %s", sync_response.status_code)
 
             return {
                 "status": "activated",
@@ -156,12 +166,14 @@ async def activate_tink_connector(tenant_id: str):
             }
 
     except Exception as e:
-        print(f"Error activating connector: {e}")
+        logger.exception("Error activating connector %s", connector_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/status/{tenant_id}")
-async def get_tink_status(tenant_id: str):
+async def get_tink_status(
+    tenant_id: str, tenant_service: TenantService = Depends(get_tenant_service)
+):
     """
     Get Tink connector sync status for tenant.
     """
@@ -176,7 +188,7 @@ async def get_tink_status(tenant_id: str):
     try:
         async with httpx.AsyncClient() as client:
             response = await client.get(
-                f"https://api.fivetran.com/v1/connectors/{connector_id}",
+                f"{settings.fivetran_api_url}/connectors/{connector_id}",
                 headers={
                     "Authorization": f"Basic {settings.fivetran_auth_token}",
                     "Accept": "application/json;version=2",
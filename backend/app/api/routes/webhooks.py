@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from typing import Optional
 import json
 from app.services.tenant_service import TenantService
+from app.core.container import get_tenant_service
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
-tenant_service = TenantService()
 
 
 @router.post("/clerk")
@@ -13,6 +13,7 @@ async def clerk_webhook(
     svix_id: Optional[str] = Header(None),
     svix_timestamp: Optional[str] = Header(None),
     svix_signature: Optional[str] = Header(None),
+    tenant_service: TenantService = Depends(get_tenant_service),
 ):
     """
     Receives Clerk webhook events.
@@ -0,0 +1,189 @@
+"""
+Admission control for warehouse queries.
+
+Metric routes run behind the admit_query dependency: a request needs a slot
+before its handler (and its Snowflake queries) runs. Slots are limited in
+total (admission_global_limit) and per tenant (admission_tenant_limit), so
+one tenant or one busy dashboard tab cannot take the whole warehouse and
+session pool.
+
+Requests over a limit wait in a per-tenant queue. A freed slot goes to the
+next tenant, in round-robin order, that is under its own limit, so a tenant
+with a deep queue does not hold up the others. Waiting is bounded:
+- 429 when the tenant already has admission_tenant_queue requests waiting
+- 503 when admission_queue_limit requests are waiting in total, or after
+  admission_max_wait_seconds without a slot
+Both responses carry Retry-After.
+
+The controller is driven from the event loop only; the route handlers
+themselves run in the worker threadpool.
+"""
+
+import asyncio
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.instrumentation import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTIONS,
+    ADMISSION_WAIT,
+)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        global_limit: int,
+        tenant_limit: int,
+        tenant_queue: int,
+        queue_limit: int,
+        max_wait_seconds: float,
+        retry_after_seconds: int = 1,
+    ):
+        self.global_limit = global_limit
+        self.tenant_limit = tenant_limit
+        self.tenant_queue = tenant_queue
+        self.queue_limit = queue_limit
+        self.max_wait_seconds = max_wait_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        self.tenant_in_flight = Counter()
+        # tenant -> waiting futures; iteration order is the round-robin order
+        self.waiters = OrderedDict()
+        self.waiting = 0
+        self.rejections = Counter()
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str):
+        await self.acquire(tenant_id)
+        try:
+            yield
+        finally:
+            self.release(tenant_id)
+
+    async def acquire(self, tenant_id: str):
+        started = time.perf_counter()
+        if self._can_run(tenant_id) and tenant_id not in self.waiters:
+            self._grant(tenant_id)
+            ADMISSION_WAIT.observe(0.0)
+            return
+
+        queue = self.waiters.get(tenant_id, ())
+        if len(queue) >= self.tenant_queue:
+            self._reject(429, "tenant_queue_full")
+        if self.waiting >= self.queue_limit:
+            self._reject(503, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(tenant_id, deque()).append(future)
+        self._set_waiting(self.waiting + 1)
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait_seconds)
+        except asyncio.CancelledError:
+            # Client went away while waiting
+            if not self._withdraw(tenant_id, future):
+                self.release(tenant_id)
+            raise
+
+        if not future.done():
+            self._withdraw(tenant_id, future)
+            self._reject(503, "timeout")
+        ADMISSION_WAIT.observe(time.perf_counter() - started)
+
+    def release(self, tenant_id: str):
+        self.in_flight -= 1
+        self.tenant_in_flight[tenant_id] -= 1
+        if self.tenant_in_flight[tenant_id] <= 0:
+            del self.tenant_in_flight[tenant_id]
+        ADMISSION_IN_FLIGHT.dec()
+        self._dispatch()
+
+    def _can_run(self, tenant_id: str) -> bool:
+        return (
+            self.in_flight < self.global_limit
+            and self.tenant_in_flight[tenant_id] < self.tenant_limit
+        )
+
+    def _grant(self, tenant_id: str):
+        self.in_flight += 1
+        self.tenant_in_flight[tenant_id] += 1
+        ADMISSION_IN_FLIGHT.inc()
+
+    def _dispatch(self):
+        """Hand free slots to waiting tenants, round-robin."""
+        while self.waiting and self.in_flight < self.global_limit:
+            for tenant_id in list(self.waiters):
+                if self.tenant_in_flight[tenant_id] < self.tenant_limit:
+                    break
+            else:
+                # Everyone waiting is at their tenant limit
+                return
+            queue = self.waiters[tenant_id]
+            future = queue.popleft()
+            if queue:
+                self.waiters.move_to_end(tenant_id)
+            else:
+                del self.waiters[tenant_id]
+            self._set_waiting(self.waiting - 1)
+            self._grant(tenant_id)
+            future.set_result(True)
+
+    def _withdraw(self, tenant_id: str, future) -> bool:
+        """Remove a waiter that was not granted. False if it already holds a slot."""
+        if future.done():
+            return False
+        future.cancel()
+        queue = self.waiters.get(tenant_id)
+        if queue is not None:
+            queue.remove(future)
+            if not queue:
+                del self.waiters[tenant_id]
+        self._set_waiting(self.waiting - 1)
+        return True
+
+    def _set_waiting(self, waiting: int):
+        self.waiting = waiting
+        ADMISSION_QUEUE_DEPTH.set(waiting)
+
+    def _reject(self, status_code: int, reason: str):
+        self.rejections[reason] += 1
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        raise HTTPException(
+            status_code=status_code,
+            detail="Too many concurrent requests, retry shortly",
+            headers={"Retry-After": str(self.retry_after_seconds)},
+        )
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "global_limit": self.global_limit,
+            "tenant_limit": self.tenant_limit,
+            "rejections": dict(self.rejections),
+            "tenants": {
+                tenant_id: {
+                    "in_flight": self.tenant_in_flight[tenant_id],
+                    "waiting": len(self.waiters.get(tenant_id, ())),
+                }
+                for tenant_id in set(self.tenant_in_flight) | set(self.waiters)
+            },
+        }
+
+
+admission = AdmissionController(
+    global_limit=settings.admission_global_limit,
+    tenant_limit=settings.admission_tenant_limit,
+    tenant_queue=settings.admission_tenant_queue,
+    queue_limit=settings.admission_queue_limit,
+    max_wait_seconds=settings.admission_max_wait_seconds,
+)
+
+
+async def admit_query(tenant_id: str):
+    """FastAPI dependency: hold a slot for `tenant_id` while the route runs."""
+    async with admission.slot(tenant_id):
+        yield
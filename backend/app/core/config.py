@@ -23,9 +23,50 @@ class Settings(BaseSettings):
     snowflake_admin_private_key_path: str = (
         "/Users/jakobwennberg/arcims/arcim_admin_rsa_key.p8"
     )
+    # How secure views restrict rows to a tenant: "join" or "row_access_policy"
+    snowflake_tenant_filter: str = "join"
+    # Create or update the secure views when the API starts
+    secure_views_refresh_on_startup: bool = True
+    # Seconds between checks of the key files for rotation (see app.core.credentials)
+    key_check_interval_seconds: float = 30
+    # Workload classes (see app.services.workload_router); an empty
+    # warehouse means snowflake_warehouse
+    snowflake_interactive_warehouse: str = ""
+    snowflake_interactive_timeout_seconds: int = 30
+    # Idle sessions kept per tenant role
+    snowflake_interactive_pool_max_idle: int = 4
+    snowflake_heavy_warehouse: str = ""
+    snowflake_heavy_timeout_seconds: int = 3600
+    snowflake_heavy_pool_max_idle: int = 2
+    snowflake_admin_warehouse: str = ""
+    snowflake_admin_timeout_seconds: int = 600
+    snowflake_admin_pool_max_idle: int = 4
+    # Pooled sessions idle for longer than this are closed
+    snowflake_pool_idle_seconds: float = 1800
+
+    # Admission control for metric routes (see app.core.admission). The
+    # global limit should stay below the worker threadpool size (40)
+    admission_global_limit: int = 32
+    admission_tenant_limit: int = 4
+    # Requests allowed to wait, per tenant and in total
+    admission_tenant_queue: int = 32
+    admission_queue_limit: int = 256
+    admission_max_wait_seconds: float = 5
+
+    # Warm-up and keep-warm (see app.services.warehouse_warmer)
+    warmup_enabled: bool = False
+    warmup_interval_seconds: float = 60
+    # How far ahead expected traffic is warmed for
+    warmup_lead_minutes: float = 10
+    # Expected requests in an hour for a tenant to be kept warm
+    warmup_min_arrivals: float = 2.0
+    warmup_max_roles: int = 20
+    # Where the learned arrival pattern is kept across restarts ("" disables)
+    warmup_state_path: str = "/tmp/arcims-arrivals.json"
 
     # Fivetran
     fivetran_auth_token: str
+    fivetran_api_url: str = "https://api.fivetran.com/v1"
 
     # Fortnox
     fortnox_client_id: str
@@ -35,10 +76,33 @@ class Settings(BaseSettings):
     # Tink
     tink_client_id: str
     tink_client_secret: str
+    tink_api_url: str = "https://api.tink.com/api/v1"
 
     # Frontend
     frontend_url: str = "http://localhost:3000"
 
+    # How long a tenant's data freshness (dashboard last_updated) is cached
+    freshness_cache_seconds: float = 120
+
+    # Seconds between QUERY_HISTORY joins for query telemetry (0 disables)
+    query_history_interval_seconds: float = 60
+
+    # Logging (see app.core.logs)
+    log_level: str = "INFO"
+    # Per-module overrides, e.g. "app.services.tink_service=DEBUG"
+    log_levels: str = ""
+    # Fraction of DEBUG/INFO records kept
+    log_sample_rate: float = 1.0
+
+    # Slow-request profiler (see app.core.profiler)
+    profiler_enabled: bool = False
+    profile_threshold_ms: float = 1000
+    # Fraction of requests profiled regardless of latency
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: float = 5
+    profile_dir: str = "/tmp/arcims-profiles"
+    profile_max_files: int = 200
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,106 @@
+"""
+Shared service instances for the API.
+
+One Container per app (app.state.container). Each service is built on first
+use and then shared by every route, so a worker holds one of each and
+startup does not construct (or import the drivers of) services it has not
+needed yet. Routes receive services through FastAPI dependencies:
+
+    async def route(tenant_service: TenantService = Depends(get_tenant_service)):
+"""
+
+import threading
+from fastapi import Request
+from app.services.tenant_service import TenantService
+from app.services.snowflake_service import SnowflakeService
+from app.services.fivetran_service import FivetranService
+from app.services.tink_service import TinkService
+from app.services.inventory_service import InventoryService
+from app.services.warehouse_warmer import WarehouseWarmer
+from app.core.config import settings
+
+
+class Container:
+    def __init__(self):
+        # Reentrant: a factory may resolve the services it depends on
+        self.lock = threading.RLock()
+        self.instances = {}
+
+    def resolve(self, name: str, factory):
+        instance = self.instances.get(name)
+        if instance is None:
+            with self.lock:
+                instance = self.instances.get(name)
+                if instance is None:
+                    instance = self.instances[name] = factory()
+        return instance
+
+    @property
+    def tenant_service(self) -> TenantService:
+        return self.resolve("tenant_service", TenantService)
+
+    @property
+    def snowflake_service(self) -> SnowflakeService:
+        return self.resolve("snowflake_service", SnowflakeService)
+
+    @property
+    def fivetran_service(self) -> FivetranService:
+        return self.resolve("fivetran_service", FivetranService)
+
+    @property
+    def tink_service(self) -> TinkService:
+        return self.resolve("tink_service", TinkService)
+
+    @property
+    def inventory_service(self) -> InventoryService:
+        return self.resolve(
+            "inventory_service", lambda: InventoryService(self.snowflake_service)
+        )
+
+    @property
+    def warehouse_warmer(self) -> WarehouseWarmer:
+        return self.resolve(
+            "warehouse_warmer",
+            lambda: WarehouseWarmer(
+                self.snowflake_service,
+                interval_seconds=settings.warmup_interval_seconds,
+                lead_minutes=settings.warmup_lead_minutes,
+                min_arrivals=settings.warmup_min_arrivals,
+                max_roles=settings.warmup_max_roles,
+                state_path=settings.warmup_state_path,
+            ),
+        )
+
+    def close(self):
+        """Close pooled Snowflake sessions, if the service was ever built."""
+        snowflake_service = self.instances.get("snowflake_service")
+        if snowflake_service is not None:
+            snowflake_service.close()
+
+
+def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+def get_tenant_service(request: Request) -> TenantService:
+    return get_container(request).tenant_service
+
+
+def get_snowflake_service(request: Request) -> SnowflakeService:
+    return get_container(request).snowflake_service
+
+
+def get_fivetran_service(request: Request) -> FivetranService:
+    return get_container(request).fivetran_service
+
+
+def get_tink_service(request: Request) -> TinkService:
+    return get_container(request).tink_service
+
+
+def get_inventory_service(request: Request) -> InventoryService:
+    return get_container(request).inventory_service
+
+
+def get_warehouse_warmer(request: Request) -> WarehouseWarmer:
+    return get_container(request).warehouse_warmer
@@ -0,0 +1,125 @@
+"""
+Private keys for Snowflake key-pair auth, loaded once per process.
+
+Each key file is read and parsed on first use and kept both as PEM text
+(what the Fivetran destination config takes) and as DER-encoded PKCS8 bytes
+(what snowflake.connector.connect takes). Connections then reuse the parsed
+key instead of re-parsing the PEM on every connect.
+
+Rotation: at most every key_check_interval_seconds, a lookup stats the file.
+When its mtime, size or inode changed, the new key is parsed in full and
+only then swapped in. A file that fails to parse (e.g. caught mid-write)
+keeps the previous key and is retried on the next check.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PrivateKey:
+    path: str
+    pem: str
+    der: bytes
+    # (mtime_ns, size, inode) of the file the key was loaded from
+    signature: tuple
+
+
+def file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def load_private_key(path: str) -> PrivateKey:
+    """Read and parse an unencrypted PEM private key."""
+    # Imported on first load, not at app startup
+    from cryptography.hazmat.primitives import serialization
+
+    signature = file_signature(path)
+    with open(path, "rb") as key_file:
+        pem = key_file.read()
+    key = serialization.load_pem_private_key(pem, password=None)
+    der = key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    return PrivateKey(path=path, pem=pem.decode(), der=der, signature=signature)
+
+
+class CredentialProvider:
+    def __init__(self, check_interval_seconds: float):
+        self.check_interval = check_interval_seconds
+        self.lock = threading.Lock()
+        self.keys = {}
+        self.checked_at = {}
+        self.reloads = 0
+
+    def private_key(self, path: str) -> PrivateKey:
+        key = self.keys.get(path)
+        if key is not None and not self._check_due(path):
+            return key
+        with self.lock:
+            key = self.keys.get(path)
+            if key is None:
+                key = self.keys[path] = load_private_key(path)
+                self.checked_at[path] = time.monotonic()
+                logger.info("Loaded private key %s", path)
+            elif self._check_due(path):
+                key = self._reload_if_changed(key)
+        return key
+
+    def private_key_der(self, path: str) -> bytes:
+        """DER (PKCS8) bytes for snowflake.connector.connect(private_key=...)."""
+        return self.private_key(path).der
+
+    def private_key_pem(self, path: str) -> str:
+        return self.private_key(path).pem
+
+    def preload(self, paths: list):
+        """Load keys ahead of the first connection; missing files are skipped."""
+        for path in paths:
+            try:
+                self.private_key(path)
+            except Exception as e:
+                logger.warning("Could not preload private key %s: %s", path, e)
+
+    def _check_due(self, path: str) -> bool:
+        checked_at = self.checked_at.get(path, 0)
+        return time.monotonic() - checked_at >= self.check_interval
+
+    def _reload_if_changed(self, key: PrivateKey) -> PrivateKey:
+        # Called with the lock held
+        self.checked_at[key.path] = time.monotonic()
+        try:
+            if file_signature(key.path) == key.signature:
+                return key
+            new_key = load_private_key(key.path)
+        except Exception as e:
+            logger.warning(
+                "Keeping current private key %s, reload failed: %s", key.path, e
+            )
+            return key
+        self.keys[key.path] = new_key
+        self.reloads += 1
+        logger.info("Reloaded rotated private key %s", key.path)
+        return new_key
+
+    def invalidate(self, path: str = None):
+        """Drop cached keys so the next lookup reads the file again."""
+        with self.lock:
+            if path is None:
+                self.keys.clear()
+                self.checked_at.clear()
+            else:
+                self.keys.pop(path, None)
+                self.checked_at.pop(path, None)
+
+
+credentials = CredentialProvider(settings.key_check_interval_seconds)
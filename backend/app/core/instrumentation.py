@@ -0,0 +1,298 @@
+"""
+Prometheus-style metrics and per-request spans.
+
+Metrics are kept in process and rendered in the Prometheus text format at
+GET /internal/metrics:
+- http_request_duration_seconds: per-route latency histogram
+- http_requests_in_flight: per-route gauge
+- http_request_errors_total: per-route 5xx / unhandled exception counter
+- upstream_call_duration_seconds / upstream_call_errors_total: every call
+  to Snowflake, Postgres, Fivetran and Tink
+- admission_*: slots, queue depth, waits and rejections of the metric
+  routes' admission control (app.core.admission)
+- singleflight_calls_total: executed vs shared calls (app.core.singleflight)
+
+Upstream calls are also recorded as spans on the current request's trace
+(kept in a contextvar), so a slow request can be broken down into the calls
+it made. Recent traces are served at GET /internal/traces.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Completed request traces kept for /internal/traces
+MAX_TRACES = 200
+
+current_trace = ContextVar("current_trace", default=None)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple, extra: dict = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = (
+            (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines += self._render_value(key, value)
+        return lines
+
+    def _render_value(self, key: tuple, value) -> list:
+        return [f"{self.name}{self._labels(key)} {value}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # Per-bucket counts, then +Inf count and sum
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def _render_value(self, key: tuple, counts: list) -> list:
+        lines = [
+            f"{self.name}_bucket{self._labels(key, {'le': bound})} {count}"
+            for bound, count in zip(self.buckets, counts)
+        ]
+        lines.append(
+            f"{self.name}_bucket{self._labels(key, {'le': '+Inf'})} {counts[-2]}"
+        )
+        lines.append(f"{self.name}_count{self._labels(key)} {counts[-2]}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {counts[-1]}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    ("route", "method", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being handled by route", ("route",)
+)
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total",
+    "Requests that failed with a 5xx or an unhandled exception",
+    ("route", "method", "status"),
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_call_duration_seconds",
+    "Latency of calls to upstream dependencies",
+    ("dependency", "operation"),
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_call_errors_total",
+    "Failed calls to upstream dependencies",
+    ("dependency", "operation"),
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Metric requests holding an admission slot"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Metric requests waiting for an admission slot"
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds", "Time admitted requests waited for a slot"
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Requests rejected by admission control (429/503)",
+    ("reason",),
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Calls that executed, or shared an identical in-flight call",
+    ("group", "outcome"),
+)
+
+REGISTRY = [
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    REQUEST_ERRORS,
+    UPSTREAM_DURATION,
+    UPSTREAM_ERRORS,
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_WAIT,
+    ADMISSION_REJECTIONS,
+    SINGLEFLIGHT_CALLS,
+]
+
+recent_traces = deque(maxlen=MAX_TRACES)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+class Trace:
+    """Spans recorded while handling one request."""
+
+    def __init__(self, route: str, method: str, request_id: str = None):
+        self.route = route
+        self.method = method
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans = []
+        self.depth = 0
+
+    def as_dict(self, duration: float, status: int) -> dict:
+        return {
+            "route": self.route,
+            "method": self.method,
+            "request_id": self.request_id,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+        }
+
+
+def start_trace(route: str, method: str, request_id: str = None):
+    return current_trace.set(Trace(route, method, request_id))
+
+
+def finish_trace(token, duration: float, status: int):
+    trace = current_trace.get()
+    current_trace.reset(token)
+    if trace is not None:
+        recent_traces.append(trace.as_dict(duration, status))
+
+
+@contextmanager
+def span(dependency: str, operation: str):
+    """
+    Time an upstream call: records the upstream histogram (and error counter)
+    and a span on the current request's trace, if any.
+    """
+    trace = current_trace.get()
+    started = time.perf_counter()
+    if trace is not None:
+        trace.depth += 1
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        UPSTREAM_DURATION.observe(duration, dependency=dependency, operation=operation)
+        if failed:
+            UPSTREAM_ERRORS.inc(dependency=dependency, operation=operation)
+        if trace is not None:
+            trace.depth -= 1
+            trace.spans.append(
+                {
+                    "dependency": dependency,
+                    "operation": operation,
+                    "start_ms": round((started - trace.started) * 1000, 2),
+                    "duration_ms": round(duration * 1000, 2),
+                    "depth": trace.depth,
+                    "error": failed,
+                }
+            )
+
+
+def traced(dependency: str):
+    """Decorator recording a span named after the function, sync or async."""
+
+    def decorator(func):
+        operation = func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(dependency, operation):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(dependency, operation):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,170 @@
+"""
+Structured logging.
+
+Modules log through the standard library (`logging.getLogger(__name__)`)
+with lazy %-style arguments, so disabled levels cost one level check. Records
+that pass the level check are put on an in-memory queue as-is; a listener
+thread does the formatting, redaction and writing to stdout, so the event
+loop never blocks on I/O.
+
+Configured from settings:
+- log_level: root level for app loggers
+- log_levels: per-module overrides, e.g.
+  "app.services.tink_service=DEBUG,app.api.routes.fivetran=WARNING"
+- log_sample_rate: fraction of DEBUG/INFO records kept (WARNING and above
+  are never sampled)
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from app.core.telemetry import request_context
+
+# Bounded so a stalled stdout cannot grow memory; records are dropped when full
+LOG_QUEUE_SIZE = 10000
+
+REDACTED = "[REDACTED]"
+SECRET_KEYS = (
+    r"[a-z_]*token|[a-z_]*secret|password|private_key|authorization|code|api_key"
+)
+# `extra=` and context fields whose whole value is a secret
+SECRET_FIELD = re.compile(rf"^(?:{SECRET_KEYS})$", re.I)
+REDACT_PATTERNS = [
+    # PEM private keys
+    (
+        re.compile(
+            r"-----BEGIN [A-Z ]*PRIVATE KEY-----.*?-----END [A-Z ]*PRIVATE KEY-----",
+            re.S,
+        ),
+        REDACTED,
+    ),
+    (re.compile(r"(Bearer\s+)[A-Za-z0-9\-._~+/=]+", re.I), rf"\1{REDACTED}"),
+    # "key": "value" and key=value for secret-looking keys
+    (
+        re.compile(
+            rf"""(["']?\b(?:{SECRET_KEYS})\b["']?\s*[:=]\s*["']?)[^"'\s,&}}]+""",
+            re.I,
+        ),
+        rf"\1{REDACTED}",
+    ),
+]
+
+# LogRecord attributes; anything else on a record came from `extra=`
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in REDACT_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def redact_field(key: str, value):
+    """Redact an `extra=` or context value, including inside dicts and lists."""
+    if isinstance(value, str):
+        return REDACTED if SECRET_FIELD.match(key) else redact(value)
+    if isinstance(value, dict):
+        return {k: redact_field(str(k), v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_field(key, v) for v in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    # Anything else would be written with str()
+    return redact_field(key, str(value))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request context and `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+        }
+        for key, value in getattr(record, "context", {}).items():
+            entry[key] = redact_field(key, value)
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and key != "context":
+                entry[key] = redact_field(key, value)
+        if record.exc_info:
+            entry["exc"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records without formatting them. The request context is copied
+    here because the listener thread cannot see the caller's contextvars.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.context = {
+            key: value for key, value in request_context.get().items() if value
+        }
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def parse_levels(spec: str) -> dict:
+    """ "module=LEVEL,module=LEVEL" -> {module: LEVEL}"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: str = "INFO", levels: str = "", sample_rate: float = 1):
+    """Install the queue handler on the root logger and start the listener."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+
+    handler = DeferredQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    if sample_rate < 1:
+        handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(handler.queue, stream)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
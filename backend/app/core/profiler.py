@@ -0,0 +1,228 @@
+"""
+Sampling profiler for slow requests.
+
+Opt-in (settings.profiler_enabled); when disabled the middleware is not
+installed at all. While a request is in flight, a background thread samples
+the stacks of the event loop and of busy worker threads every
+profile_interval_ms. When the request finishes, its samples are kept if it
+took longer than profile_threshold_ms (or for a random profile_sample_rate
+of requests) and written, off the event loop, to profile_dir as:
+- <id>.folded: collapsed stacks ("frame;frame;frame count"), the input of
+  flamegraph.pl and speedscope
+- <id>.json: route, tenant, request id, status and duration
+
+The directory is a ring of at most profile_max_files profiles. Samples are
+process-wide, so requests that overlap share each other's stacks; the
+metadata records how many requests were in flight.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from app.core.telemetry import request_context
+
+PROFILE_ID = re.compile(r"^[0-9TZ]+_[0-9a-f]{8}$")
+# Leaf functions of threads that are blocked waiting for work
+IDLE_FUNCTIONS = {
+    "wait",
+    "_wait_for_tstate_lock",
+    "select",
+    "poll",
+    "get",
+    "sleep",
+    # concurrent.futures workers block on a C-level queue get
+    "_worker",
+}
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def collapse_stack(frame) -> list:
+    stack = []
+    while frame is not None:
+        stack.append(frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class Profile:
+    def __init__(self, loop_thread: int):
+        self.loop_thread = loop_thread
+        self.samples = Counter()
+        self.max_concurrent = 1
+
+
+class StackSampler:
+    """One background thread sampling stacks while any profile is active."""
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.lock = threading.Lock()
+        self.active = set()
+        self.thread = None
+
+    def start(self, loop_thread: int) -> Profile:
+        profile = Profile(loop_thread)
+        with self.lock:
+            self.active.add(profile)
+            for other in self.active:
+                other.max_concurrent = max(other.max_concurrent, len(self.active))
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self.thread.start()
+        return profile
+
+    def stop(self, profile: Profile):
+        with self.lock:
+            self.active.discard(profile)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.active:
+                    self.thread = None
+                    return
+                profiles = list(self.active)
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            loop_threads = {profile.loop_thread for profile in profiles}
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident in loop_threads:
+                    root = "event-loop"
+                elif frame.f_code.co_name in IDLE_FUNCTIONS:
+                    continue
+                else:
+                    # Pool threads differ only by their index
+                    root = re.sub(r"_\d+$", "", names.get(ident, "thread"))
+                stacks.append(";".join([root] + collapse_stack(frame)))
+
+            with self.lock:
+                for profile in profiles:
+                    if profile in self.active:
+                        profile.samples.update(stacks)
+
+
+class ProfileStore:
+    """Profiles on disk, oldest removed beyond max_files."""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, metadata: dict, samples: Counter):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, metadata["id"])
+        with open(f"{path}.folded", "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(f"{path}.json", "w") as f:
+            json.dump(metadata, f)
+
+        profile_ids = self._ids()
+        for profile_id in profile_ids[: max(len(profile_ids) - self.max_files, 0)]:
+            for extension in (".folded", ".json"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + extension))
+                except FileNotFoundError:
+                    pass
+
+    def _ids(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        )
+
+    def list(self) -> list:
+        """Metadata of stored profiles, newest first."""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(os.path.join(self.directory, f"{profile_id}.json")) as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return profiles
+
+    def folded_path(self, profile_id: str):
+        """Path of a profile's collapsed stacks, or None if it does not exist."""
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        return path if os.path.exists(path) else None
+
+
+class ProfilerMiddleware:
+    """
+    HTTP middleware (for app.middleware("http")) keeping profiles of slow or
+    sampled requests. Must run inside the request context middleware.
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        threshold_ms: float,
+        sample_rate: float,
+        interval_ms: float,
+    ):
+        self.store = store
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.sampler = StackSampler(interval_ms)
+
+    async def __call__(self, request, call_next):
+        profile = self.sampler.start(threading.get_ident())
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            self.sampler.stop(profile)
+            duration_ms = (time.perf_counter() - started) * 1000
+            if profile.samples and (
+                duration_ms >= self.threshold_ms or random.random() < self.sample_rate
+            ):
+                self._save(request, profile, duration_ms, status)
+
+    def _save(self, request, profile: Profile, duration_ms: float, status: int):
+        context = request_context.get()
+        now = datetime.now(timezone.utc)
+        metadata = {
+            "id": f"{now.strftime('%Y%m%dT%H%M%S%fZ')}_{os.urandom(4).hex()}",
+            "created_at": now.isoformat(),
+            "route": context.get("route"),
+            "tenant_id": context.get("tenant_id"),
+            "request_id": context.get("request_id"),
+            "method": request.method,
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "samples": sum(profile.samples.values()),
+            "max_concurrent_requests": profile.max_concurrent,
+        }
+        asyncio.get_running_loop().run_in_executor(
+            None, self.store.save, metadata, profile.samples
+        )
@@ -0,0 +1,59 @@
+"""
+Single-flight: concurrent identical calls share one execution.
+
+The first caller for a key runs the function; callers arriving while it is
+in flight wait for it and receive the same result (or exception). Nothing
+is cached once the call finishes, so results are never staler than a call
+that started after the request did.
+
+Thread-based, for code running in the worker threadpool.
+"""
+
+import threading
+from app.core.instrumentation import SINGLEFLIGHT_CALLS
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, group: str):
+        # Label for the singleflight_calls_total metric
+        self.group = group
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """Run fn(), or wait for the in-flight call with the same key."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(group=self.group, outcome="shared")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLEFLIGHT_CALLS.inc(group=self.group, outcome="executed")
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self.lock:
+            return len(self.calls)
@@ -0,0 +1,379 @@
+"""
+Snowflake query attribution and cost telemetry.
+
+Every request runs with a context (route, tenant_id, request_id) that is
+set by the middleware in app.main and read through contextvars. Each query
+is recorded with that context under its query id, which is how statements
+are traced back to an endpoint and a tenant. Sessions are pooled and reused
+across requests, so their QUERY_TAG is static: the app and the workload
+class, set once when the session is opened.
+
+Client-side timings (connect, execute, fetch) and row counts are recorded
+per query. A background collector periodically joins them with
+INFORMATION_SCHEMA.QUERY_HISTORY_BY_USER to add bytes scanned, warehouse
+time and credits, and aggregates everything per route and per tenant.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from app.services.workload_router import HEAVY
+
+# Credits per hour by warehouse size, used to estimate compute credits from
+# execution time (QUERY_HISTORY has no per-query warehouse credits)
+WAREHOUSE_CREDITS_PER_HOUR = {
+    "X-Small": 1,
+    "Small": 2,
+    "Medium": 4,
+    "Large": 8,
+    "X-Large": 16,
+    "2X-Large": 32,
+    "3X-Large": 64,
+    "4X-Large": 128,
+}
+
+# Recent queries kept for the "most expensive" listing
+MAX_RECENT_QUERIES = 5000
+
+# Client-supplied values (X-Request-ID, tenant_id path parameter) end up in
+# logs, metrics and telemetry, so only short plain identifiers are accepted
+TAG_VALUE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# Snowflake rejects longer QUERY_TAG values
+MAX_QUERY_TAG_LENGTH = 2000
+
+logger = logging.getLogger(__name__)
+
+request_context = ContextVar("request_context", default={})
+
+
+def new_request_context(route: str, tenant_id: str = None, request_id: str = None):
+    """
+    Set the context for the current request. Returns the reset token.
+    A request id or tenant id that is not a plain identifier is replaced by
+    a fresh id or dropped.
+    """
+    if not request_id or not TAG_VALUE.match(request_id):
+        request_id = uuid.uuid4().hex
+    if tenant_id and not TAG_VALUE.match(tenant_id):
+        tenant_id = None
+    return request_context.set(
+        {
+            "route": route,
+            "tenant_id": tenant_id,
+            "request_id": request_id,
+        }
+    )
+
+
+def query_tag(**fields) -> str:
+    """QUERY_TAG value for a Snowflake session, e.g. query_tag(workload=...)."""
+    tag = {"app": "arcims-api", **fields}
+    tag = json.dumps({key: value for key, value in tag.items() if value})
+    return tag[:MAX_QUERY_TAG_LENGTH]
+
+
+class QueryTelemetry:
+    """Per-query records and per-route / per-tenant aggregates."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=MAX_RECENT_QUERIES)
+        self.by_query_id = {}
+        # Query ids not yet joined with QUERY_HISTORY
+        self.pending = set()
+        self.routes = {}
+        self.tenants = {}
+        # Queue and execution times per workload class (see workload_router)
+        self.workloads = {}
+
+    def record(
+        self,
+        query_id: str,
+        template: str,
+        execute_ms: float,
+        fetch_ms: float,
+        rows: int,
+    ):
+        context = request_context.get()
+        record = {
+            "query_id": query_id,
+            "template": template,
+            "route": context.get("route"),
+            "tenant_id": context.get("tenant_id"),
+            "request_id": context.get("request_id"),
+            "started_at": datetime.utcnow().isoformat(),
+            "execute_ms": round(execute_ms, 2),
+            "fetch_ms": round(fetch_ms, 2),
+            "rows": rows,
+        }
+        with self.lock:
+            if len(self.recent) == self.recent.maxlen:
+                evicted = self.recent[0]
+                self.by_query_id.pop(evicted["query_id"], None)
+                self.pending.discard(evicted["query_id"])
+            self.recent.append(record)
+            if query_id:
+                self.by_query_id[query_id] = record
+                self.pending.add(query_id)
+            for key, groups in (
+                (record["route"], self.routes),
+                (record["tenant_id"], self.tenants),
+            ):
+                stats = groups.setdefault(key or "unknown", new_stats())
+                stats["queries"] += 1
+                stats["execute_ms"] += execute_ms
+                stats["fetch_ms"] += fetch_ms
+                stats["rows"] += rows
+
+    def record_connect(self, connect_ms: float):
+        context = request_context.get()
+        with self.lock:
+            for key, groups in (
+                (context.get("route"), self.routes),
+                (context.get("tenant_id"), self.tenants),
+            ):
+                stats = groups.setdefault(key or "unknown", new_stats())
+                stats["connects"] += 1
+                stats["connect_ms"] += connect_ms
+
+    def pending_ids(self) -> list:
+        with self.lock:
+            return list(self.pending)
+
+    def apply_history(self, history: list):
+        """Merge QUERY_HISTORY rows (dicts keyed like the record fields)."""
+        with self.lock:
+            for row in history:
+                record = self.by_query_id.get(row["query_id"])
+                if record is None or row["query_id"] not in self.pending:
+                    continue
+                self.pending.discard(row["query_id"])
+                record.update(row)
+                for key, groups in (
+                    (record["route"], self.routes),
+                    (record["tenant_id"], self.tenants),
+                ):
+                    stats = groups.setdefault(key or "unknown", new_stats())
+                    stats["bytes_scanned"] += row["bytes_scanned"] or 0
+                    stats["warehouse_ms"] += row["execution_ms"] or 0
+                    stats["credits"] += row["credits"] or 0
+
+    def apply_workload_history(self, rows: list):
+        """Add per-workload totals from fetch_workload_history()."""
+        with self.lock:
+            for row in rows:
+                stats = self.workloads.setdefault(
+                    row["workload"] or "unknown",
+                    {
+                        "queries": 0,
+                        "queued_overload_ms": 0,
+                        "queued_provisioning_ms": 0,
+                        "max_queued_overload_ms": 0,
+                        "execution_ms": 0,
+                    },
+                )
+                stats["queries"] += row["queries"]
+                stats["queued_overload_ms"] += row["queued_overload_ms"]
+                stats["queued_provisioning_ms"] += row["queued_provisioning_ms"]
+                stats["max_queued_overload_ms"] = max(
+                    stats["max_queued_overload_ms"], row["max_queued_overload_ms"]
+                )
+                stats["execution_ms"] += row["execution_ms"]
+
+    def workload_snapshot(self) -> dict:
+        with self.lock:
+            snapshot = {}
+            for workload, stats in self.workloads.items():
+                queries = stats["queries"] or 1
+                snapshot[workload] = {
+                    **stats,
+                    "avg_queued_overload_ms": round(
+                        stats["queued_overload_ms"] / queries, 2
+                    ),
+                }
+            return snapshot
+
+    def snapshot(self, top: int = 20) -> dict:
+        with self.lock:
+            expensive = sorted(
+                (record for record in self.recent if "credits" in record),
+                key=lambda record: record["credits"],
+                reverse=True,
+            )[:top]
+            return {
+                "routes": {key: dict(stats) for key, stats in self.routes.items()},
+                "tenants": {key: dict(stats) for key, stats in self.tenants.items()},
+                "most_expensive": [dict(record) for record in expensive],
+                "pending_history": len(self.pending),
+            }
+
+
+def new_stats() -> dict:
+    return {
+        "connects": 0,
+        "connect_ms": 0.0,
+        "queries": 0,
+        "execute_ms": 0.0,
+        "fetch_ms": 0.0,
+        "rows": 0,
+        "bytes_scanned": 0,
+        "warehouse_ms": 0,
+        "credits": 0.0,
+    }
+
+
+telemetry = QueryTelemetry()
+
+
+class Timer:
+    """Milliseconds since creation, for client-side query phases."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+
+    def ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+def fetch_query_history(snowflake_service, query_ids: list) -> list:
+    """
+    QUERY_HISTORY rows for `query_ids`, run as the API's Snowflake user
+    (the table function only shows that user's own queries).
+    """
+    conn = snowflake_service._get_connection()
+    cursor = conn.cursor()
+    try:
+        since = datetime.utcnow() - timedelta(hours=1)
+        cursor.execute(
+            """
+            SELECT query_id, bytes_scanned, total_elapsed_time, execution_time,
+                   warehouse_size, credits_used_cloud_services
+            FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_USER(
+                USER_NAME => %s,
+                END_TIME_RANGE_START => TO_TIMESTAMP_LTZ(%s),
+                RESULT_LIMIT => 10000
+            ))
+        """,
+            (snowflake_service.user, since.strftime("%Y-%m-%d %H:%M:%S +0000")),
+        )
+        wanted = set(query_ids)
+        history = []
+        for (
+            query_id,
+            scanned,
+            elapsed,
+            execution,
+            size,
+            cloud_credits,
+        ) in cursor.fetchall():
+            if query_id not in wanted:
+                continue
+            compute = (
+                (execution or 0) / 3_600_000 * WAREHOUSE_CREDITS_PER_HOUR.get(size, 0)
+            )
+            history.append(
+                {
+                    "query_id": query_id,
+                    "bytes_scanned": scanned,
+                    "elapsed_ms": elapsed,
+                    "execution_ms": execution,
+                    "warehouse_size": size,
+                    "credits": round(compute + float(cloud_credits or 0), 8),
+                }
+            )
+        return history
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def fetch_workload_history(snowflake_service, since: datetime, until: datetime):
+    """
+    Queue and execution times per workload class for queries that ended in
+    [since, until), from QUERY_HISTORY_BY_WAREHOUSE on every routed
+    warehouse. That covers all users (admin sessions included); the class is
+    read from each query's QUERY_TAG.
+    """
+    conn = snowflake_service._get_connection(use_admin=True, workload=HEAVY)
+    cursor = conn.cursor()
+    try:
+        rows = []
+        for warehouse in snowflake_service.router.warehouses():
+            cursor.execute(
+                """
+                SELECT TRY_PARSE_JSON(query_tag):workload::STRING,
+                       COUNT(*),
+                       SUM(queued_overload_time),
+                       SUM(queued_provisioning_time),
+                       MAX(queued_overload_time),
+                       SUM(execution_time)
+                FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_WAREHOUSE(
+                    WAREHOUSE_NAME => %s,
+                    END_TIME_RANGE_START => TO_TIMESTAMP_LTZ(%s),
+                    END_TIME_RANGE_END => TO_TIMESTAMP_LTZ(%s),
+                    RESULT_LIMIT => 10000
+                ))
+                WHERE TRY_PARSE_JSON(query_tag):app::STRING = 'arcims-api'
+                GROUP BY 1
+            """,
+                (
+                    warehouse,
+                    since.strftime("%Y-%m-%d %H:%M:%S +0000"),
+                    until.strftime("%Y-%m-%d %H:%M:%S +0000"),
+                ),
+            )
+            for (
+                workload,
+                queries,
+                overload,
+                provisioning,
+                worst,
+                execution,
+            ) in cursor.fetchall():
+                rows.append(
+                    {
+                        "workload": workload,
+                        "warehouse": warehouse,
+                        "queries": queries,
+                        "queued_overload_ms": overload or 0,
+                        "queued_provisioning_ms": provisioning or 0,
+                        "max_queued_overload_ms": worst or 0,
+                        "execution_ms": execution or 0,
+                    }
+                )
+        return rows
+    finally:
+        cursor.close()
+        conn.close()
+
+
+async def run_history_collector(snowflake_service, interval_seconds: float):
+    """
+    Background task, every interval: join pending queries with QUERY_HISTORY
+    and collect per-workload queue times.
+    """
+    since = datetime.utcnow()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        until = datetime.utcnow()
+        query_ids = telemetry.pending_ids()
+        try:
+            if query_ids:
+                history = await asyncio.to_thread(
+                    fetch_query_history, snowflake_service, query_ids
+                )
+                telemetry.apply_history(history)
+            workloads = await asyncio.to_thread(
+                fetch_workload_history, snowflake_service, since, until
+            )
+            telemetry.apply_workload_history(workloads)
+            since = until
+        except Exception as e:
+            logger.warning("Query history collection failed: %s", e)
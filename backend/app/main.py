@@ -1,8 +1,141 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import tenants, webhooks, fivetran, fivetran_webhooks, tink, metrics
+from starlette.routing import Match
+from app.api.routes import (
+    tenants,
+    webhooks,
+    fivetran,
+    fivetran_webhooks,
+    tink,
+    metrics,
+    admin,
+    internal,
+)
+from app.core.config import settings
+from app.core.credentials import credentials
+from app.core.logs import configure_logging, shutdown_logging
+from app.core.profiler import ProfileStore, ProfilerMiddleware
+from app.core.telemetry import (
+    new_request_context,
+    request_context,
+    run_history_collector,
+)
+from app.core.instrumentation import (
+    REQUEST_DURATION,
+    REQUEST_ERRORS,
+    REQUESTS_IN_FLIGHT,
+    finish_trace,
+    start_trace,
+)
+from app.core.container import Container
+
+configure_logging(settings.log_level, settings.log_levels, settings.log_sample_rate)
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_secure_views(snowflake_service):
+    """
+    Create secure views that do not exist yet (e.g. after a deploy that adds
+    one); views whose definition is current are left alone.
+    """
+    try:
+        snowflake_service.refresh_secure_views()
+    except Exception as e:
+        logger.warning("Secure view refresh failed: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse the Snowflake keys now rather than on the first request
+    asyncio.get_running_loop().run_in_executor(
+        None,
+        credentials.preload,
+        [
+            settings.snowflake_private_key_path,
+            settings.snowflake_admin_private_key_path,
+        ],
+    )
+    if settings.secure_views_refresh_on_startup:
+        asyncio.get_running_loop().run_in_executor(
+            None, refresh_secure_views, app.state.container.snowflake_service
+        )
+    collector = None
+    if settings.query_history_interval_seconds > 0:
+        collector = asyncio.create_task(
+            run_history_collector(
+                app.state.container.snowflake_service,
+                settings.query_history_interval_seconds,
+            )
+        )
+    warmer = None
+    if settings.warmup_enabled:
+        warmer = asyncio.create_task(app.state.container.warehouse_warmer.run())
+    yield
+    if collector:
+        collector.cancel()
+    if warmer:
+        warmer.cancel()
+    app.state.container.close()
+    shutdown_logging()
+
+
+app = FastAPI(title="Arcims API", version="1.0.0", lifespan=lifespan)
+app.state.container = Container()
+
+if settings.profiler_enabled:
+    # Registered first so it runs inside the request context middleware
+    app.middleware("http")(
+        ProfilerMiddleware(
+            ProfileStore(settings.profile_dir, settings.profile_max_files),
+            settings.profile_threshold_ms,
+            settings.profile_sample_rate,
+            settings.profile_interval_ms,
+        )
+    )
+
+
+@app.middleware("http")
+async def request_context_middleware(request: Request, call_next):
+    """
+    Tag the request with its route template, tenant and request id so
+    Snowflake queries and telemetry can be attributed to them, and record
+    its latency, in-flight count, errors and upstream spans.
+    """
+    # Unmatched paths share one label to keep metric cardinality bounded
+    route, tenant_id = "unmatched", None
+    for candidate in app.router.routes:
+        match, child_scope = candidate.matches(request.scope)
+        if match == Match.FULL:
+            route = getattr(candidate, "path", route)
+            tenant_id = child_scope.get("path_params", {}).get("tenant_id")
+            break
+
+    token = new_request_context(route, tenant_id, request.headers.get("X-Request-ID"))
+    request_id = request_context.get()["request_id"]
+    trace_token = start_trace(route, request.method, request_id)
+    REQUESTS_IN_FLIGHT.inc(route=route)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        duration = time.perf_counter() - started
+        REQUESTS_IN_FLIGHT.dec(route=route)
+        labels = {"route": route, "method": request.method, "status": status}
+        REQUEST_DURATION.observe(duration, **labels)
+        if status >= 500:
+            REQUEST_ERRORS.inc(**labels)
+        finish_trace(trace_token, duration, status)
+        request_context.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
-app = FastAPI(title="Arcims API", version="1.0.0")
 
 # CORS - allow Next.js frontend
 app.add_middleware(
@@ -20,6 +153,8 @@ app.include_router(fivetran.router, prefix="/api")
 app.include_router(fivetran_webhooks.router, prefix="/api")
 app.include_router(tink.router, prefix="/api")
 app.include_router(metrics.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(internal.router)
 
 
 @app.get("/")
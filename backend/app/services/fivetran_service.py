@@ -1,11 +1,16 @@
+import logging
 import httpx
 from typing import Optional, Dict
 from app.core.config import settings
+from app.core.credentials import credentials
+from app.core.instrumentation import traced
+
+logger = logging.getLogger(__name__)
 
 
 class FivetranService:
     def __init__(self):
-        self.base_url = "https://api.fivetran.com/v1"
+        self.base_url = settings.fivetran_api_url
         self.auth_token = settings.fivetran_auth_token
 
     def _get_headers(self):
@@ -15,6 +20,7 @@ class FivetranService:
             "Accept": "application/json;version=2",
         }
 
+    @traced("fivetran")
     async def create_group(self, tenant_id: str, company_name: str) -> dict:
         """
         Creates Fivetran group for tenant.
@@ -23,27 +29,29 @@ class FivetranService:
         async with httpx.AsyncClient() as client:
             payload = {"name": f"{company_name}_{tenant_id[:8]}"}
 
-            print(f"Creating group with payload: {payload}")
+            logger.info("Creating Fivetran group %s", payload["name"])
 
             response = await client.post(
                 f"{self.base_url}/groups", headers=self._get_headers(), json=payload
             )
 
-            print(f"Response status: {response.status_code}")
-            print(f"Response body: {response.text}")
+            logger.debug(
+                "Create group response %s: %s", response.status_code, response.text
+            )
 
             response.raise_for_status()
             return response.json()["data"]
 
+    @traced("fivetran")
     async def create_snowflake_destination(self, group_id: str, tenant_id: str) -> dict:
         """
         Creates Snowflake destination for group.
         Uses key-pair authentication with tenant-specific role.
         """
 
-        # Read private key file
-        with open(settings.snowflake_private_key_path, "r") as key_file:
-            private_key_content = key_file.read()
+        private_key_content = credentials.private_key_pem(
+            settings.snowflake_private_key_path
+        )
 
         tenant_role = f"TENANT_{tenant_id.replace('-', '_').upper()}"
 
@@ -68,12 +76,16 @@ class FivetranService:
                 },
             )
 
-            print(f"Destination response status: {response.status_code}")
-            print(f"Destination response body: {response.text}")
+            logger.debug(
+                "Create destination response %s: %s",
+                response.status_code,
+                response.text,
+            )
 
             response.raise_for_status()
             return response.json()["data"]
 
+    @traced("fivetran")
     async def create_fortnox_connector(
         self, group_id: str, tenant_id: str, redirect_uri: str = None
     ) -> dict:
@@ -119,6 +131,7 @@ class FivetranService:
             data = response.json()["data"]
             return data
 
+    @traced("fivetran")
     async def get_connector_status(self, connector_id: str) -> dict:
         """Get connector sync status."""
         async with httpx.AsyncClient() as client:
@@ -129,6 +142,7 @@ class FivetranService:
             response.raise_for_status()
             return response.json()["data"]
 
+    @traced("fivetran")
     async def list_group_connectors(self, group_id: str) -> list:
         """List all connectors in a group."""
         async with httpx.AsyncClient() as client:
@@ -139,6 +153,7 @@ class FivetranService:
             response.raise_for_status()
             return response.json()["data"]["items"]
 
+    @traced("fivetran")
     async def create_group_webhook(
         self, group_id: str, webhook_url: str, secret: str
     ) -> dict:
@@ -157,8 +172,9 @@ class FivetranService:
                 },
             )
 
-            print(f"Webhook response status: {response.status_code}")
-            print(f"Webhook response body: {response.text}")
+            logger.debug(
+                "Create webhook response %s: %s", response.status_code, response.text
+            )
 
             response.raise_for_status()
             return response.json()["data"]
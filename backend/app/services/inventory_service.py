@@ -0,0 +1,150 @@
+import threading
+import time
+from typing import Optional
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.snowflake_service import SnowflakeService, SECURE_VIEW_SOURCES
+from app.services.query_registry import tenant_schema
+from app.services.workload_router import HEAVY
+from app.core.instrumentation import traced
+
+
+class InventoryService:
+    """
+    Row counts, sizes and last-altered times for tenant schemas.
+
+    Everything comes from INFORMATION_SCHEMA.TABLES in one metadata query,
+    which runs in Snowflake's cloud services layer without scanning (or
+    resuming a warehouse for) the tables themselves.
+    """
+
+    def __init__(
+        self,
+        snowflake: Optional[SnowflakeService] = None,
+        freshness_ttl_seconds: float = None,
+    ):
+        self.snowflake = snowflake or SnowflakeService()
+        if freshness_ttl_seconds is None:
+            freshness_ttl_seconds = settings.freshness_cache_seconds
+        self.freshness_ttl_seconds = freshness_ttl_seconds
+        # tenant_id -> (expires at, last_altered)
+        self.freshness = {}
+        self.freshness_lock = threading.Lock()
+        self.freshness_reads = SingleFlight("data_freshness")
+
+    @traced("snowflake")
+    def list_tables(self, schemas: Optional[list] = None) -> list:
+        """
+        One entry per table in the TINK_*/FORTNOX_* schemas, or only in
+        `schemas` when given.
+        """
+        database = self.snowflake.database
+        prefixes = " OR ".join(
+            f"STARTSWITH(table_schema, '{source}_')" for source in SECURE_VIEW_SOURCES
+        )
+        params = []
+        schema_filter = ""
+        if schemas:
+            schema_filter = f"AND table_schema IN ({', '.join(['%s'] * len(schemas))})"
+            params = list(schemas)
+
+        conn = self.snowflake._get_connection(use_admin=True, workload=HEAVY)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(
+                f"""
+                SELECT table_schema, table_name, row_count, bytes, last_altered
+                FROM {database}.INFORMATION_SCHEMA.TABLES
+                WHERE table_type = 'BASE TABLE' AND ({prefixes}) {schema_filter}
+                ORDER BY table_schema, table_name
+            """,
+                params,
+            )
+
+            return [
+                {
+                    "schema": schema,
+                    "table": table,
+                    "source": schema.split("_", 1)[0],
+                    "row_count": row_count or 0,
+                    "bytes": size or 0,
+                    "last_altered": last_altered.isoformat() if last_altered else None,
+                }
+                for schema, table, row_count, size, last_altered in cursor.fetchall()
+            ]
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    @traced("snowflake")
+    def get_tenant_inventory(self, tenant_id: str) -> dict:
+        """
+        Inventory of one tenant's source schemas plus a freshness signal:
+        the most recent time any of its tables was changed by a sync.
+        """
+        schemas = [tenant_schema(source, tenant_id) for source in SECURE_VIEW_SOURCES]
+        tables = self.list_tables(schemas)
+
+        return {
+            "tenant_id": tenant_id,
+            "schemas": sorted({table["schema"] for table in tables}),
+            "table_count": len(tables),
+            "non_empty_tables": sum(1 for table in tables if table["row_count"]),
+            "row_count": sum(table["row_count"] for table in tables),
+            "bytes": sum(table["bytes"] for table in tables),
+            "last_altered": max(
+                (table["last_altered"] for table in tables if table["last_altered"]),
+                default=None,
+            ),
+            "tables": tables,
+        }
+
+    def last_altered(self, tenant_id: str) -> Optional[str]:
+        """
+        get_tenant_inventory's last_altered, cached per tenant for
+        freshness_ttl_seconds and read once for concurrent callers. Syncs
+        land minutes apart, so this is read on every dashboard load.
+        """
+        now = time.monotonic()
+        with self.freshness_lock:
+            cached = self.freshness.get(tenant_id)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        def read():
+            value = self.get_tenant_inventory(tenant_id)["last_altered"]
+            with self.freshness_lock:
+                self.freshness[tenant_id] = (
+                    time.monotonic() + self.freshness_ttl_seconds,
+                    value,
+                )
+            return value
+
+        return self.freshness_reads.do(tenant_id, read)
+
+    def summarize(self, tables: list) -> list:
+        """Per-schema totals for a list_tables() result."""
+        schemas = {}
+        for table in tables:
+            summary = schemas.setdefault(
+                table["schema"],
+                {
+                    "schema": table["schema"],
+                    "source": table["source"],
+                    "table_count": 0,
+                    "row_count": 0,
+                    "bytes": 0,
+                    "last_altered": None,
+                },
+            )
+            summary["table_count"] += 1
+            summary["row_count"] += table["row_count"]
+            summary["bytes"] += table["bytes"]
+            if table["last_altered"] and (
+                not summary["last_altered"]
+                or table["last_altered"] > summary["last_altered"]
+            ):
+                summary["last_altered"] = table["last_altered"]
+        return list(schemas.values())
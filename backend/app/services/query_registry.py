@@ -0,0 +1,214 @@
+"""
+Named, parameterized SQL templates for the metrics endpoints.
+
+Values are never spliced into SQL: they are passed as `?` bind variables
+(connections used with the registry are opened with paramstyle="qmark", so
+binding happens server-side). Identifiers (database and schema names) are
+the only substitutions and must pass IDENTIFIER. Each template therefore
+renders to one stable query text per database, identified by its hash, so
+Snowflake's result cache and our own caches see identical queries for every
+tenant and every parameter value.
+"""
+
+import hashlib
+import re
+from datetime import date
+from app.core.config import settings
+from app.core.telemetry import Timer, telemetry
+from app.core.instrumentation import span
+from app.core.singleflight import SingleFlight
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]{0,254}$")
+TENANT_ID = re.compile(r"^[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}$")
+TENANT_SCHEMA_SOURCES = ("TINK", "FORTNOX")
+
+# Identical concurrent metric queries share one execution (see fetch_shared)
+shared_queries = SingleFlight("metric_queries")
+
+
+class QueryTemplate:
+    def __init__(self, name: str, sql: str, params: tuple = ()):
+        self.name = name
+        self.sql = sql
+        # Names of the `?` binds, in order
+        self.params = params
+        self._rendered = {}
+
+    def render(self, **identifiers) -> str:
+        """SQL text with identifiers filled in. Cached per identifier set."""
+        key = tuple(sorted(identifiers.items()))
+        if key not in self._rendered:
+            for name, value in identifiers.items():
+                if not IDENTIFIER.match(str(value)):
+                    raise ValueError(f"Invalid identifier for {name}: {value!r}")
+            self._rendered[key] = self.sql.format(**identifiers)
+        return self._rendered[key]
+
+    def query_hash(self, **identifiers) -> str:
+        return hashlib.sha256(self.render(**identifiers).encode()).hexdigest()[:16]
+
+    def bind(self, **values) -> list:
+        missing = [name for name in self.params if name not in values]
+        if missing:
+            raise ValueError(f"Missing parameters for {self.name}: {missing}")
+        return [values[name] for name in self.params]
+
+
+TEMPLATES = {
+    template.name: template
+    for template in [
+        QueryTemplate(
+            "cash_position",
+            """
+            SELECT
+                SUM(balance_amount) as total_balance,
+                balance_currency,
+                COUNT(*) as account_count
+            FROM {database}.{schema}.TINK_ACCOUNTS_SECURE
+            GROUP BY balance_currency
+            """,
+        ),
+        QueryTemplate(
+            "monthly_spend",
+            """
+            SELECT
+                DATE_TRUNC('month', summary_date) as month,
+                SUM(outflow) as monthly_spend
+            FROM {database}.{schema}.TINK_DAILY_SUMMARY_SECURE
+            WHERE summary_date >= ?
+            GROUP BY month
+            HAVING SUM(outflow) > 0
+            ORDER BY month DESC
+            """,
+            params=("since",),
+        ),
+        QueryTemplate(
+            "recent_transactions",
+            """
+            SELECT
+                booked_date,
+                description,
+                amount,
+                currency,
+                merchant_name,
+                status
+            FROM {database}.{schema}.TINK_TRANSACTIONS_SECURE
+            ORDER BY booked_date DESC
+            LIMIT ?
+            """,
+            params=("limit",),
+        ),
+        QueryTemplate(
+            "monthly_revenue",
+            """
+            SELECT
+                DATE_TRUNC('month', summary_date) as month,
+                SUM(inflow) as monthly_revenue
+            FROM {database}.{schema}.TINK_DAILY_SUMMARY_SECURE
+            GROUP BY month
+            HAVING SUM(inflow) > 0
+            ORDER BY month DESC
+            LIMIT ?
+            """,
+            params=("months",),
+        ),
+        QueryTemplate(
+            "fortnox_account_structure",
+            """
+            SELECT
+                CASE
+                    WHEN NUMBER BETWEEN 3000 AND 3999 THEN 'revenue'
+                    WHEN NUMBER BETWEEN 4000 AND 6999 THEN 'cogs'
+                END as account_type,
+                COUNT(*) as account_count
+            FROM {database}.{schema}.FORTNOX_ACCOUNT_SECURE
+            WHERE NUMBER BETWEEN 3000 AND 6999
+            GROUP BY account_type
+            """,
+        ),
+    ]
+}
+
+
+def get_template(name: str) -> QueryTemplate:
+    template = TEMPLATES.get(name)
+    if template is None:
+        raise KeyError(f"Unknown query template: {name}")
+    return template
+
+
+def execute_query(cursor, name: str, **values):
+    """
+    Run a registered template on a qmark cursor against the shared secure
+    views. Returns the cursor for fetching.
+    """
+    template = get_template(name)
+    sql = template.render(
+        database=settings.snowflake_database, schema=settings.snowflake_schema
+    )
+    return cursor.execute(sql, template.bind(**values))
+
+
+def fetch_all(cursor, name: str, **values) -> list:
+    """
+    Run a template and fetch all rows, recording client-side execute and
+    fetch times and the row count under the query id.
+    """
+    timer = Timer()
+    with span("snowflake", f"execute:{name}"):
+        execute_query(cursor, name, **values)
+    execute_ms = timer.ms()
+
+    timer = Timer()
+    with span("snowflake", f"fetch:{name}"):
+        rows = cursor.fetchall()
+    telemetry.record(cursor.sfqid, name, execute_ms, timer.ms(), len(rows))
+    return rows
+
+
+def fetch_shared(connect, scope: str, name: str, **values) -> list:
+    """
+    fetch_all, shared with concurrent calls for the same scope (the tenant
+    role), query text and bind values: one of them opens a connection with
+    connect() and runs the query, and all of them receive its rows.
+    """
+    template = get_template(name)
+    fingerprint = template.query_hash(
+        database=settings.snowflake_database, schema=settings.snowflake_schema
+    )
+    key = (scope, fingerprint, tuple(template.bind(**values)))
+
+    def run():
+        conn = connect()
+        cursor = conn.cursor()
+        try:
+            return fetch_all(cursor, name, **values)
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Each caller gets its own list
+    return list(shared_queries.do(key, run))
+
+
+def tenant_schema(source: str, tenant_id: str) -> str:
+    """
+    Validated name of a tenant's source schema, e.g. FORTNOX_0973369A.
+    Use this instead of building schema names from request input.
+    """
+    if source not in TENANT_SCHEMA_SOURCES:
+        raise ValueError(f"Unknown source: {source!r}")
+    if not TENANT_ID.match(tenant_id):
+        raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+    return f"{source}_{tenant_id.replace('-', '_')[:8].upper()}"
+
+
+def months_ago(months: int, today: date = None) -> date:
+    """Same day `months` months before today (like DATEADD(month, -n, ...))."""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    year, month = index // 12, index % 12 + 1
+    days_in_month = (
+        date(year + month // 12, month % 12 + 1, 1) - date(year, month, 1)
+    ).days
+    return date(year, month, min(today.day, days_in_month))
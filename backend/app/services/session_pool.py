@@ -0,0 +1,193 @@
+"""
+Pool of open Snowflake sessions per role.
+
+Opening a tenant session costs a key-pair login (hundreds of milliseconds);
+reusing one costs nothing: its QUERY_TAG is static per workload, so a
+checkout sends no statement before the request's own query. Sessions are handed out as PooledSession, whose close() returns the session
+to the pool, so callers keep the usual try/finally conn.close() shape.
+
+Idle sessions are kept per role up to max_idle and closed once they have
+been idle for idle_seconds (well below Snowflake's four-hour session
+expiry). A session that was closed underneath us is dropped on release.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """A pooled connection; close() returns it to the pool."""
+
+    def __init__(self, pool: "SessionPool", role: str, conn, prewarmed: bool = False):
+        self.pool = pool
+        self.role = role
+        self.conn = conn
+        # Opened ahead of demand by the warmer, not yet used by a request
+        self.prewarmed = prewarmed
+        self.idle_since = time.monotonic()
+
+    def cursor(self):
+        return self.conn.cursor()
+
+    def is_closed(self) -> bool:
+        return self.conn.is_closed()
+
+    def close(self):
+        self.pool.release(self)
+
+
+class SessionPool:
+    def __init__(self, connect, check, max_idle: int, idle_seconds: float, reset=None):
+        # connect(role) opens a session, check(conn) runs a cheap query on a
+        # prewarmed one and the optional reset(conn) prepares a reused one
+        self.connect = connect
+        self.reset = reset
+        self.check = check
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.last_checkout = None
+        self.counts = {
+            "hits": 0,
+            "misses": 0,
+            "opened": 0,
+            "closed": 0,
+            "prewarmed": 0,
+            "prewarmed_used": 0,
+            # Time spent handing out sessions (reset or connect)
+            "acquire_ms": 0.0,
+        }
+
+    def acquire(self, role: str) -> PooledSession:
+        started = time.perf_counter()
+        try:
+            return self._acquire(role)
+        finally:
+            with self.lock:
+                self.counts["acquire_ms"] += (time.perf_counter() - started) * 1000
+
+    def _acquire(self, role: str) -> PooledSession:
+        session = self._take_idle(role)
+        if session is not None and self.reset is None:
+            return session
+        if session is not None:
+            try:
+                self.reset(session.conn)
+                return session
+            except Exception as e:
+                logger.warning("Dropping pooled session for %s: %s", role, e)
+                self._close(session)
+
+        with self.lock:
+            self.counts["misses"] += 1
+            self.last_checkout = time.monotonic()
+        conn = self.connect(role)
+        with self.lock:
+            self.counts["opened"] += 1
+        return PooledSession(self, role, conn)
+
+    def _take_idle(self, role: str):
+        expired = []
+        session = None
+        with self.lock:
+            sessions = self.idle.get(role)
+            while sessions:
+                # Most recently used first, so surplus sessions age out
+                candidate = sessions.pop()
+                if self._expired(candidate):
+                    expired.append(candidate)
+                    continue
+                session = candidate
+                self.counts["hits"] += 1
+                self.last_checkout = time.monotonic()
+                if session.prewarmed:
+                    session.prewarmed = False
+                    self.counts["prewarmed_used"] += 1
+                break
+        for candidate in expired:
+            self._close(candidate)
+        return session
+
+    def release(self, session: PooledSession):
+        if session.is_closed():
+            return
+        session.idle_since = time.monotonic()
+        with self.lock:
+            sessions = self.idle.setdefault(session.role, deque())
+            if len(sessions) < self.max_idle:
+                sessions.append(session)
+                return
+        self._close(session)
+
+    def prefill(self, role: str, count: int = 1) -> int:
+        """Open sessions for `role` until `count` are idle. Returns how many opened."""
+        opened = 0
+        while self.idle_count(role) < min(count, self.max_idle):
+            conn = self.connect(role)
+            try:
+                self.check(conn)
+            except Exception:
+                conn.close()
+                raise
+            session = PooledSession(self, role, conn, prewarmed=True)
+            with self.lock:
+                self.counts["opened"] += 1
+                self.counts["prewarmed"] += 1
+            self.release(session)
+            opened += 1
+        return opened
+
+    def idle_count(self, role: str) -> int:
+        with self.lock:
+            return len(self.idle.get(role, ()))
+
+    def prune(self):
+        """Close sessions idle for longer than idle_seconds."""
+        expired = []
+        with self.lock:
+            for sessions in self.idle.values():
+                for session in [s for s in sessions if self._expired(s)]:
+                    sessions.remove(session)
+                    expired.append(session)
+        for session in expired:
+            self._close(session)
+
+    def close_all(self):
+        with self.lock:
+            sessions = [
+                s for role_sessions in self.idle.values() for s in role_sessions
+            ]
+            self.idle.clear()
+        for session in sessions:
+            self._close(session)
+
+    def _expired(self, session: PooledSession) -> bool:
+        return time.monotonic() - session.idle_since >= self.idle_seconds
+
+    def _close(self, session: PooledSession):
+        try:
+            session.conn.close()
+        except Exception as e:
+            logger.debug("Closing pooled session failed: %s", e)
+        with self.lock:
+            self.counts["closed"] += 1
+
+    def seconds_since_checkout(self):
+        with self.lock:
+            if self.last_checkout is None:
+                return None
+            return time.monotonic() - self.last_checkout
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.counts,
+                "acquire_ms": round(self.counts["acquire_ms"], 2),
+                "idle": sum(len(sessions) for sessions in self.idle.values()),
+                "idle_roles": len([s for s in self.idle.values() if s]),
+            }
@@ -1,7 +1,38 @@
-import snowflake.connector
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import serialization
+import logging
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from app.core.config import settings
+from app.core.credentials import credentials
+from app.core.telemetry import Timer, query_tag, telemetry
+from app.core.instrumentation import span, traced
+from app.services.session_pool import SessionPool
+from app.services.warehouse_warmer import ArrivalModel
+from app.services.workload_router import (
+    ADMIN,
+    HEAVY,
+    INTERACTIVE,
+    Workload,
+    WorkloadRouter,
+)
+
+# Schema prefixes of per-tenant source schemas (e.g. TINK_0973369A, FORTNOX_0973369A)
+SECURE_VIEW_SOURCES = ("TINK", "FORTNOX")
+# Marks generated views; followed by a fingerprint of the view definition
+SECURE_VIEW_COMMENT_PREFIX = "arcim-secure-view:"
+# Row access policy used when settings.snowflake_tenant_filter = "row_access_policy"
+TENANT_ROW_ACCESS_POLICY = "TENANT_ROW_ACCESS"
+# Tables smaller than this are not worth the reclustering credits
+CLUSTER_MIN_ROWS = 1_000_000
+# Admin sessions used to apply missing grants concurrently
+GRANT_WORKERS = 4
+# Pool keys of the non-tenant sessions; tenant sessions are keyed by role
+ADMIN_SESSION = "admin"
+SERVICE_SESSION = "service"
+# Snowflake error for an object that does not exist or is not authorized
+OBJECT_DOES_NOT_EXIST = 2003
+
+logger = logging.getLogger(__name__)
 
 
 class SnowflakeService:
@@ -18,55 +49,144 @@ class SnowflakeService:
         self.admin_role = settings.snowflake_admin_role
         self.admin_private_key_path = settings.snowflake_admin_private_key_path
 
-    def _get_private_key(self, key_path):
-        """Load and parse private key for authentication."""
-        with open(key_path, "rb") as key_file:
-            p_key = serialization.load_pem_private_key(
-                key_file.read(), password=None, backend=default_backend()
+        # Sessions are pooled per workload class (see workload_router)
+        self.router = WorkloadRouter.from_settings(settings)
+        for workload in self.router.workloads.values():
+            workload.pool = SessionPool(
+                connect=partial(self._open_session, workload),
+                check=self._check_session,
+                max_idle=workload.pool_max_idle,
+                idle_seconds=settings.snowflake_pool_idle_seconds,
             )
+        self.arrivals = ArrivalModel()
 
-        pkb = p_key.private_bytes(
-            encoding=serialization.Encoding.DER,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption(),
-        )
-        return pkb
+    def _get_private_key(self, key_path):
+        """DER-encoded private key, parsed once and shared (see app.core.credentials)."""
+        return credentials.private_key_der(key_path)
+
+    def _get_connection(self, use_admin=False, workload: str = None):
+        """
+        Pooled Snowflake session using key-pair auth; close() returns it.
+        Admin sessions default to the admin workload, the others to heavy.
+        """
+        workload = workload or (ADMIN if use_admin else HEAVY)
+        session = ADMIN_SESSION if use_admin else SERVICE_SESSION
+        return self.router.get(workload).pool.acquire(session)
+
+    def get_tenant_connection(self, role: str):
+        """
+        Connection as a tenant role, for queries through the secure views.
+        Interactive workload; close() returns it to the pool.
+        """
+        self.arrivals.record(role)
+        return self.router.get(INTERACTIVE).pool.acquire(role)
 
-    def _get_connection(self, use_admin=False):
-        """Get Snowflake connection using key-pair auth."""
-        if use_admin:
-            return snowflake.connector.connect(
+    def _open_session(self, workload: Workload, session: str):
+        """Open a session as the admin user, the API user or a tenant role."""
+        import snowflake.connector
+
+        params = {
+            "account": self.account,
+            "warehouse": workload.warehouse,
+            "database": self.database,
+            "session_parameters": {
+                "QUERY_TAG": query_tag(workload=workload.name),
+                "STATEMENT_TIMEOUT_IN_SECONDS": workload.statement_timeout_seconds,
+            },
+        }
+        if session == ADMIN_SESSION:
+            params.update(
                 user=self.admin_user,
-                account=self.account,
                 private_key=self._get_private_key(self.admin_private_key_path),
                 role=self.admin_role,
-                warehouse=self.warehouse,
-                database=self.database,
                 schema=self.schema,
             )
-        else:
-            return snowflake.connector.connect(
+        elif session == SERVICE_SESSION:
+            params.update(
                 user=self.user,
-                account=self.account,
                 private_key=self._get_private_key(self.private_key_path),
-                warehouse=self.warehouse,
-                database=self.database,
                 schema=self.schema,
             )
+        else:
+            params.update(
+                user=self.user,
+                private_key=self._get_private_key(self.private_key_path),
+                role=session,
+                # Server-side binds keep query text identical across parameter values
+                paramstyle="qmark",
+            )
+
+        timer = Timer()
+        with span("snowflake", "connect"):
+            conn = snowflake.connector.connect(**params)
+        telemetry.record_connect(timer.ms())
+        return conn
+
+    def _check_session(self, conn):
+        # Answered by cloud services, does not resume the warehouse
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def close(self):
+        """Close every pooled session."""
+        for workload in self.router.workloads.values():
+            workload.pool.close_all()
+
+    def warehouse_state(self, warehouse: str = None):
+        """
+        State, size and auto-suspend seconds of `warehouse` (default: the
+        interactive one), or None.
+        """
+        warehouse = warehouse or self.router.get(INTERACTIVE).warehouse
+        conn = self._get_connection(use_admin=True)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SHOW WAREHOUSES LIKE '{warehouse}'")
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = [column[0].lower() for column in cursor.description]
+            state = dict(zip(columns, row))
+            return {
+                "state": state.get("state"),
+                "size": state.get("size"),
+                "auto_suspend": state.get("auto_suspend"),
+            }
+        finally:
+            cursor.close()
+            conn.close()
 
+    def resume_warehouse(self, warehouse: str = None):
+        warehouse = warehouse or self.router.get(INTERACTIVE).warehouse
+        conn = self._get_connection(use_admin=True)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"ALTER WAREHOUSE {warehouse} RESUME IF SUSPENDED")
+        finally:
+            cursor.close()
+            conn.close()
+
+    @traced("snowflake")
     def create_tenant_role(self, tenant_id: str) -> str:
         role_name = f"TENANT_{tenant_id.replace('-', '_').upper()}"
 
         conn = self._get_connection(use_admin=True)
         cursor = conn.cursor()
         try:
-            print(f"Creating role: {role_name}")
+            logger.info("Creating role %s", role_name)
             cursor.execute(f"CREATE ROLE IF NOT EXISTS {role_name}")
 
-            # Warehouse access
-            cursor.execute(
-                f"GRANT USAGE, OPERATE ON WAREHOUSE {self.warehouse} TO ROLE {role_name}"
-            )
+            # Warehouse access: loads (Fivetran) and dashboard queries
+            for warehouse in dict.fromkeys(
+                [self.warehouse, self.router.get(INTERACTIVE).warehouse]
+            ):
+                cursor.execute(
+                    f"GRANT USAGE, OPERATE ON WAREHOUSE {warehouse} TO ROLE {role_name}"
+                )
 
             # Database-level access (needed + create schema)
             cursor.execute(
@@ -101,12 +221,13 @@ class SnowflakeService:
             # Let the Fivetran user assume this tenant role
             cursor.execute(f"GRANT ROLE {role_name} TO USER {self.user}")
 
-            print(f"Role {role_name} created and granted successfully")
+            logger.info("Role %s created and granted", role_name)
             return role_name
         finally:
             cursor.close()
             conn.close()
 
+    @traced("snowflake")
     def create_entitlement_entry(self, tenant_id: str, role_name: str):
         """
         Creates entry in entitlements table mapping role to tenant_id.
@@ -116,15 +237,577 @@ class SnowflakeService:
         cursor = conn.cursor()
 
         try:
-            print(f"Creating entitlement entry for {role_name} -> {tenant_id}")
+            logger.info("Creating entitlement entry %s -> %s", role_name, tenant_id)
 
-            cursor.execute(f"""
+            # Bound and idempotent, so re-running tenant setup adds no duplicates
+            cursor.execute(
+                f"""
                 INSERT INTO {self.database}.{self.schema}.ENTITLEMENTS (role_name, tenant_id)
-                VALUES ('{role_name}', '{tenant_id}')
+                SELECT %s, %s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {self.database}.{self.schema}.ENTITLEMENTS
+                    WHERE role_name = %s AND tenant_id = %s
+                )
+            """,
+                (role_name, tenant_id, role_name, tenant_id),
+            )
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    @traced("snowflake")
+    def reconcile_entitlements(
+        self, entitlements: list, allow_empty: bool = False
+    ) -> dict:
+        """
+        Make ENTITLEMENTS hold exactly `entitlements` ([(role_name, tenant_id)],
+        see TenantService.list_entitlements).
+
+        The desired rows are bulk-loaded into a session temp table with one
+        bound INSERT, then a single MERGE inserts missing rows and deletes
+        orphans. Returns the number of rows inserted and deleted.
+
+        An empty `entitlements` would delete every row and lock all tenants
+        out, which is far more likely a failed read than intended, so it is
+        refused unless allow_empty is set.
+        """
+        entitlements = list(entitlements)
+        if not entitlements and not allow_empty:
+            raise ValueError(
+                "Refusing to reconcile ENTITLEMENTS to an empty set "
+                "(pass allow_empty=True to delete every row)"
+            )
+
+        table = f"{self.database}.{self.schema}.ENTITLEMENTS"
+        stage = f"{self.database}.{self.schema}.ENTITLEMENTS_STAGE"
+
+        conn = self._get_connection(use_admin=True)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(f"""
+                CREATE OR REPLACE TEMPORARY TABLE {stage} (
+                    role_name VARCHAR(255),
+                    tenant_id VARCHAR(36)
+                )
+            """)
+            if entitlements:
+                cursor.executemany(
+                    f"INSERT INTO {stage} (role_name, tenant_id) VALUES (%s, %s)",
+                    entitlements,
+                )
+
+            # Snowflake's MERGE has no WHEN NOT MATCHED BY SOURCE, so orphans
+            # are added to the source flagged for deletion
+            cursor.execute(f"""
+                MERGE INTO {table} t
+                USING (
+                    SELECT DISTINCT role_name, tenant_id, FALSE AS orphan
+                    FROM {stage}
+                    UNION ALL
+                    SELECT DISTINCT e.role_name, e.tenant_id, TRUE AS orphan
+                    FROM {table} e
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM {stage} s
+                        WHERE s.role_name = e.role_name AND s.tenant_id = e.tenant_id
+                    )
+                ) src
+                ON t.role_name = src.role_name AND t.tenant_id = src.tenant_id
+                WHEN MATCHED AND src.orphan THEN DELETE
+                WHEN NOT MATCHED THEN
+                    INSERT (role_name, tenant_id) VALUES (src.role_name, src.tenant_id)
+            """)
+
+            counts = dict(
+                zip([column[0] for column in cursor.description], cursor.fetchone())
+            )
+            result = {
+                "inserted": counts.get("number of rows inserted", 0),
+                "deleted": counts.get("number of rows deleted", 0),
+            }
+            logger.info(
+                "Entitlements reconciled: %s inserted, %s deleted",
+                result["inserted"],
+                result["deleted"],
+            )
+            return result
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    @traced("snowflake")
+    def refresh_secure_views(self, tenant_filter: str = None) -> dict:
+        """
+        Regenerate the shared secure views over every tenant source schema.
+
+        For each table found in the TINK_*/FORTNOX_* schemas there is one view
+        PUBLIC.<SOURCE>_<TABLE>_SECURE that UNION ALLs the table across all
+        tenant schemas, so one query serves every tenant. Schemas without a
+        tenant_id column (Fortnox) get it as a literal, resolved from
+        ENTITLEMENTS by the schema suffix.
+
+        tenant_filter (default settings.snowflake_tenant_filter) picks how rows
+        are restricted to the caller's tenant: "join" joins ENTITLEMENTS in the
+        view, "row_access_policy" attaches TENANT_ROW_ACCESS to the view.
+
+        Each view carries a fingerprint of its definition in its comment and
+        is only replaced when the set of schemas or columns changed, so this
+        is cheap to call after every tenant provisioning or sync.
+        """
+        tenant_filter = tenant_filter or settings.snowflake_tenant_filter
+        if tenant_filter not in ("join", "row_access_policy"):
+            raise ValueError(f"Unknown tenant filter: {tenant_filter}")
+
+        conn = self._get_connection(use_admin=True)
+        cursor = conn.cursor()
+
+        try:
+            entitlements = f"{self.database}.{self.schema}.ENTITLEMENTS"
+            tenants, tables = self._secure_view_sources(cursor)
+
+            if tenant_filter == "row_access_policy":
+                self._ensure_row_access_policy(cursor)
+                entitlements = None
+
+            cursor.execute(f"""
+                SELECT table_name, comment
+                FROM {self.database}.INFORMATION_SCHEMA.VIEWS
+                WHERE table_schema = '{self.schema}'
             """)
+            existing = {name: comment for name, comment in cursor.fetchall()}
 
-            print(f"Entitlement entry created")
+            created, unchanged = [], []
+            for (source, table), schemas in sorted(tables.items()):
+                view = f"{source}_{table}_SECURE"
+                body = secure_view_sql(
+                    self.database, table, schemas, tenants, entitlements
+                )
+                if body is None:
+                    continue
+
+                # The policy is attached in the CREATE itself, so a view is
+                # never left in place without it
+                policy = ""
+                if tenant_filter == "row_access_policy":
+                    policy = (
+                        f"WITH ROW ACCESS POLICY {self._policy_name()} ON (tenant_id)"
+                    )
+                comment = (
+                    SECURE_VIEW_COMMENT_PREFIX
+                    + hashlib.sha256((policy + body).encode()).hexdigest()[:16]
+                )
+                if existing.get(view) == comment:
+                    unchanged.append(view)
+                    continue
+
+                logger.info(
+                    "Creating secure view %s over %s schemas", view, len(schemas)
+                )
+                cursor.execute(f"""
+                    CREATE OR REPLACE SECURE VIEW {self.database}.{self.schema}.{view}
+                    {policy}
+                    COPY GRANTS
+                    COMMENT = '{comment}'
+                    AS {body}
+                """)
+                created.append(view)
+
+            logger.info(
+                "Secure views: %s created, %s unchanged", len(created), len(unchanged)
+            )
+            return {"created": created, "unchanged": unchanged}
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _secure_view_sources(self, cursor):
+        """
+        Tenants by schema suffix ({"0973369A": tenant_id}) and the tables of
+        all tenant source schemas ({(source, table): {schema: [columns]}}).
+        """
+        cursor.execute(
+            f"SELECT DISTINCT tenant_id FROM {self.database}.{self.schema}.ENTITLEMENTS"
+        )
+        tenants = tenants_by_schema_suffix(row[0] for row in cursor.fetchall())
+
+        prefixes = " OR ".join(
+            f"STARTSWITH(c.table_schema, '{source}_')" for source in SECURE_VIEW_SOURCES
+        )
+        cursor.execute(f"""
+            SELECT c.table_schema, c.table_name, c.column_name
+            FROM {self.database}.INFORMATION_SCHEMA.COLUMNS c
+            JOIN {self.database}.INFORMATION_SCHEMA.TABLES t
+                ON t.table_schema = c.table_schema
+                AND t.table_name = c.table_name
+            WHERE t.table_type = 'BASE TABLE' AND ({prefixes})
+            ORDER BY c.table_schema, c.table_name, c.ordinal_position
+        """)
+
+        tables = {}
+        for schema, table, column in cursor.fetchall():
+            source = schema.split("_", 1)[0]
+            tables.setdefault((source, table), {}).setdefault(schema, []).append(column)
+        return tenants, tables
+
+    def _policy_name(self) -> str:
+        return f"{self.database}.{self.schema}.{TENANT_ROW_ACCESS_POLICY}"
+
+    def _ensure_row_access_policy(self, cursor):
+        """
+        Create or update the row access policy backed by ENTITLEMENTS.
+        A row is visible when the current role is entitled to its tenant_id;
+        the admin role sees everything.
+        """
+        body = f"""
+            CURRENT_ROLE() = '{self.admin_role}'
+            OR EXISTS (
+                SELECT 1 FROM {self.database}.{self.schema}.ENTITLEMENTS e
+                WHERE e.role_name = CURRENT_ROLE() AND e.tenant_id = row_tenant_id
+            )
+        """
+        cursor.execute(f"""
+            CREATE ROW ACCESS POLICY IF NOT EXISTS {self._policy_name()}
+            AS (row_tenant_id VARCHAR) RETURNS BOOLEAN -> {body}
+        """)
+        # IF NOT EXISTS keeps an attached policy; keep its body current
+        cursor.execute(
+            f"ALTER ROW ACCESS POLICY {self._policy_name()} SET BODY -> {body}"
+        )
+
+    @traced("snowflake")
+    def cluster_by_tenant(self, min_rows: int = CLUSTER_MIN_ROWS) -> list:
+        """
+        Add CLUSTER BY (tenant_id) to large shared tables in the tenant source
+        schemas (e.g. a fleet-mode Tink schema holding many tenants), so queries
+        filtered to one tenant prune micro-partitions. Returns the tables changed.
+        """
+        conn = self._get_connection(use_admin=True)
+        cursor = conn.cursor()
+
+        try:
+            prefixes = " OR ".join(
+                f"STARTSWITH(t.table_schema, '{source}_')"
+                for source in SECURE_VIEW_SOURCES
+            )
+            cursor.execute(f"""
+                SELECT t.table_schema, t.table_name
+                FROM {self.database}.INFORMATION_SCHEMA.TABLES t
+                JOIN {self.database}.INFORMATION_SCHEMA.COLUMNS c
+                    ON c.table_schema = t.table_schema
+                    AND c.table_name = t.table_name
+                    AND c.column_name = 'TENANT_ID'
+                WHERE t.table_type = 'BASE TABLE'
+                    AND t.clustering_key IS NULL
+                    AND t.row_count >= {int(min_rows)}
+                    AND ({prefixes})
+            """)
+
+            clustered = []
+            for schema, table in cursor.fetchall():
+                name = f'{self.database}."{schema}"."{table}"'
+                logger.info("Clustering %s by tenant_id", name)
+                cursor.execute(f"ALTER TABLE {name} CLUSTER BY (tenant_id)")
+                clustered.append(f"{schema}.{table}")
+            return clustered
 
         finally:
             cursor.close()
             conn.close()
+
+    def backfill_daily_summaries(self) -> dict:
+        """
+        Build DAILY_SUMMARY from TRANSACTIONS in every Tink schema.
+
+        The connector only emits summary rows for days it fetches, so history
+        synced before the table existed has none. This MERGEs the full
+        aggregate (inflow, outflow, count per account, booked date and
+        currency) over it; days the connector already summarized get the same
+        values. Schemas whose DAILY_SUMMARY the connector has not created yet
+        are skipped, run again after their next sync.
+        """
+        conn = self._get_connection(use_admin=True)
+        cursor = conn.cursor()
+
+        try:
+            _, tables = self._secure_view_sources(cursor)
+            transactions = tables.get(("TINK", "TRANSACTIONS"), {})
+            summaries = tables.get(("TINK", "DAILY_SUMMARY"), {})
+
+            backfilled, skipped = {}, []
+            for schema in sorted(transactions):
+                if schema not in summaries:
+                    skipped.append(schema)
+                    continue
+                columns = summaries[schema]
+                source = f'{self.database}."{schema}"'
+                deleted = (
+                    "AND NOT _FIVETRAN_DELETED"
+                    if "_FIVETRAN_DELETED" in transactions[schema]
+                    else ""
+                )
+                system = {
+                    column: value
+                    for column, value in (
+                        ("_FIVETRAN_SYNCED", "CURRENT_TIMESTAMP()"),
+                        ("_FIVETRAN_DELETED", "FALSE"),
+                    )
+                    if column in columns
+                }
+                updates = "".join(
+                    f", {column} = {value}" for column, value in system.items()
+                )
+                insert_columns = "".join(f", {column}" for column in system)
+                insert_values = "".join(f", {value}" for value in system.values())
+
+                cursor.execute(f"""
+                    MERGE INTO {source}.DAILY_SUMMARY s
+                    USING (
+                        SELECT
+                            tenant_id,
+                            account_id,
+                            booked_date AS summary_date,
+                            currency,
+                            SUM(IFF(amount >= 0, amount, 0)) AS inflow,
+                            SUM(IFF(amount < 0, -amount, 0)) AS outflow,
+                            COUNT(*) AS transaction_count
+                        FROM {source}.TRANSACTIONS
+                        WHERE booked_date IS NOT NULL AND amount IS NOT NULL {deleted}
+                        GROUP BY tenant_id, account_id, booked_date, currency
+                    ) t
+                    ON s.tenant_id = t.tenant_id
+                        AND s.account_id = t.account_id
+                        AND s.summary_date = t.summary_date
+                        AND s.currency = t.currency
+                    WHEN MATCHED THEN UPDATE SET
+                        inflow = t.inflow,
+                        outflow = t.outflow,
+                        transaction_count = t.transaction_count{updates}
+                    WHEN NOT MATCHED THEN INSERT (
+                        tenant_id, account_id, summary_date, currency,
+                        inflow, outflow, transaction_count{insert_columns}
+                    ) VALUES (
+                        t.tenant_id, t.account_id, t.summary_date, t.currency,
+                        t.inflow, t.outflow, t.transaction_count{insert_values}
+                    )
+                """)
+                inserted, updated = cursor.fetchone()
+                backfilled[schema] = {"inserted": inserted, "updated": updated}
+                logger.info(
+                    "Daily summaries for %s: %s inserted, %s updated",
+                    schema,
+                    inserted,
+                    updated,
+                )
+            return {"backfilled": backfilled, "skipped": skipped}
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    @traced("snowflake")
+    def reconcile_schema_grants(
+        self, role: str = None, dry_run: bool = False, workers: int = GRANT_WORKERS
+    ) -> dict:
+        """
+        Make sure `role` (default: the admin role) can read every tenant source
+        schema: USAGE on the schema, SELECT on its tables and on future tables.
+
+        Current grants are read in bulk (one SHOW SCHEMAS, one TABLES query,
+        one SHOW GRANTS and one SHOW FUTURE GRANTS), so only missing grants
+        are issued. They are applied over `workers` admin sessions in
+        parallel. With dry_run the missing grants are only reported.
+        """
+        role = role or self.admin_role
+
+        conn = self._get_connection(use_admin=True)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(f"SHOW SCHEMAS IN DATABASE {self.database}")
+            prefixes = tuple(f"{source}_" for source in SECURE_VIEW_SOURCES)
+            schemas = [
+                row["name"]
+                for row in fetch_dicts(cursor)
+                if row["name"].startswith(prefixes)
+            ]
+
+            cursor.execute(f"""
+                SELECT table_schema, table_name
+                FROM {self.database}.INFORMATION_SCHEMA.TABLES
+                WHERE table_type = 'BASE TABLE'
+            """)
+            tables = {}
+            for schema, table in cursor.fetchall():
+                tables.setdefault(schema, []).append(table)
+
+            # (privilege, object type, name) the role already holds
+            cursor.execute(f"SHOW GRANTS TO ROLE {role}")
+            granted = {
+                (row["privilege"], row["granted_on"], row["name"])
+                for row in fetch_dicts(cursor)
+            }
+            cursor.execute(f"SHOW FUTURE GRANTS TO ROLE {role}")
+            future = {
+                (row["privilege"], row["grant_on"], row["name"])
+                for row in fetch_dicts(cursor)
+            }
+        finally:
+            cursor.close()
+            conn.close()
+
+        def holds(privilege, object_type, name):
+            # Owning an object implies every privilege on it
+            return (privilege, object_type, name) in granted or (
+                ("OWNERSHIP", object_type, name) in granted
+            )
+
+        missing = []
+        for schema in schemas:
+            name = f"{self.database}.{schema}"
+            if not holds("USAGE", "SCHEMA", name):
+                missing.append(f"GRANT USAGE ON SCHEMA {name} TO ROLE {role}")
+            if any(
+                not holds("SELECT", "TABLE", f"{name}.{table}")
+                for table in tables.get(schema, [])
+            ):
+                missing.append(
+                    f"GRANT SELECT ON ALL TABLES IN SCHEMA {name} TO ROLE {role}"
+                )
+            if ("SELECT", "TABLE", f"{name}.<TABLE>") not in future:
+                missing.append(
+                    f"GRANT SELECT ON FUTURE TABLES IN SCHEMA {name} TO ROLE {role}"
+                )
+
+        logger.info("Grants: %s schemas, %s grants missing", len(schemas), len(missing))
+        report = {"schemas": len(schemas), "missing": missing, "failed": []}
+        if dry_run or not missing:
+            return report
+
+        report["failed"] = self._execute_concurrently(missing, workers)
+        return report
+
+    def _execute_concurrently(self, statements: list, workers: int) -> list:
+        """
+        Run independent statements over up to `workers` admin sessions.
+        Returns (statement, error) for each statement that failed.
+        """
+        workers = max(1, min(workers, len(statements)))
+        chunks = [statements[i::workers] for i in range(workers)]
+
+        def run(chunk):
+            failed = []
+            conn = self._get_connection(use_admin=True)
+            cursor = conn.cursor()
+            try:
+                for statement in chunk:
+                    try:
+                        cursor.execute(statement)
+                    except Exception as e:
+                        failed.append((statement, str(e)))
+            finally:
+                cursor.close()
+                conn.close()
+            return failed
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return [failure for failed in pool.map(run, chunks) for failure in failed]
+
+
+def tenants_by_schema_suffix(tenant_ids) -> dict:
+    """
+    {schema suffix: tenant_id}, where the suffix is the first 8 hex digits of
+    the tenant id (FORTNOX_0973369A). Suffixes shared by several tenants map
+    to None: their schemas cannot be attributed and must not be exposed.
+    """
+    tenants = {}
+    for tenant_id in tenant_ids:
+        suffix = tenant_id.replace("-", "_")[:8].upper()
+        if suffix not in tenants:
+            tenants[suffix] = tenant_id
+        elif tenants[suffix] not in (None, tenant_id):
+            logger.error(
+                "Tenants %s and %s share schema suffix %s",
+                tenants[suffix],
+                tenant_id,
+                suffix,
+            )
+            tenants[suffix] = None
+    return tenants
+
+
+def secure_view_sql(
+    database: str, table: str, schemas: dict, tenants: dict, entitlements: str = None
+):
+    """
+    SELECT for one secure view: `table` from every schema in `schemas`
+    ({schema: [columns]}), aligned to the union of their columns.
+    With `entitlements` the rows are filtered by joining that table on the
+    current role; without it filtering is left to a row access policy.
+    `tenants` comes from tenants_by_schema_suffix; schemas without a
+    TENANT_ID column whose suffix is unknown or ambiguous are left out.
+    Returns None if no schema can be attributed to a tenant.
+    """
+    columns = []
+    for schema_columns in schemas.values():
+        for column in schema_columns:
+            if column not in columns:
+                columns.append(column)
+    if "TENANT_ID" not in columns:
+        columns.insert(0, "TENANT_ID")
+
+    selects = []
+    for schema, schema_columns in sorted(schemas.items()):
+        present = set(schema_columns)
+        tenant_id = None
+        if "TENANT_ID" not in present:
+            suffix = schema.split("_", 1)[1]
+            tenant_id = tenants.get(suffix)
+            if suffix in tenants and tenant_id is None:
+                logger.error(
+                    "Skipping %s.%s: schema suffix matches more than one tenant",
+                    schema,
+                    table,
+                )
+                continue
+            if not tenant_id:
+                # Never expose rows we cannot attribute to a tenant
+                logger.warning("Skipping %s.%s: no tenant for schema", schema, table)
+                continue
+
+        expressions = []
+        for column in columns:
+            if column in present:
+                expressions.append(f'"{column}"')
+            elif column == "TENANT_ID":
+                expressions.append(f"'{tenant_id}' AS TENANT_ID")
+            else:
+                expressions.append(f'NULL AS "{column}"')
+        selects.append(
+            f'SELECT {", ".join(expressions)} FROM {database}."{schema}"."{table}"'
+        )
+
+    if not selects:
+        return None
+
+    union = "\n    UNION ALL\n    ".join(selects)
+    if entitlements is None:
+        return union
+    return (
+        f"SELECT u.*\nFROM (\n    {union}\n) u\n"
+        f"JOIN {entitlements} e ON e.tenant_id = u.tenant_id\n"
+        f"WHERE e.role_name = CURRENT_ROLE()"
+    )
+
+
+def fetch_dicts(cursor) -> list:
+    """Rows of the last statement as dicts keyed by column name (for SHOW output)."""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def is_missing_object(error: Exception) -> bool:
+    """True for the Snowflake error raised when a table or view does not exist."""
+    return getattr(error, "errno", None) == OBJECT_DOES_NOT_EXIST
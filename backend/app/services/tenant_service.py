@@ -1,9 +1,8 @@
 import uuid
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from datetime import datetime
 from typing import Optional
 from app.core.config import settings
+from app.core.instrumentation import traced
 
 
 class TenantService:
@@ -11,8 +10,17 @@ class TenantService:
         self.db_url = settings.database_url
 
     def _get_connection(self):
+        # Imported on first use, not at app startup
+        import psycopg2
+
         return psycopg2.connect(self.db_url)
 
+    def _dict_cursor(self, conn):
+        from psycopg2.extras import RealDictCursor
+
+        return conn.cursor(cursor_factory=RealDictCursor)
+
+    @traced("postgres")
     def create_tenant(
         self, company_name: Optional[str], clerk_user_id: str, email: str
     ) -> dict:
@@ -25,7 +33,7 @@ class TenantService:
         snowflake_role = f"TENANT_{tenant_id.replace('-', '_').upper()}"
 
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             # Insert tenant record
@@ -62,10 +70,11 @@ class TenantService:
             cursor.close()
             conn.close()
 
+    @traced("postgres")
     def get_tenant_by_clerk_id(self, clerk_user_id: str) -> Optional[dict]:
         """Fetch tenant by Clerk user ID."""
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             cursor.execute(
@@ -82,10 +91,11 @@ class TenantService:
             cursor.close()
             conn.close()
 
+    @traced("postgres")
     def get_tenant_by_id(self, tenant_id: str) -> Optional[dict]:
         """Fetch tenant by tenant_id."""
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             cursor.execute(
@@ -102,10 +112,11 @@ class TenantService:
             cursor.close()
             conn.close()
 
+    @traced("postgres")
     def update_company_name(self, tenant_id: str, company_name: str) -> Optional[dict]:
         """Update company name during onboarding."""
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             cursor.execute(
@@ -127,10 +138,11 @@ class TenantService:
             cursor.close()
             conn.close()
 
+    @traced("postgres")
     def update_onboarding_state(self, tenant_id: str, state: str) -> Optional[dict]:
         """Update tenant onboarding state."""
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             cursor.execute(
@@ -152,10 +164,11 @@ class TenantService:
             cursor.close()
             conn.close()
 
+    @traced("postgres")
     def mark_data_ready(self, tenant_id: str) -> Optional[dict]:
         """Mark tenant data as ready after Fivetran sync completes."""
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             cursor.execute(
@@ -177,12 +190,13 @@ class TenantService:
             cursor.close()
             conn.close()
 
+    @traced("postgres")
     def update_fivetran_ids(
         self, tenant_id: str, group_id: str, connector_id: str
     ) -> Optional[dict]:
         """Store Fivetran group and connector IDs for tenant."""
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             cursor.execute(
@@ -206,10 +220,11 @@ class TenantService:
             cursor.close()
             conn.close()
 
+    @traced("postgres")
     def get_tenant_by_connector_id(self, connector_id: str) -> Optional[dict]:
         """Fetch tenant by Fivetran connector ID."""
         conn = self._get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = self._dict_cursor(conn)
 
         try:
             cursor.execute(
@@ -225,3 +240,17 @@ class TenantService:
         finally:
             cursor.close()
             conn.close()
+
+    @traced("postgres")
+    def list_entitlements(self) -> list:
+        """(role_name, tenant_id) for every tenant, as ENTITLEMENTS should hold them."""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT snowflake_role, tenant_id FROM tenants")
+            return cursor.fetchall()
+
+        finally:
+            cursor.close()
+            conn.close()
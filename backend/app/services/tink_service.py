@@ -1,14 +1,19 @@
+import logging
 import httpx
 from typing import Optional
 from app.core.config import settings
+from app.core.instrumentation import traced
+
+logger = logging.getLogger(__name__)
 
 
 class TinkService:
     def __init__(self):
-        self.base_url = "https://api.tink.com/api/v1"
+        self.base_url = settings.tink_api_url
         self.client_id = settings.tink_client_id
         self.client_secret = settings.tink_client_secret
 
+    @traced("tink")
     async def get_client_access_token(
         self, scope: str = "user:create"
     ) -> Optional[str]:
@@ -25,11 +30,16 @@ class TinkService:
             )
 
             if response.status_code != 200:
-                print(f"Failed to get client token: {response.text}")
+                # Bodies only at DEBUG, like the other Tink responses
+                logger.warning(
+                    "Failed to get client token: HTTP %s", response.status_code
+                )
+                logger.debug("Client token response: %s", response.text)
                 return None
 
             return response.json()["access_token"]
 
+    @traced("tink")
     async def create_tink_user(
         self, external_user_id: str, market: str = "SE"
     ) -> Optional[dict]:
@@ -37,21 +47,17 @@ class TinkService:
         Create Tink user for tenant.
         external_user_id should be tenant_id.
         """
-        print(f"Getting client token for user creation...")
         token = await self.get_client_access_token(scope="user:create")
         if not token:
-            print("Failed to get client token")
             return None
 
-        print(f"Client token obtained: {token[:20]}...")
-
         async with httpx.AsyncClient() as client:
             payload = {
                 "external_user_id": external_user_id,
                 "market": market,
                 "locale": "en_US",
             }
-            print(f"Creating Tink user with payload: {payload}")
+            logger.info("Creating Tink user for %s", external_user_id)
 
             response = await client.post(
                 f"{self.base_url}/user/create",
@@ -62,15 +68,19 @@ class TinkService:
                 json=payload,
             )
 
-            print(f"Create user response status: {response.status_code}")
-            print(f"Create user response body: {response.text}")
+            logger.debug(
+                "Create user response %s: %s", response.status_code, response.text
+            )
 
             if response.status_code != 200:
-                print(f"Failed to create user: {response.text}")
+                logger.warning(
+                    "Failed to create Tink user: HTTP %s", response.status_code
+                )
                 return None
 
             return response.json()
 
+    @traced("tink")
     async def generate_authorization_code(
         self,
         external_user_id: str,
@@ -80,7 +90,6 @@ class TinkService:
         """Generate authorization code for user to access Tink Link."""
         token = await self.get_client_access_token(scope="authorization:grant")
         if not token:
-            print("Failed to get client token for auth grant")
             return None
 
         # id_hint is typically the user's email or username
@@ -103,11 +112,12 @@ class TinkService:
                 },
             )
 
-            print(f"Auth code response status: {response.status_code}")
-            print(f"Auth code response body: {response.text}")
+            logger.debug(
+                "Auth code response %s: %s", response.status_code, response.text
+            )
 
             if response.status_code != 200:
-                print(f"Failed to get auth code: {response.text}")
+                logger.warning("Failed to get auth code: HTTP %s", response.status_code)
                 return None
 
             return response.json()["code"]
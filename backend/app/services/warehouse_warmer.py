@@ -0,0 +1,240 @@
+"""
+Warehouse and session warm-up.
+
+ArrivalModel learns when each tenant role queries Snowflake: arrivals are
+counted per hour of the week (UTC) with older weeks decayed, so a tenant's
+business hours show up in its local time without storing a timezone.
+
+WarehouseWarmer uses it:
+- on startup, it opens pooled sessions for the roles expected now (or the
+  most active ones) and checks them with SELECT 1, which needs no warehouse;
+- every warmup_interval_seconds, it looks warmup_lead_minutes ahead. For
+  roles expected to query, it opens a pooled session. If any traffic is
+  expected and the warehouse is suspended, it resumes it so the first
+  request does not pay the resume.
+
+A resume is billed for at least a minute and then until the warehouse
+auto-suspends, so each one is counted with its estimated credits. stats()
+reports that cost next to how many prewarmed sessions requests used.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from app.core.telemetry import WAREHOUSE_CREDITS_PER_HOUR
+from app.services.workload_router import INTERACTIVE
+
+HOURS_PER_WEEK = 168
+# Weight kept by last week's arrivals when a new week starts
+WEEKLY_DECAY = 0.7
+# Snowflake bills at least this many seconds per resume
+MIN_BILLED_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+def hour_of_week(when: datetime) -> int:
+    return when.weekday() * 24 + when.hour
+
+
+def week_number(when: datetime) -> int:
+    return int(when.timestamp() // (HOURS_PER_WEEK * 3600))
+
+
+class ArrivalModel:
+    """Decayed arrival counts per role and hour of the week."""
+
+    def __init__(self, decay: float = WEEKLY_DECAY):
+        self.decay = decay
+        self.lock = threading.Lock()
+        # role -> {hour_of_week: [count, week]}
+        self.buckets = {}
+
+    def record(self, role: str, when: datetime = None):
+        when = when or datetime.now(timezone.utc)
+        hour, week = hour_of_week(when), week_number(when)
+        with self.lock:
+            bucket = self.buckets.setdefault(role, {}).setdefault(hour, [0.0, week])
+            bucket[0] = bucket[0] * self.decay ** (week - bucket[1]) + 1
+            bucket[1] = week
+
+    def expected(self, role: str, when: datetime) -> float:
+        """Expected arrivals for `role` in the hour containing `when`."""
+        week = week_number(when)
+        with self.lock:
+            bucket = self.buckets.get(role, {}).get(hour_of_week(when))
+            if bucket is None:
+                return 0.0
+            count, last_week = bucket
+        # A decayed sum over weeks; (1 - decay) turns it into a weekly rate
+        return count * self.decay ** max(week - last_week, 0) * (1 - self.decay)
+
+    def expected_roles(self, when: datetime, min_arrivals: float) -> list:
+        """Roles expected to make at least `min_arrivals` requests, busiest first."""
+        with self.lock:
+            roles = list(self.buckets)
+        expected = [(self.expected(role, when), role) for role in roles]
+        return [
+            role
+            for arrivals, role in sorted(expected, reverse=True)
+            if arrivals >= min_arrivals
+        ]
+
+    def busiest_roles(self) -> list:
+        with self.lock:
+            totals = {
+                role: sum(count for count, _ in hours.values())
+                for role, hours in self.buckets.items()
+            }
+        return sorted(totals, key=totals.get, reverse=True)
+
+    def save(self, path: str):
+        with self.lock:
+            state = json.dumps({"decay": self.decay, "buckets": self.buckets})
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(state)
+        os.replace(tmp, path)
+
+    def load(self, path: str):
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            state = json.load(f)
+        with self.lock:
+            self.buckets = {
+                role: {int(hour): bucket for hour, bucket in hours.items()}
+                for role, hours in state["buckets"].items()
+            }
+
+
+class WarehouseWarmer:
+    def __init__(
+        self,
+        snowflake_service,
+        interval_seconds: float,
+        lead_minutes: float,
+        min_arrivals: float,
+        max_roles: int,
+        state_path: str = "",
+    ):
+        self.snowflake = snowflake_service
+        self.arrivals = snowflake_service.arrivals
+        self.pool = snowflake_service.router.get(INTERACTIVE).pool
+        self.interval_seconds = interval_seconds
+        self.lead = timedelta(minutes=lead_minutes)
+        self.min_arrivals = min_arrivals
+        self.max_roles = max_roles
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        self.counts = {
+            "runs": 0,
+            "sessions_opened": 0,
+            "warehouse_checks": 0,
+            "warehouse_resumes": 0,
+            "estimated_credits": 0.0,
+            "errors": 0,
+        }
+        self.last_run = None
+
+    def warm_up(self):
+        """Startup: open sessions for the roles expected now, else the busiest."""
+        if self.state_path:
+            try:
+                self.arrivals.load(self.state_path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Could not load arrival model: %s", e)
+        now = datetime.now(timezone.utc)
+        roles = self.arrivals.expected_roles(now, self.min_arrivals)
+        if not roles:
+            roles = self.arrivals.busiest_roles()
+        self._open_sessions(roles[: self.max_roles])
+
+    def keep_warm(self, now: datetime = None):
+        """One scheduler pass: warm what is expected within the lead time."""
+        now = now or datetime.now(timezone.utc)
+        self.pool.prune()
+        ahead = now + self.lead
+        roles = []
+        for when in (now, ahead):
+            for role in self.arrivals.expected_roles(when, self.min_arrivals):
+                if role not in roles:
+                    roles.append(role)
+        roles = roles[: self.max_roles]
+        self._open_sessions(roles)
+
+        # Recent traffic means the warehouse is running anyway
+        idle = self.pool.seconds_since_checkout()
+        if roles and (idle is None or idle > MIN_BILLED_SECONDS):
+            self._resume_warehouse()
+
+        if self.state_path:
+            self.arrivals.save(self.state_path)
+        with self.lock:
+            self.counts["runs"] += 1
+            self.last_run = now.isoformat()
+
+    def _open_sessions(self, roles: list):
+        for role in roles:
+            try:
+                opened = self.pool.prefill(role, 1)
+            except Exception as e:
+                logger.warning("Could not prewarm session for %s: %s", role, e)
+                with self.lock:
+                    self.counts["errors"] += 1
+                continue
+            with self.lock:
+                self.counts["sessions_opened"] += opened
+
+    def _resume_warehouse(self):
+        try:
+            state = self.snowflake.warehouse_state()
+            with self.lock:
+                self.counts["warehouse_checks"] += 1
+            if state is None or state["state"] != "SUSPENDED":
+                return
+            self.snowflake.resume_warehouse()
+        except Exception as e:
+            logger.warning("Warehouse keep-warm failed: %s", e)
+            with self.lock:
+                self.counts["errors"] += 1
+            return
+
+        billed = max(state["auto_suspend"] or 0, MIN_BILLED_SECONDS)
+        credits = WAREHOUSE_CREDITS_PER_HOUR.get(state["size"], 0) * billed / 3600
+        logger.info(
+            "Resumed warehouse %s ahead of expected traffic (~%.4f credits)",
+            self.snowflake.router.get(INTERACTIVE).warehouse,
+            credits,
+        )
+        with self.lock:
+            self.counts["warehouse_resumes"] += 1
+            self.counts["estimated_credits"] += credits
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = {**self.counts, "last_run": self.last_run}
+        stats["estimated_credits"] = round(stats["estimated_credits"], 6)
+        stats["pool"] = self.pool.stats()
+        return stats
+
+    async def run(self):
+        """Background task: warm up once, then keep warm every interval."""
+        try:
+            await asyncio.to_thread(self.warm_up)
+        except Exception as e:
+            logger.warning("Warm-up failed: %s", e)
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.keep_warm)
+            except Exception as e:
+                logger.warning("Keep-warm pass failed: %s", e)
+            logger.debug(
+                "Keep-warm pass took %.1f ms", (time.perf_counter() - started) * 1000
+            )
@@ -0,0 +1,80 @@
+"""
+Workload classes for Snowflake sessions.
+
+Fivetran loads run on the Fivetran user's warehouse (settings.
+snowflake_warehouse). The API's own sessions are split into classes so
+dashboards do not queue behind loads or maintenance work:
+- interactive: tenant metric queries behind the dashboard
+- heavy: bulk reads such as inventory scans and query-history collection
+- admin: provisioning, grants and view/policy DDL
+
+Each class has its own warehouse (empty setting: the default warehouse),
+statement timeout (STATEMENT_TIMEOUT_IN_SECONDS on its sessions) and session
+pool. The class is also written to each session's QUERY_TAG when it is
+opened, which is how queue times in QUERY_HISTORY are attributed back to it.
+"""
+
+INTERACTIVE = "interactive"
+HEAVY = "heavy"
+ADMIN = "admin"
+WORKLOADS = (INTERACTIVE, HEAVY, ADMIN)
+
+
+class Workload:
+    def __init__(
+        self,
+        name: str,
+        warehouse: str,
+        statement_timeout_seconds: int,
+        pool_max_idle: int,
+    ):
+        self.name = name
+        self.warehouse = warehouse
+        self.statement_timeout_seconds = statement_timeout_seconds
+        # Idle sessions kept per pool key (a tenant role for interactive)
+        self.pool_max_idle = pool_max_idle
+        # Set by SnowflakeService
+        self.pool = None
+
+
+class WorkloadRouter:
+    def __init__(self, workloads: list):
+        self.workloads = {workload.name: workload for workload in workloads}
+
+    @classmethod
+    def from_settings(cls, settings) -> "WorkloadRouter":
+        return cls(
+            [
+                Workload(
+                    name,
+                    getattr(settings, f"snowflake_{name}_warehouse")
+                    or settings.snowflake_warehouse,
+                    getattr(settings, f"snowflake_{name}_timeout_seconds"),
+                    getattr(settings, f"snowflake_{name}_pool_max_idle"),
+                )
+                for name in WORKLOADS
+            ]
+        )
+
+    def get(self, name: str) -> Workload:
+        try:
+            return self.workloads[name]
+        except KeyError:
+            raise ValueError(f"Unknown workload: {name}") from None
+
+    def warehouses(self) -> dict:
+        """Warehouse name -> the workload classes routed to it."""
+        routed = {}
+        for workload in self.workloads.values():
+            routed.setdefault(workload.warehouse, []).append(workload.name)
+        return routed
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "warehouse": workload.warehouse,
+                "statement_timeout_seconds": workload.statement_timeout_seconds,
+                "pool": workload.pool.stats() if workload.pool else None,
+            }
+            for name, workload in self.workloads.items()
+        }
@@ -0,0 +1,18 @@
+from app.services.snowflake_service import SnowflakeService
+
+service = SnowflakeService()
+
+# Summaries for history synced before the connector emitted DAILY_SUMMARY
+report = service.backfill_daily_summaries()
+
+for schema, counts in report["backfilled"].items():
+    print(f"✓ {schema}: {counts['inserted']} inserted, {counts['updated']} updated")
+
+for schema in report["skipped"]:
+    print(f"⚠️  {schema}: no DAILY_SUMMARY table yet, run again after its next sync")
+
+# TINK_DAILY_SUMMARY_SECURE only exists once a DAILY_SUMMARY table does
+views = service.refresh_secure_views()
+print(f"\nSecure views: {len(views['created'])} created")
+
+print("\n✅ Done")
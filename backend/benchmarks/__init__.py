@@ -0,0 +1,13 @@
+"""
+Benchmarks and local stand-ins for external services.
+
+Run from the backend directory, e.g. `python -m benchmarks.fake_tink_api`.
+"""
+
+import sys
+from pathlib import Path
+
+# The Tink connector is deployed as a flat directory, not a package
+CONNECTOR_DIR = Path(__file__).resolve().parent.parent / "tink_connector"
+if str(CONNECTOR_DIR) not in sys.path:
+    sys.path.insert(0, str(CONNECTOR_DIR))
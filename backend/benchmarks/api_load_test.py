@@ -0,0 +1,422 @@
+"""
+End-to-end load test of the FastAPI app against local stand-ins.
+
+Starts the fake Fivetran and Tink APIs, builds a SQLite tenants store and a
+DuckDB warehouse (see benchmarks.local_backends), and serves app.main in a
+separate uvicorn process with the stand-ins installed, so the load generator
+does not share the app's GIL. Then runs the scripted scenarios:
+- signup: Clerk user.created webhook, company name, Fivetran setup and Tink
+  setup per user
+- dashboard: each page load requests every metrics endpoint of one tenant
+  concurrently
+- webhooks: a burst of Fivetran sync-status webhooks, some of them ending a
+  historical sync
+
+and reports, per scenario and endpoint, throughput and p50/p95/p99 latency.
+Results are appended to benchmarks/results/api_load.jsonl.
+
+Usage (from backend/):
+    python -m benchmarks.api_load_test
+    python -m benchmarks.api_load_test --scenario dashboard --tenants 50 \\
+        --requests 2000 --concurrency 64 --snowflake-latency-ms 150
+    python -m benchmarks.api_load_test --database-url postgresql://localhost/arcims
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from benchmarks import local_backends
+from benchmarks.connector_benchmark import git_commit
+from benchmarks.fake_fivetran_api import FakeFivetranConfig, FakeFivetranServer
+from benchmarks.fake_tink_api import FakeTinkConfig, FakeTinkServer
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+RESULTS_FILE = RESULTS_DIR / "api_load.jsonl"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = ("signup", "dashboard", "webhooks")
+DASHBOARD_ENDPOINTS = (
+    "dashboard-summary",
+    "cash-position",
+    "burn-rate",
+    "runway",
+    "recent-transactions",
+    "revenue-growth",
+    "gross-margin",
+)
+
+
+class Recorder:
+    """Latencies and errors per endpoint label."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method, url, **kw):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kw)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response, failed = None, True
+        self.latencies[label].append((time.perf_counter() - started) * 1000)
+        if failed:
+            self.errors[label] += 1
+        return response
+
+    def report(self, seconds: float) -> dict:
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            endpoints[label] = {
+                "requests": len(values),
+                "errors": self.errors[label],
+                **percentiles(values),
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "seconds": round(seconds, 2),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "requests_per_sec": round(total / seconds, 1) if seconds else 0,
+            "endpoints": endpoints,
+        }
+
+
+def percentiles(values: list) -> dict:
+    if len(values) < 2:
+        value = round(values[0], 1) if values else None
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 1),
+        "p95_ms": round(cuts[94], 1),
+        "p99_ms": round(cuts[98], 1),
+    }
+
+
+async def run_concurrently(count: int, concurrency: int, task):
+    """Run task(i) for i in range(count), at most `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(i):
+        async with semaphore:
+            await task(i)
+
+    await asyncio.gather(*(limited(i) for i in range(count)))
+
+
+async def signup_scenario(client, recorder: Recorder, args):
+    async def signup(i):
+        user_id = f"user_{uuid.uuid4().hex}"
+        response = await recorder.request(
+            client,
+            "POST /webhooks/clerk",
+            "POST",
+            "/api/webhooks/clerk",
+            json={
+                "type": "user.created",
+                "data": {
+                    "id": user_id,
+                    "primary_email_address_id": "email_1",
+                    "email_addresses": [
+                        {"id": "email_1", "email_address": f"{user_id}@example.com"}
+                    ],
+                },
+            },
+        )
+        if response is None or response.status_code >= 400:
+            return
+        tenant_id = response.json()["tenant_id"]
+        await recorder.request(
+            client,
+            "PATCH /tenants/{id}/company",
+            "PATCH",
+            f"/api/tenants/{tenant_id}/company",
+            params={"company_name": f"Load Test {i}"},
+        )
+        await recorder.request(
+            client,
+            "POST /fivetran/setup/{id}",
+            "POST",
+            f"/api/fivetran/setup/{tenant_id}",
+        )
+        await recorder.request(
+            client, "POST /tink/setup/{id}", "POST", f"/api/tink/setup/{tenant_id}"
+        )
+
+    await run_concurrently(args.requests, args.concurrency, signup)
+
+
+async def dashboard_scenario(client, recorder: Recorder, args):
+    async def page_load(i):
+        tenant_id = random.choice(args.tenant_ids)
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                recorder.request(
+                    client,
+                    f"GET /metrics/{{id}}/{endpoint}",
+                    "GET",
+                    f"/api/metrics/{tenant_id}/{endpoint}",
+                )
+                for endpoint in DASHBOARD_ENDPOINTS
+            )
+        )
+        recorder.latencies["page load"].append((time.perf_counter() - started) * 1000)
+
+    await run_concurrently(args.requests, args.concurrency, page_load)
+
+
+async def webhooks_scenario(client, recorder: Recorder, args):
+    async def webhook(i):
+        tenant = random.randrange(len(args.tenant_ids))
+        historical = random.random() < args.historical_share
+        event = "sync_end" if historical or i % 2 else "sync_start"
+        await recorder.request(
+            client,
+            f"POST /webhooks/fivetran/sync-status ({event})",
+            "POST",
+            "/api/webhooks/fivetran/sync-status",
+            json={
+                "event": event,
+                "data": {
+                    "id": f"connector_{tenant}",
+                    "status": {
+                        "sync_state": "scheduled" if event == "sync_end" else "syncing",
+                        "is_historical_sync": historical,
+                    },
+                    "succeeded_at": (
+                        datetime.utcnow().isoformat() if event == "sync_end" else None
+                    ),
+                },
+            },
+        )
+
+    await run_concurrently(args.requests, args.concurrency, webhook)
+
+
+async def run_scenario(name: str, base_url: str, args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency * len(DASHBOARD_ENDPOINTS))
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        started = time.perf_counter()
+        await SCENARIO_RUNNERS[name](client, recorder, args)
+        return recorder.report(time.perf_counter() - started)
+
+
+SCENARIO_RUNNERS = {
+    "signup": signup_scenario,
+    "dashboard": dashboard_scenario,
+    "webhooks": webhooks_scenario,
+}
+
+
+def write_private_key(path: str):
+    """Throwaway key: the app parses it for Snowflake key-pair auth."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def app_environment(workdir: str, fivetran_url: str, tink_url: str, args) -> dict:
+    key_path = os.path.join(workdir, "snowflake_key.p8")
+    write_private_key(key_path)
+    return {
+        **os.environ,
+        "DATABASE_URL": args.database_url or "sqlite-stand-in",
+        "CLERK_SECRET_KEY": "load-test",
+        "CLERK_WEBHOOK_SECRET": "load-test",
+        "SNOWFLAKE_ACCOUNT": "load-test",
+        "SNOWFLAKE_USER": "LOAD_TEST",
+        "SNOWFLAKE_PRIVATE_KEY_PATH": key_path,
+        "SNOWFLAKE_ADMIN_PRIVATE_KEY_PATH": key_path,
+        "SNOWFLAKE_DATABASE": local_backends.WAREHOUSE_DATABASE,
+        "SNOWFLAKE_SCHEMA": local_backends.WAREHOUSE_SCHEMA,
+        "FIVETRAN_AUTH_TOKEN": "load-test",
+        "FIVETRAN_API_URL": f"{fivetran_url}/v1",
+        "FORTNOX_CLIENT_ID": "load-test",
+        "FORTNOX_CLIENT_SECRET": "load-test",
+        "FORTNOX_SCOPES": "bookkeeping",
+        "TINK_CLIENT_ID": "load-test",
+        "TINK_CLIENT_SECRET": "load-test",
+        "TINK_API_URL": f"{tink_url}/api/v1",
+        "QUERY_HISTORY_INTERVAL_SECONDS": "0",
+        "LOG_LEVEL": args.log_level,
+    }
+
+
+def start_app(env: dict, port: int, workdir: str, args) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.api_load_test",
+        "--serve",
+        "--port",
+        str(port),
+        "--warehouse",
+        local_backends.warehouse_path(workdir),
+        "--snowflake-latency-ms",
+        str(args.snowflake_latency_ms),
+    ]
+    if not args.database_url:
+        command += ["--tenant-store", os.path.join(workdir, "tenants.db")]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("App server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("App server did not start")
+
+
+def serve(args):
+    """Entry point of the app process (--serve)."""
+    import uvicorn
+
+    local_backends.install(args.warehouse, args.tenant_store, args.snowflake_latency_ms)
+    from app.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def prepare_data(workdir: str, args) -> list:
+    """Seed tenants with warehouse data and Fivetran connectors."""
+    tenant_ids = [
+        str(uuid.UUID(int=random.getrandbits(128))) for _ in range(args.tenants)
+    ]
+    local_backends.create_warehouse(
+        local_backends.warehouse_path(workdir), tenant_ids, args.transactions
+    )
+    if not args.database_url:
+        store = os.path.join(workdir, "tenants.db")
+        local_backends.create_tenant_store(store)
+        local_backends.add_tenants(
+            store,
+            [
+                {"tenant_id": tenant_id, "fivetran_connector_id": f"connector_{i}"}
+                for i, tenant_id in enumerate(tenant_ids)
+            ],
+        )
+    return tenant_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with stand-ins")
+    parser.add_argument(
+        "--scenario", choices=SCENARIOS, action="append", help="Default: all"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=5000, help="Per tenant")
+    parser.add_argument("--historical-share", type=float, default=0.1)
+    parser.add_argument("--fivetran-latency-ms", type=float, default=50)
+    parser.add_argument("--tink-latency-ms", type=float, default=50)
+    parser.add_argument("--snowflake-latency-ms", type=float, default=0)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument(
+        "--database-url",
+        help="Use this Postgres for tenants (seeded by you) instead of SQLite",
+    )
+    # Internal: run the app process
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--warehouse", help=argparse.SUPPRESS)
+    parser.add_argument("--tenant-store", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args)
+
+    random.seed(args.seed)
+    scenarios = args.scenario or list(SCENARIOS)
+    fivetran = FakeFivetranServer(
+        FakeFivetranConfig(latency_ms=args.fivetran_latency_ms)
+    ).start()
+    tink = FakeTinkServer(FakeTinkConfig(latency_ms=args.tink_latency_ms)).start()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        args.tenant_ids = prepare_data(workdir, args)
+        port = free_port()
+        env = app_environment(workdir, fivetran.url, tink.url, args)
+        process = start_app(env, port, workdir, args)
+        try:
+            for name in scenarios:
+                results[name] = asyncio.run(
+                    run_scenario(name, f"http://127.0.0.1:{port}", args)
+                )
+                report_scenario(name, results[name])
+        finally:
+            process.terminate()
+            process.wait()
+            fivetran.stop()
+            tink.stop()
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    params = {key: value for key, value in vars(args).items() if key != "tenant_ids"}
+    record = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": git_commit(),
+        "params": params,
+        "results": results,
+    }
+    with open(RESULTS_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def report_scenario(name: str, result: dict):
+    print(
+        f"\n{name}: {result['requests']} requests in {result['seconds']}s "
+        f"({result['requests_per_sec']} req/s, {result['errors']} errors)"
+    )
+    for label, stats in result["endpoints"].items():
+        print(
+            f"  {label:52} {stats['requests']:>6}  {stats['errors']:>4} err  "
+            f"p50 {stats['p50_ms']:>8}  p95 {stats['p95_ms']:>8}  "
+            f"p99 {stats['p99_ms']:>8} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+End-to-end throughput benchmark for the Tink connector.
+
+Runs `update()` from tink_connector/connector.py against the fake Tink API
+(or in MOCK mode) for an initial sync followed by an incremental sync, and
+reports per phase:
+- rows/sec upserted
+- peak RSS of the sync process
+- HTTP calls made to the (fake) Tink API
+- checkpoint count, time spent checkpointing and state size
+
+Each phase runs in a fresh process so peak RSS is per phase. Results are
+appended to benchmarks/results/connector.jsonl. With --baseline the run is
+compared against a saved baseline and exits non-zero on a regression.
+
+Usage (from backend/):
+    python -m benchmarks.connector_benchmark --accounts 20 --transactions 500000
+    python -m benchmarks.connector_benchmark --mode mock --transactions 5000000
+    python -m benchmarks.connector_benchmark --save-baseline
+    python -m benchmarks.connector_benchmark --baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks import CONNECTOR_DIR
+from benchmarks.fake_tink_api import FakeTinkConfig, FakeTinkServer
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+RESULTS_FILE = RESULTS_DIR / "connector.jsonl"
+BASELINE_FILE = RESULTS_DIR / "connector_baseline.json"
+
+# Metrics where bigger is worse; everything else compared is "bigger is better"
+LOWER_IS_BETTER = {"peak_rss_mb", "http_calls", "checkpoint_seconds"}
+COMPARED_METRICS = ["rows_per_sec", "peak_rss_mb", "http_calls", "checkpoint_seconds"]
+
+
+class RecordingOperations:
+    """
+    Stands in for the SDK's Operations while benchmarking.
+    Counts upserts per table and times checkpoints (including the JSON
+    serialisation the SDK does), optionally writing rows to a local
+    DuckDB warehouse like connector.debug() does.
+    """
+
+    def __init__(self, warehouse_path: str = None):
+        self.rows = {}
+        self.checkpoints = 0
+        self.checkpoint_seconds = 0.0
+        self.state_bytes = 0
+        self.last_state = None
+        self.warehouse = None
+        self.pending = {}
+        if warehouse_path:
+            import duckdb
+
+            self.warehouse = duckdb.connect(warehouse_path)
+
+    def upsert(self, table: str, data: dict):
+        self.rows[table] = self.rows.get(table, 0) + 1
+        if self.warehouse is not None:
+            self.pending.setdefault(table, []).append(data)
+            if len(self.pending[table]) >= 10_000:
+                self._flush(table)
+
+    def update(self, table: str, modified: dict):
+        self.upsert(table, modified)
+
+    def delete(self, table: str, keys: dict):
+        self.rows[table] = self.rows.get(table, 0) + 1
+
+    def checkpoint(self, state: dict):
+        started = time.perf_counter()
+        for table in list(self.pending):
+            self._flush(table)
+        encoded = json.dumps(state)
+        self.checkpoint_seconds += time.perf_counter() - started
+        self.checkpoints += 1
+        self.state_bytes = len(encoded)
+        self.last_state = json.loads(encoded)
+
+    def _flush(self, table: str):
+        rows = self.pending.pop(table, [])
+        if not rows:
+            return
+        # Bulk load through a JSON file; row-by-row executemany is far too slow
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+            f.flush()
+            exists = self.warehouse.execute(
+                "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?",
+                [table],
+            ).fetchone()[0]
+            source = f"read_json_auto('{f.name}', format='newline_delimited')"
+            if exists:
+                self.warehouse.execute(
+                    f"INSERT INTO {table} BY NAME SELECT * FROM {source}"
+                )
+            else:
+                self.warehouse.execute(
+                    f"CREATE TABLE {table} AS SELECT * FROM {source}"
+                )
+
+
+def run_phase(configuration: dict, state: dict, warehouse_path: str, conn):
+    """Child process: run one update() and send back its measurements."""
+    import connector
+    from fivetran_connector_sdk import Logging
+
+    # Set by the SDK's runner in production; log calls fail while it is unset.
+    # WARNING keeps per-account progress lines out of the timing.
+    Logging.LOG_LEVEL = Logging.Level.WARNING
+
+    ops = RecordingOperations(warehouse_path)
+    connector.op = ops
+
+    started = time.perf_counter()
+    connector.update(configuration, state)
+    elapsed = time.perf_counter() - started
+
+    rows = sum(ops.rows.values())
+    conn.send(
+        {
+            "rows": rows,
+            "rows_by_table": ops.rows,
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0,
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+            "checkpoints": ops.checkpoints,
+            "checkpoint_seconds": round(ops.checkpoint_seconds, 4),
+            "state_bytes": ops.state_bytes,
+            "state": ops.last_state or state,
+        }
+    )
+    conn.close()
+
+
+def measure(configuration: dict, state: dict, warehouse_path: str, server) -> dict:
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe(duplex=False)
+    if server:
+        server.reset_stats()
+
+    process = context.Process(
+        target=run_phase, args=(configuration, state, warehouse_path, child)
+    )
+    process.start()
+    # Drop our copy of the sending end so recv() sees EOF if the child dies
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(
+            f"Benchmark phase exited without a result (exit code {process.exitcode})"
+        ) from None
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"Benchmark phase exited with code {process.exitcode}")
+
+    result["http_calls"] = server.stats()["total"] if server else 0
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=CONNECTOR_DIR,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def dataset_params(params: dict) -> dict:
+    """Parameters that change what is measured (not how results are handled)."""
+    ignored = {"baseline", "save_baseline", "tolerance"}
+    return {key: value for key, value in params.items() if key not in ignored}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return a line per metric that regressed beyond the tolerance."""
+    regressions = []
+    for phase, metrics in results.items():
+        for name in COMPARED_METRICS:
+            before = baseline.get(phase, {}).get(name)
+            after = metrics.get(name)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = (
+                change > tolerance if name in LOWER_IS_BETTER else -change > tolerance
+            )
+            if worse:
+                regressions.append(
+                    f"{phase}.{name}: {before} -> {after} ({change:+.1%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Tink connector")
+    parser.add_argument("--mode", choices=["api", "mock"], default="api")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--history-days", type=int, default=730)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--lookback-days",
+        type=int,
+        default=30,
+        help="History fetched by the first sync; the rest of --history-days "
+        "is backfilled",
+    )
+    parser.add_argument(
+        "--backfill-workers",
+        type=int,
+        default=4,
+        help="Backfill windows fetched in parallel; 0 fetches all history in "
+        "the first sync instead",
+    )
+    parser.add_argument("--warehouse", help="Also write rows to this local DuckDB file")
+    parser.add_argument("--baseline", action="store_true")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    configuration = {
+        "tenant_id": "00000000-0000-0000-0000-000000000000",
+        "tink_client_id": "benchmark",
+        "tink_client_secret": "benchmark",
+        "initial_lookback_days": str(args.history_days),
+    }
+
+    server = None
+    if args.mode == "mock":
+        configuration.update(
+            {
+                "tink_user_id": "MOCK",
+                "mock_accounts": str(args.accounts),
+                "mock_transactions": str(args.transactions),
+            }
+        )
+    else:
+        server = FakeTinkServer(
+            FakeTinkConfig(
+                accounts=args.accounts,
+                transactions=args.transactions,
+                history_days=args.history_days,
+                max_page_size=args.page_size,
+                latency_ms=args.latency_ms,
+                error_rate=args.error_rate,
+            )
+        ).start()
+        configuration.update(
+            {
+                "tink_user_id": "benchmark-user",
+                "tink_api_base_url": server.url,
+            }
+        )
+        if args.backfill_workers > 0:
+            backfill_start = datetime.utcnow() - timedelta(days=args.history_days)
+            configuration.update(
+                {
+                    "initial_lookback_days": str(args.lookback_days),
+                    "backfill_start_date": backfill_start.strftime("%Y-%m-%d"),
+                    "backfill_workers": str(args.backfill_workers),
+                }
+            )
+
+    try:
+        initial = measure(configuration, {}, args.warehouse, server)
+        incremental = measure(
+            configuration, initial.pop("state"), args.warehouse, server
+        )
+        incremental.pop("state")
+    finally:
+        if server:
+            server.stop()
+
+    results = {"initial": initial, "incremental": incremental}
+    for phase, metrics in results.items():
+        print(
+            f"{phase:12} {metrics['rows']:>10} rows  {metrics['seconds']:>8}s  "
+            f"{metrics['rows_per_sec']:>10} rows/s  {metrics['peak_rss_mb']:>7} MB  "
+            f"{metrics['http_calls']:>6} HTTP  {metrics['checkpoints']:>4} checkpoints "
+            f"({metrics['checkpoint_seconds']}s, {metrics['state_bytes']} B state)"
+        )
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    record = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": git_commit(),
+        "params": vars(args),
+        "results": results,
+    }
+    with open(RESULTS_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(record, indent=2))
+        print(f"Saved baseline to {BASELINE_FILE}")
+
+    if args.baseline:
+        baseline = json.loads(BASELINE_FILE.read_text())
+        if dataset_params(baseline["params"]) != dataset_params(record["params"]):
+            print("⚠️  Baseline was recorded with different parameters")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print("✓ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Local stand-in for the Fivetran REST API, for offline API load tests.
+
+Implements the endpoints FivetranService and the Tink routes call:
+- POST  /v1/groups
+- POST  /v1/destinations
+- POST  /v1/connectors (returns a Connect Card URI)
+- GET   /v1/connectors/{id}
+- PATCH /v1/connectors/{id}
+- POST  /v1/connectors/{id}/sync
+- GET   /v1/groups/{id}/connectors
+- POST  /v1/webhooks/group/{id}
+
+Objects are kept in memory. Latency and error injection are configurable.
+Request counts are served on GET /_stats and cleared with POST /_stats/reset.
+
+Usage (from backend/):
+    python -m benchmarks.fake_fivetran_api --latency-ms 80
+
+then set FIVETRAN_API_URL=http://127.0.0.1:8090/v1 for the API.
+"""
+
+import argparse
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+CONNECTOR_PATH = re.compile(r"^/v1/connectors/([^/]+)(/sync)?$")
+GROUP_CONNECTORS_PATH = re.compile(r"^/v1/groups/([^/]+)/connectors$")
+GROUP_WEBHOOK_PATH = re.compile(r"^/v1/webhooks/group/([^/]+)$")
+
+
+@dataclass
+class FakeFivetranConfig:
+    # Added to every response, plus uniform jitter
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Share of requests answered with a 500
+    error_rate: float = 0.0
+
+
+class FakeFivetranHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def api(self) -> "FakeFivetranServer":
+        return self.server.api
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        try:
+            return json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            return {}
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._body()
+        if path == "/_stats/reset":
+            self.api.reset_stats()
+            return self._send(200, {})
+        if not self._admit():
+            return
+
+        if path == "/v1/groups":
+            return self._send(200, {"data": self.api.create("group", body)})
+        if path == "/v1/destinations":
+            return self._send(200, {"data": self.api.create("destination", body)})
+        if path == "/v1/connectors":
+            return self._send(200, {"data": self.api.create_connector(body)})
+        match = CONNECTOR_PATH.match(path)
+        if match and match.group(2):
+            return self._send(200, {"code": "Success", "message": "Sync triggered"})
+        match = GROUP_WEBHOOK_PATH.match(path)
+        if match:
+            return self._send(200, {"data": self.api.create("webhook", body)})
+        self._send(404, {"code": "NotFound"})
+
+    def do_PATCH(self):
+        path = urlparse(self.path).path
+        body = self._body()
+        if not self._admit():
+            return
+
+        match = CONNECTOR_PATH.match(path)
+        connector = match and self.api.get("connector", match.group(1))
+        if not connector:
+            return self._send(404, {"code": "NotFound"})
+        connector.setdefault("config", {}).update(body.get("config", {}))
+        self._send(200, {"data": connector})
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/_stats":
+            return self._send(200, self.api.stats())
+        if not self._admit():
+            return
+
+        match = CONNECTOR_PATH.match(path)
+        if match:
+            connector = self.api.get("connector", match.group(1))
+            if not connector:
+                return self._send(404, {"code": "NotFound"})
+            return self._send(200, {"data": connector})
+        match = GROUP_CONNECTORS_PATH.match(path)
+        if match:
+            items = self.api.group_connectors(match.group(1))
+            return self._send(200, {"data": {"items": items}})
+        self._send(404, {"code": "NotFound"})
+
+    def _admit(self) -> bool:
+        """Apply latency and error injection. Returns False on an injected error."""
+        config = self.api.config
+        if config.latency_ms or config.jitter_ms:
+            time.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000)
+        if random.random() < config.error_rate:
+            self._send(500, {"code": "InternalError", "message": "Injected error"})
+            return False
+        return True
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.api.record(urlparse(self.path).path, status)
+
+
+class FakeFivetranServer:
+    """Fake Fivetran API on a background thread. Use as a context manager."""
+
+    def __init__(
+        self, config: FakeFivetranConfig = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        self.config = config or FakeFivetranConfig()
+        self.objects = {}
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), FakeFivetranHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeFivetranServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def record(self, path: str, status: int):
+        # Collapse ids so stats are per endpoint
+        path = re.sub(r"/(connectors|groups|group)/[^/]+", r"/\1/{id}", path)
+        with self.lock:
+            self.counts[(path, status)] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            requests_by_path = Counter()
+            for (path, _), count in self.counts.items():
+                requests_by_path[path] += count
+            return {
+                "total": sum(self.counts.values()),
+                "by_path": dict(requests_by_path),
+                "by_status": {
+                    f"{path} {status}": count
+                    for (path, status), count in self.counts.items()
+                },
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.counts.clear()
+
+    def create(self, kind: str, body: dict) -> dict:
+        item = {**body, "id": f"{kind}_{secrets.token_hex(8)}"}
+        with self.lock:
+            self.objects[(kind, item["id"])] = item
+        return item
+
+    def get(self, kind: str, object_id: str):
+        with self.lock:
+            return self.objects.get((kind, object_id))
+
+    def create_connector(self, body: dict) -> dict:
+        connector = self.create("connector", body)
+        connector.update(
+            {
+                "connect_card": {
+                    "uri": f"{self.url}/connect-card/{connector['id']}",
+                    "token": secrets.token_hex(16),
+                },
+                "status": {
+                    "setup_state": "incomplete",
+                    "sync_state": "scheduled",
+                    "is_historical_sync": True,
+                },
+                "succeeded_at": None,
+                "failed_at": None,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+        )
+        return connector
+
+    def group_connectors(self, group_id: str) -> list:
+        with self.lock:
+            return [
+                item
+                for (kind, _), item in self.objects.items()
+                if kind == "connector" and item.get("group_id") == group_id
+            ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Fivetran API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = FakeFivetranConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+    )
+    server = FakeFivetranServer(config, host=args.host, port=args.port)
+    print(f"Fake Fivetran API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Local stand-in for the Tink API, for offline connector benchmarks.
+
+Implements the endpoints the Tink connector and the API's TinkService call:
+- POST /api/v1/oauth/token (client_credentials, authorization_code, refresh_token)
+- POST /api/v1/oauth/authorization-grant
+- POST /api/v1/oauth/authorization-grant/delegate
+- POST /api/v1/user/create
+- GET  /data/v2/accounts
+- GET  /data/v2/transactions (paginated with pageToken / nextPageToken)
+
+Data comes from the connector's MOCK generator, so it has the same
+distributions as MOCK mode. Each transaction is fixed by its account, booked
+date and index within that day, so overlapping date ranges return the same
+rows with the same ids. Latency, page size, error injection and
+rate limiting are configurable. Request counts are served on GET /_stats
+and cleared with POST /_stats/reset.
+
+Usage (from backend/):
+    python -m benchmarks.fake_tink_api --accounts 20 --transactions 1000000
+
+then set "tink_api_base_url": "http://127.0.0.1:8089" in the connector
+configuration.
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import benchmarks  # noqa: F401 (puts the connector directory on sys.path)
+import numpy as np
+from mock_data import MockDataGenerator
+
+
+@dataclass
+class FakeTinkConfig:
+    accounts: int = 5
+    # Total transactions across all accounts over history_days
+    transactions: int = 10_000
+    history_days: int = 730
+    seed: int = 42
+    tenant_id: str = "fake-tenant"
+    # Added to every response, plus uniform jitter
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Upper bound on pageSize, like the real API
+    max_page_size: int = 100
+    # Share of data requests answered with a 500
+    error_rate: float = 0.0
+    # Requests per second across all clients, 0 disables the limit
+    rate_limit: float = 0.0
+    token_ttl_seconds: int = 3600
+
+
+class RateLimiter:
+    """Token bucket shared by all request threads."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class FakeTinkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def api(self) -> "FakeTinkServer":
+        return self.server.api
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        form = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode()).items()
+        }
+
+        if url.path == "/_stats/reset":
+            self.api.reset_stats()
+            return self._send(200, {})
+
+        if not self._admit(url.path):
+            return
+
+        if url.path == "/api/v1/oauth/token":
+            return self._send(*self.api.issue_token(form))
+        if url.path in (
+            "/api/v1/oauth/authorization-grant",
+            "/api/v1/oauth/authorization-grant/delegate",
+        ):
+            return self._send(200, {"code": secrets.token_hex(16)})
+        if url.path == "/api/v1/user/create":
+            return self._send(200, {"user_id": secrets.token_hex(16)})
+        self._send(404, {"errorMessage": "Not found"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/_stats":
+            return self._send(200, self.api.stats())
+
+        if not self._admit(url.path):
+            return
+
+        if not self.api.valid_token(self.headers.get("Authorization", "")):
+            return self._send(401, {"errorMessage": "Invalid access token"})
+        if random.random() < self.api.config.error_rate:
+            return self._send(500, {"errorMessage": "Injected error"})
+
+        if url.path == "/data/v2/accounts":
+            return self._send(200, {"accounts": self.api.accounts})
+        if url.path == "/data/v2/transactions":
+            return self._send(*self.api.transactions(query))
+        self._send(404, {"errorMessage": "Not found"})
+
+    def _admit(self, path: str) -> bool:
+        """Apply latency and rate limiting. Returns False if throttled."""
+        config = self.api.config
+        if config.latency_ms or config.jitter_ms:
+            time.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000)
+        if self.api.limiter and not self.api.limiter.allow():
+            self._send(429, {"errorMessage": "Rate limited"}, {"Retry-After": "1"})
+            return False
+        return True
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.api.record(urlparse(self.path).path, status)
+
+
+class FakeTinkServer:
+    """Fake Tink API on a background thread. Use as a context manager."""
+
+    def __init__(
+        self, config: FakeTinkConfig = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        self.config = config or FakeTinkConfig()
+        self.generator = MockDataGenerator(
+            self.config.tenant_id,
+            seed=self.config.seed,
+            num_accounts=self.config.accounts,
+        )
+        self.account_index = {
+            account_id: i for i, account_id in enumerate(self.generator.account_ids)
+        }
+        self.accounts = [to_tink_account(a) for a in self.generator.accounts(run=0)]
+        self.per_account = self.config.transactions // max(self.config.accounts, 1)
+        self.today = datetime.utcnow().date()
+        self.history_start = self.today - timedelta(days=self.config.history_days)
+        # Transactions before each day of the history, per account: row i of
+        # a day is always the same transaction, whatever range is requested
+        days = self.config.history_days + 1
+        weights = self.generator.day_weights(self.history_start, days)
+        self.day_offsets = np.rint(
+            np.concatenate([[0], np.cumsum(weights)]) * self.per_account
+        ).astype(np.int64)
+
+        self.limiter = (
+            RateLimiter(self.config.rate_limit) if self.config.rate_limit else None
+        )
+        self.tokens = {}
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), FakeTinkHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTinkServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def record(self, path: str, status: int):
+        with self.lock:
+            self.counts[(path, status)] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            requests_by_path = Counter()
+            for (path, _), count in self.counts.items():
+                requests_by_path[path] += count
+            return {
+                "total": sum(self.counts.values()),
+                "by_path": dict(requests_by_path),
+                "by_status": {
+                    f"{path} {status}": count
+                    for (path, status), count in self.counts.items()
+                },
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.counts.clear()
+
+    def issue_token(self, form: dict):
+        grant_type = form.get("grant_type")
+        if grant_type == "client_credentials":
+            return 200, {"access_token": secrets.token_hex(16), "expires_in": 1800}
+        if grant_type not in ("authorization_code", "refresh_token"):
+            return 400, {"errorMessage": f"Unsupported grant_type {grant_type}"}
+
+        access_token = secrets.token_hex(16)
+        with self.lock:
+            self.tokens[access_token] = time.time() + self.config.token_ttl_seconds
+        return 200, {
+            "access_token": access_token,
+            "refresh_token": secrets.token_hex(16),
+            "expires_in": self.config.token_ttl_seconds,
+            "token_type": "bearer",
+        }
+
+    def valid_token(self, authorization: str) -> bool:
+        token = authorization.removeprefix("Bearer ")
+        with self.lock:
+            return self.tokens.get(token, 0) > time.time()
+
+    def transactions(self, query: dict):
+        account = self.account_index.get(query.get("accountIdIn"))
+        if account is None:
+            return 200, {"transactions": [], "nextPageToken": ""}
+
+        start = max(parse_date(query.get("bookedDateGte")), self.history_start)
+        end = min(parse_date(query.get("bookedDateLte"), self.today), self.today)
+        if start > end:
+            return 200, {"transactions": [], "nextPageToken": ""}
+
+        first = self.day_offsets[(start - self.history_start).days]
+        total = self.day_offsets[(end - self.history_start).days + 1] - first
+
+        page_size = min(int(query.get("pageSize", 100)), self.config.max_page_size)
+        offset = int(query.get("pageToken") or 0)
+        size = max(min(page_size, total - offset), 0)
+        if not size:
+            return 200, {"transactions": [], "nextPageToken": ""}
+
+        batch = self.page(account, first + offset, size)
+        next_offset = offset + size
+        return 200, {
+            "transactions": to_tink_transactions(batch),
+            "nextPageToken": str(next_offset) if next_offset < total else "",
+        }
+
+    def page(self, account: int, first: int, size: int) -> dict:
+        """Rows first .. first + size - 1 of the account's whole history."""
+        offsets = self.day_offsets
+        day = int(np.searchsorted(offsets, first, side="right")) - 1
+        parts = []
+        while size > 0:
+            count = int(offsets[day + 1] - offsets[day])
+            skip = first - offsets[day]
+            if count > skip:
+                rows = self.generator.account_day(
+                    account,
+                    self.history_start + timedelta(days=day),
+                    count,
+                    self.today,
+                )
+                taken = min(count - skip, size)
+                parts.append({k: v[skip : skip + taken] for k, v in rows.items()})
+                first += taken
+                size -= taken
+            day += 1
+        return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def parse_date(value: str, default=None):
+    if not value:
+        return default or datetime.min.date()
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def tink_amount(value: str, currency: str) -> dict:
+    """Tink amounts are unscaled integers with a separate scale."""
+    return {
+        "value": {"unscaledValue": value.replace(".", ""), "scale": "2"},
+        "currencyCode": currency,
+    }
+
+
+def to_tink_account(account: dict) -> dict:
+    return {
+        "id": account["id"],
+        "name": account["name"],
+        "type": account["type"],
+        "financialInstitutionId": account["financial_institution_id"],
+        "balances": {
+            "booked": {
+                "amount": tink_amount(
+                    account["balance_amount"], account["balance_currency"]
+                )
+            }
+        },
+        "identifiers": {"iban": {"iban": account["iban"]}},
+        "dates": {"lastRefreshed": account["last_refreshed"]},
+    }
+
+
+def to_tink_transactions(batch: dict) -> list:
+    columns = {name: values.tolist() for name, values in batch.items()}
+    return [
+        {
+            "id": txn_id,
+            "accountId": account_id,
+            "amount": tink_amount(amount, currency),
+            "dates": {"booked": booked, "value": value},
+            "descriptions": {"display": description, "original": description},
+            "merchantInformation": {"merchantName": merchant},
+            "status": status,
+            "types": {"type": txn_type},
+        }
+        for (
+            txn_id,
+            account_id,
+            amount,
+            currency,
+            booked,
+            value,
+            description,
+            merchant,
+            status,
+            txn_type,
+        ) in zip(
+            columns["id"],
+            columns["account_id"],
+            columns["amount"],
+            columns["currency"],
+            columns["booked_date"],
+            columns["value_date"],
+            columns["description"],
+            columns["merchant_name"],
+            columns["status"],
+            columns["type"],
+        )
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Tink API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--accounts", type=int, default=5)
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--history-days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--max-page-size", type=int, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    args = parser.parse_args()
+
+    config = FakeTinkConfig(
+        accounts=args.accounts,
+        transactions=args.transactions,
+        history_days=args.history_days,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        max_page_size=args.max_page_size,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        token_ttl_seconds=args.token_ttl,
+    )
+    server = FakeTinkServer(config, host=args.host, port=args.port)
+    print(f"Fake Tink API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
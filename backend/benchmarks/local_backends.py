@@ -0,0 +1,351 @@
+"""
+Local stand-ins for the API's databases, for offline load tests.
+
+- Tenants store: a SQLite file behind the small part of the psycopg2
+  interface TenantService uses (%s binds, RealDictCursor rows, RETURNING).
+  A local Postgres can be used instead by leaving it out.
+- Warehouse: DuckDB in place of Snowflake for the metrics SQL. Tables live
+  in ARCIMS_PROD.PUBLIC like the shared secure views; each *_SECURE view
+  filters on a per-connection tenant_id variable, the way the real views
+  filter on CURRENT_ROLE().
+- Admin Snowflake sessions (role provisioning, view refreshes, inventory)
+  only record their statements, with optional latency.
+
+install() swaps these in at the driver boundary (snowflake.connector.connect
+and TenantService._get_connection), so the routes and services run
+unchanged. Call it in the process that serves the app, before the first
+request.
+"""
+
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import duckdb
+
+TENANTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenants (
+    tenant_id VARCHAR(36) PRIMARY KEY,
+    company_name VARCHAR(255),
+    clerk_user_id VARCHAR(255) UNIQUE NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    snowflake_role VARCHAR(255) NOT NULL,
+    onboarding_state VARCHAR(50) NOT NULL DEFAULT 'pending',
+    data_ready BOOLEAN DEFAULT FALSE,
+    fivetran_group_id VARCHAR(255),
+    fivetran_connector_id VARCHAR(255),
+    tink_user_id VARCHAR(255),
+    tink_connector_id VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_fivetran_connector_id
+    ON tenants(fivetran_connector_id);
+"""
+
+WAREHOUSE_DATABASE = "ARCIMS_PROD"
+WAREHOUSE_SCHEMA = "PUBLIC"
+
+# Underlying tables and the secure views the query registry reads
+WAREHOUSE_TABLES = {
+    "TINK_ACCOUNTS": """
+        tenant_id VARCHAR, id VARCHAR, balance_amount DECIMAL(18, 2),
+        balance_currency VARCHAR
+    """,
+    "TINK_TRANSACTIONS": """
+        tenant_id VARCHAR, id VARCHAR, account_id VARCHAR, booked_date DATE,
+        description VARCHAR, amount DECIMAL(18, 2), currency VARCHAR,
+        merchant_name VARCHAR, status VARCHAR
+    """,
+    "TINK_DAILY_SUMMARY": """
+        tenant_id VARCHAR, account_id VARCHAR, summary_date DATE, currency VARCHAR,
+        inflow DECIMAL(18, 2), outflow DECIMAL(18, 2), transaction_count INTEGER
+    """,
+    "FORTNOX_ACCOUNT": "tenant_id VARCHAR, NUMBER INTEGER, DESCRIPTION VARCHAR",
+}
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter(
+    "TIMESTAMP", lambda value: datetime.fromisoformat(value.decode())
+)
+sqlite3.register_converter("BOOLEAN", lambda value: value not in (b"0", b""))
+
+
+class SqliteCursor:
+    def __init__(self, cursor, as_dict: bool):
+        self.cursor = cursor
+        self.as_dict = as_dict
+
+    def execute(self, sql: str, params=()):
+        self.cursor.execute(sql.replace("%s", "?"), tuple(params))
+
+    def _row(self, row):
+        if row is None or not self.as_dict:
+            return row
+        return {column[0]: value for column, value in zip(self.cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self.cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self.cursor.fetchall()]
+
+    def close(self):
+        self.cursor.close()
+
+
+class SqliteConnection:
+    """psycopg2-style connection over SQLite, enough for TenantService."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(
+            path,
+            timeout=30,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+        )
+
+    def cursor(self, cursor_factory=None):
+        return SqliteCursor(self.conn.cursor(), as_dict=cursor_factory is not None)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+
+def create_tenant_store(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(TENANTS_SCHEMA)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def add_tenants(path: str, tenants: list):
+    """Insert ready tenants, dicts with tenant_id and optional columns."""
+    conn = sqlite3.connect(path)
+    try:
+        for tenant in tenants:
+            tenant_id = tenant["tenant_id"]
+            row = {
+                "company_name": f"Company {tenant_id[:8]}",
+                "clerk_user_id": f"user_{tenant_id}",
+                "email": f"{tenant_id[:8]}@example.com",
+                "snowflake_role": tenant_role(tenant_id),
+                "onboarding_state": "ready",
+                "data_ready": True,
+                "created_at": datetime.utcnow(),
+                **tenant,
+            }
+            columns = ", ".join(row)
+            binds = ", ".join("?" for _ in row)
+            conn.execute(
+                f"INSERT INTO tenants ({columns}) VALUES ({binds})", list(row.values())
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def tenant_role(tenant_id: str) -> str:
+    return f"TENANT_{tenant_id.replace('-', '_').upper()}"
+
+
+def role_tenant(role: str) -> str:
+    """Inverse of tenant_role()."""
+    return role.removeprefix("TENANT_").replace("_", "-").lower()
+
+
+def warehouse_path(directory: str) -> str:
+    """DuckDB names a database after its file, so this one is ARCIMS_PROD."""
+    return os.path.join(directory, f"{WAREHOUSE_DATABASE}.duckdb")
+
+
+def create_warehouse(path: str, tenant_ids: list, transactions: int, seed: int = 42):
+    """
+    Create the warehouse tables and secure views at `path` (see
+    warehouse_path()) and fill them with `transactions` transactions per
+    tenant over the last two years.
+    """
+    db = duckdb.connect(path)
+    try:
+        db.execute(f"SELECT setseed({(seed % 1000) / 1000})")
+        qualified = f"{WAREHOUSE_DATABASE}.{WAREHOUSE_SCHEMA}"
+        db.execute(f"CREATE SCHEMA IF NOT EXISTS {WAREHOUSE_SCHEMA}")
+        for table, columns in WAREHOUSE_TABLES.items():
+            db.execute(
+                f"CREATE OR REPLACE TABLE {WAREHOUSE_SCHEMA}.{table} ({columns})"
+            )
+
+        db.execute("CREATE TEMP TABLE seed_tenants (tenant_id VARCHAR)")
+        db.executemany(
+            "INSERT INTO seed_tenants VALUES (?)", [[tenant] for tenant in tenant_ids]
+        )
+        db.execute(f"""
+            INSERT INTO {WAREHOUSE_SCHEMA}.TINK_TRANSACTIONS
+            SELECT
+                t.tenant_id,
+                t.tenant_id || '-' || r.i,
+                'acc-' || (r.i % 3),
+                current_date - CAST(r.i % 730 AS INTEGER),
+                'Transaction ' || r.i,
+                ROUND((random() - 0.55) * 20000, 2),
+                'SEK',
+                'Merchant ' || (r.i % 50),
+                'BOOKED'
+            FROM seed_tenants t, range({int(transactions)}) r(i)
+        """)
+        db.execute(f"""
+            INSERT INTO {WAREHOUSE_SCHEMA}.TINK_DAILY_SUMMARY
+            SELECT
+                tenant_id, account_id, booked_date, currency,
+                SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+                SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END),
+                COUNT(*)
+            FROM {WAREHOUSE_SCHEMA}.TINK_TRANSACTIONS
+            GROUP BY ALL
+        """)
+        db.execute(f"""
+            INSERT INTO {WAREHOUSE_SCHEMA}.TINK_ACCOUNTS
+            SELECT tenant_id, account_id, 100000 + SUM(amount), 'SEK'
+            FROM {WAREHOUSE_SCHEMA}.TINK_TRANSACTIONS
+            GROUP BY tenant_id, account_id
+        """)
+        db.execute(f"""
+            INSERT INTO {WAREHOUSE_SCHEMA}.FORTNOX_ACCOUNT
+            SELECT t.tenant_id, n.number, 'Account ' || n.number
+            FROM seed_tenants t, range(1000, 8000, 100) n(number)
+        """)
+
+        for table in WAREHOUSE_TABLES:
+            db.execute(f"""
+                CREATE OR REPLACE VIEW {WAREHOUSE_SCHEMA}.{table}_SECURE AS
+                SELECT * FROM {qualified}.{table}
+                WHERE tenant_id = getvariable('tenant_id')
+            """)
+    finally:
+        db.close()
+
+
+class DuckDBCursor:
+    """Snowflake-cursor-like wrapper: `?` binds, sfqid, description."""
+
+    def __init__(self, cursor, latency_ms: float = 0):
+        self.cursor = cursor
+        self.latency = latency_ms / 1000
+        self.sfqid = None
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def execute(self, sql: str, params=None):
+        if self.latency:
+            time.sleep(self.latency)
+        # Session settings (QUERY_TAG on pooled sessions) have no DuckDB analogue
+        if not sql.lstrip().upper().startswith("ALTER SESSION"):
+            self.cursor.execute(sql, params or [])
+        return self
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        pass
+
+
+class DuckDBConnection:
+    """A tenant session: sees only its tenant's rows through the views."""
+
+    def __init__(self, db, tenant_id: str, latency_ms: float = 0):
+        self.conn = db.cursor()
+        self.conn.execute("SET VARIABLE tenant_id = ?", [tenant_id])
+        self.latency_ms = latency_ms
+        self.closed = False
+
+    def cursor(self):
+        return DuckDBCursor(self.conn, self.latency_ms)
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+        self.conn.close()
+
+
+class RecordingCursor:
+    """Admin session stand-in: records statements, returns no rows."""
+
+    def __init__(self, statements: list, latency_ms: float = 0):
+        self.statements = statements
+        self.latency = latency_ms / 1000
+        self.description = []
+        self.sfqid = None
+
+    def execute(self, sql: str, params=None):
+        if self.latency:
+            time.sleep(self.latency)
+        self.statements.append(sql)
+        return self
+
+    def executemany(self, sql: str, rows):
+        return self.execute(sql)
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, latency_ms: float = 0):
+        self.statements = []
+        self.latency_ms = latency_ms
+
+    def cursor(self):
+        return RecordingCursor(self.statements, self.latency_ms)
+
+    def is_closed(self):
+        return False
+
+    def close(self):
+        pass
+
+
+def install(warehouse: str, tenant_store: str = None, snowflake_latency_ms: float = 0):
+    """
+    Route the app's Snowflake sessions to the warehouse stand-in (tenant
+    roles) or a recording session (everything else), and TenantService to
+    the SQLite store when `tenant_store` is given.
+    """
+    import snowflake.connector
+
+    from app.services.tenant_service import TenantService
+
+    if tenant_store:
+        TenantService._get_connection = lambda self: SqliteConnection(tenant_store)
+
+    db = duckdb.connect(warehouse, read_only=True)
+
+    def connect(role: str = None, **kwargs):
+        if role and role.startswith("TENANT_"):
+            return DuckDBConnection(db, role_tenant(role), snowflake_latency_ms)
+        return RecordingConnection(snowflake_latency_ms)
+
+    snowflake.connector.connect = connect
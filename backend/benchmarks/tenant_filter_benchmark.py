@@ -0,0 +1,161 @@
+"""
+Compare the two ways secure views restrict rows to a tenant, on Snowflake:
+- join: JOIN ENTITLEMENTS ... WHERE e.role_name = CURRENT_ROLE()
+- policy: the TENANT_ROW_ACCESS row access policy attached to the view
+
+Builds PUBLIC.BENCH_<TABLE>_JOIN and PUBLIC.BENCH_<TABLE>_POLICY over the
+same tenant schemas, runs the query as a tenant role with the result cache
+off (alternating between the two), and reports per variant the median
+client latency plus elapsed time, bytes scanned and partitions scanned from
+QUERY_HISTORY. The views are dropped afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.tenant_filter_benchmark \\
+        --role TENANT_0973369A_5994_4878_8D0D_04D87BC630FF --table TRANSACTIONS
+"""
+
+import argparse
+import statistics
+import time
+
+import snowflake.connector
+
+from app.services.snowflake_service import SnowflakeService, secure_view_sql
+
+DEFAULT_QUERY = "SELECT COUNT(*), MAX(_FIVETRAN_SYNCED) FROM {view}"
+
+
+def create_views(service: SnowflakeService, source: str, table: str, role: str):
+    """Create the JOIN and POLICY variants of one secure view. Returns their names."""
+    conn = service._get_connection(use_admin=True)
+    cursor = conn.cursor()
+    try:
+        tenants, tables = service._secure_view_sources(cursor)
+        schemas = tables.get((source, table))
+        if not schemas:
+            raise SystemExit(f"No {source}_* schema has a table {table}")
+
+        service._ensure_row_access_policy(cursor)
+        entitlements = f"{service.database}.{service.schema}.ENTITLEMENTS"
+
+        views = {}
+        for variant, filter_table in (("join", entitlements), ("policy", None)):
+            view = (
+                f"{service.database}.{service.schema}.BENCH_{table}_{variant.upper()}"
+            )
+            body = secure_view_sql(
+                service.database, table, schemas, tenants, filter_table
+            )
+            cursor.execute(f"CREATE OR REPLACE SECURE VIEW {view} AS {body}")
+            if variant == "policy":
+                cursor.execute(f"""
+                    ALTER VIEW {view}
+                    ADD ROW ACCESS POLICY {service._policy_name()} ON (tenant_id)
+                """)
+            cursor.execute(f"GRANT SELECT ON VIEW {view} TO ROLE {role}")
+            views[variant] = view
+
+        print(f"Created benchmark views over {len(schemas)} schemas")
+        return views
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def drop_views(service: SnowflakeService, views: dict):
+    conn = service._get_connection(use_admin=True)
+    cursor = conn.cursor()
+    try:
+        for view in views.values():
+            cursor.execute(f"DROP VIEW IF EXISTS {view}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run_queries(
+    service: SnowflakeService, role: str, views: dict, query: str, runs: int
+):
+    """Run the query `runs` times per variant as `role`. Returns per-variant stats."""
+    conn = snowflake.connector.connect(
+        user=service.user,
+        account=service.account,
+        private_key=service._get_private_key(service.private_key_path),
+        role=role,
+        warehouse=service.warehouse,
+        database=service.database,
+    )
+    cursor = conn.cursor()
+    try:
+        cursor.execute("ALTER SESSION SET USE_CACHED_RESULT = FALSE")
+
+        latencies = {variant: [] for variant in views}
+        query_ids = {}
+        for _ in range(runs):
+            for variant, view in views.items():
+                started = time.perf_counter()
+                cursor.execute(query.format(view=view))
+                cursor.fetchall()
+                latencies[variant].append((time.perf_counter() - started) * 1000)
+                query_ids[cursor.sfqid] = variant
+
+        cursor.execute("""
+            SELECT query_id, total_elapsed_time, bytes_scanned,
+                   partitions_scanned, partitions_total
+            FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 1000))
+        """)
+        history = {variant: [] for variant in views}
+        for query_id, elapsed, scanned, partitions, total in cursor.fetchall():
+            if query_id in query_ids:
+                history[query_ids[query_id]].append(
+                    (elapsed, scanned, partitions, total)
+                )
+    finally:
+        cursor.close()
+        conn.close()
+
+    results = {}
+    for variant in views:
+        rows = history[variant]
+        results[variant] = {
+            "client_ms": round(statistics.median(latencies[variant]), 1),
+            "elapsed_ms": median(row[0] for row in rows),
+            "bytes_scanned": median(row[1] for row in rows),
+            "partitions_scanned": median(row[2] for row in rows),
+            "partitions_total": median(row[3] for row in rows),
+        }
+    return results
+
+
+def median(values):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark secure-view tenant filters")
+    parser.add_argument("--role", required=True, help="Tenant role to query as")
+    parser.add_argument("--source", default="TINK", choices=["TINK", "FORTNOX"])
+    parser.add_argument("--table", default="TRANSACTIONS")
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    service = SnowflakeService()
+    views = create_views(service, args.source, args.table.upper(), args.role)
+    try:
+        results = run_queries(service, args.role, views, args.query, args.runs)
+    finally:
+        drop_views(service, views)
+
+    for variant, metrics in results.items():
+        print(
+            f"{variant:8} {metrics['client_ms']:>8} ms client  "
+            f"{metrics['elapsed_ms']} ms elapsed  "
+            f"{metrics['bytes_scanned']} bytes  "
+            f"{metrics['partitions_scanned']}/{metrics['partitions_total']} partitions"
+        )
+
+
+if __name__ == "__main__":
+    main()
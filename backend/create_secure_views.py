@@ -2,18 +2,16 @@
 from app.services.snowflake_service import SnowflakeService
 
 service = SnowflakeService()
-conn = service._get_connection(use_admin=True)
-cursor = conn.cursor()
 
-# Example: Create secure view for invoices
-cursor.execute("""
-    CREATE OR REPLACE SECURE VIEW ARCIMS_PROD.PUBLIC.invoices_secure AS
-    SELECT i.*
-    FROM ARCIMS_PROD.fortnox_<tenant_short_id>.invoices i
-    JOIN ARCIMS_PROD.PUBLIC.ENTITLEMENTS e
-        ON e.tenant_id = i.tenant_id
-    WHERE e.role_name = CURRENT_ROLE()
-""")
+# Regenerates PUBLIC.<SOURCE>_<TABLE>_SECURE for every table in the
+# TINK_*/FORTNOX_* tenant schemas (e.g. FORTNOX_INVOICES_SECURE)
+result = service.refresh_secure_views()
 
-cursor.close()
-conn.close()
+for view in result["created"]:
+    print(f"✓ Created {view}")
+for view in result["unchanged"]:
+    print(f"  {view} unchanged")
+
+# Shared tables holding many tenants prune better when clustered by tenant
+for table in service.cluster_by_tenant():
+    print(f"✓ Clustered {table} by tenant_id")
@@ -1,48 +1,15 @@
 from app.services.snowflake_service import SnowflakeService
 
 service = SnowflakeService()
-conn = service._get_connection(use_admin=True)
-cursor = conn.cursor()
 
 print("Creating secure views for Tink data...")
 
-# Secure view for accounts
-cursor.execute("""
-    CREATE OR REPLACE SECURE VIEW ARCIMS_PROD.PUBLIC.TINK_ACCOUNTS_SECURE AS
-    SELECT a.*
-    FROM ARCIMS_PROD.TINK_0973369A.ACCOUNTS a
-    JOIN ARCIMS_PROD.PUBLIC.ENTITLEMENTS e
-        ON e.tenant_id = a.tenant_id
-    WHERE e.role_name = CURRENT_ROLE()
-""")
-print("✓ Created TINK_ACCOUNTS_SECURE")
-
-# Secure view for transactions
-cursor.execute("""
-    CREATE OR REPLACE SECURE VIEW ARCIMS_PROD.PUBLIC.TINK_TRANSACTIONS_SECURE AS
-    SELECT t.*
-    FROM ARCIMS_PROD.TINK_0973369A.TRANSACTIONS t
-    JOIN ARCIMS_PROD.PUBLIC.ENTITLEMENTS e
-        ON e.tenant_id = t.tenant_id
-    WHERE e.role_name = CURRENT_ROLE()
-""")
-print("✓ Created TINK_TRANSACTIONS_SECURE")
-
-# Grant access to tenant roles
-cursor.execute("""
-    GRANT SELECT ON VIEW ARCIMS_PROD.PUBLIC.TINK_ACCOUNTS_SECURE 
-    TO ROLE TENANT_0973369A_5994_4878_8D0D_04D87BC630FF
-""")
-
-cursor.execute("""
-    GRANT SELECT ON VIEW ARCIMS_PROD.PUBLIC.TINK_TRANSACTIONS_SECURE 
-    TO ROLE TENANT_0973369A_5994_4878_8D0D_04D87BC630FF
-""")
-
-print("✓ Granted permissions to tenant role")
-
-cursor.close()
-conn.close()
+# Views span every TINK_* schema; tenant roles read them through the
+# future-view grants made in create_tenant_role
+result = service.refresh_secure_views()
+for view in result["created"] + result["unchanged"]:
+    if view.startswith("TINK_"):
+        print(f"✓ {view}")
 
 print("\n=== Test secure view access ===")
 
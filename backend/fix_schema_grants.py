@@ -1,39 +1,25 @@
+import sys
+
 from app.services.snowflake_service import SnowflakeService
 
 service = SnowflakeService()
-conn = service._get_connection(use_admin=True)
-cursor = conn.cursor()
-
-# Get all Fortnox schemas
-cursor.execute("SHOW SCHEMAS IN DATABASE ARCIMS_PROD")
-schemas = [row[1] for row in cursor.fetchall() if row[1].startswith("FORTNOX_")]
-
-print(f"Found {len(schemas)} Fortnox schemas")
-
-for schema in schemas:
-    print(f"\nGranting access to {schema}...")
 
-    try:
-        # Grant usage on schema
-        cursor.execute(
-            f"GRANT USAGE ON SCHEMA ARCIMS_PROD.{schema} TO ROLE {service.admin_role}"
-        )
+# Pass --dry-run to only list the grants that would be issued
+dry_run = "--dry-run" in sys.argv
 
-        # Grant select on all tables
-        cursor.execute(
-            f"GRANT SELECT ON ALL TABLES IN SCHEMA ARCIMS_PROD.{schema} TO ROLE {service.admin_role}"
-        )
+# Covers every FORTNOX_/TINK_ schema; only missing grants are issued
+report = service.reconcile_schema_grants(dry_run=dry_run)
 
-        # Grant select on future tables
-        cursor.execute(
-            f"GRANT SELECT ON FUTURE TABLES IN SCHEMA ARCIMS_PROD.{schema} TO ROLE {service.admin_role}"
-        )
+print(f"Found {report['schemas']} tenant schemas")
 
-        print(f"  ✓ Granted")
-    except Exception as e:
-        print(f"  ⚠️  {e}")
+if not report["missing"]:
+    print("\n✓ All grants in place")
+else:
+    print(f"\n{len(report['missing'])} grants {'missing' if dry_run else 'applied'}:")
+    for statement in report["missing"]:
+        print(f"  {statement}")
 
-cursor.close()
-conn.close()
+for statement, error in report["failed"]:
+    print(f"  ⚠️  {statement}: {error}")
 
 print("\n✅ Done")
@@ -35,6 +35,11 @@ try:
         print(f"\n⚠️  Missing entitlements for {len(missing)} tenants:")
         for tid in missing:
             print(f"  {tid[:13]}...")
+
+        result = service.reconcile_entitlements(tenant_service.list_entitlements())
+        print(
+            f"✓ Reconciled: {result['inserted']} inserted, {result['deleted']} deleted"
+        )
     else:
         print(f"\n✓ All {len(tenants)} tenants have entitlements")
 
@@ -49,14 +54,10 @@ except Exception as e:
         )
     """)
 
-    # Insert entries for all tenants
-    for tenant_id, role_name in tenants:
-        cursor.execute(f"""
-            INSERT INTO ARCIMS_PROD.PUBLIC.ENTITLEMENTS (role_name, tenant_id)
-            VALUES ('{role_name}', '{tenant_id}')
-        """)
+    # Insert entries for all tenants in one MERGE
+    result = service.reconcile_entitlements(tenant_service.list_entitlements())
 
-    print(f"✓ Created entitlements for {len(tenants)} tenants")
+    print(f"✓ Created entitlements for {result['inserted']} tenants")
 
 cursor.close()
 conn.close()
@@ -0,0 +1,19 @@
+import os
+
+# Settings needs these before app modules are imported; nothing here
+# connects to the services they point at.
+for name in (
+    "DATABASE_URL",
+    "CLERK_SECRET_KEY",
+    "CLERK_WEBHOOK_SECRET",
+    "SNOWFLAKE_ACCOUNT",
+    "SNOWFLAKE_USER",
+    "SNOWFLAKE_PRIVATE_KEY_PATH",
+    "FIVETRAN_AUTH_TOKEN",
+    "FORTNOX_CLIENT_ID",
+    "FORTNOX_CLIENT_SECRET",
+    "FORTNOX_SCOPES",
+    "TINK_CLIENT_ID",
+    "TINK_CLIENT_SECRET",
+):
+    os.environ.setdefault(name, "test")
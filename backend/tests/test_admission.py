@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.admission import AdmissionController
+
+
+def controller(**overrides):
+    limits = dict(
+        global_limit=1,
+        tenant_limit=1,
+        tenant_queue=10,
+        queue_limit=10,
+        max_wait_seconds=5,
+        retry_after_seconds=2,
+    )
+    limits.update(overrides)
+    return AdmissionController(**limits)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_freed_slots_go_round_robin_across_tenants():
+    async def scenario():
+        admission = controller()
+        granted = []
+
+        async def request(tenant_id, name):
+            await admission.acquire(tenant_id)
+            granted.append(name)
+
+        await admission.acquire("a")
+        tasks = [
+            asyncio.create_task(request("a", "a2")),
+            asyncio.create_task(request("a", "a3")),
+            asyncio.create_task(request("b", "b1")),
+        ]
+        await settle()
+        assert admission.waiting == 3
+
+        for tenant_id in ("a", "a", "b"):
+            admission.release(tenant_id)
+            await settle()
+        await asyncio.gather(*tasks)
+        # b is not stuck behind a's whole queue
+        return granted
+
+    assert asyncio.run(scenario()) == ["a2", "b1", "a3"]
+
+
+def test_tenant_limit_leaves_room_for_other_tenants():
+    async def scenario():
+        admission = controller(global_limit=2)
+        await admission.acquire("a")
+        waiting = asyncio.create_task(admission.acquire("a"))
+        await settle()
+        assert not waiting.done()
+
+        await asyncio.wait_for(admission.acquire("b"), 1)
+        assert admission.stats()["tenants"]["a"] == {"in_flight": 1, "waiting": 1}
+        waiting.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_full_tenant_queue_is_429_with_retry_after():
+    async def scenario():
+        admission = controller(tenant_queue=1)
+        await admission.acquire("a")
+        waiting = asyncio.create_task(admission.acquire("a"))
+        await settle()
+
+        with pytest.raises(HTTPException) as rejected:
+            await admission.acquire("a")
+        waiting.cancel()
+        return admission, rejected.value
+
+    admission, error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert error.headers == {"Retry-After": "2"}
+    assert admission.rejections == {"tenant_queue_full": 1}
+
+
+def test_full_global_queue_is_503():
+    async def scenario():
+        admission = controller(queue_limit=1)
+        await admission.acquire("a")
+        waiting = asyncio.create_task(admission.acquire("b"))
+        await settle()
+
+        with pytest.raises(HTTPException) as rejected:
+            await admission.acquire("c")
+        waiting.cancel()
+        return admission, rejected.value
+
+    admission, error = asyncio.run(scenario())
+    assert (error.status_code, error.headers) == (503, {"Retry-After": "2"})
+    assert admission.rejections == {"queue_full": 1}
+
+
+def test_wait_timeout_is_503_and_leaves_the_queue():
+    async def scenario():
+        admission = controller(max_wait_seconds=0.01)
+        await admission.acquire("a")
+        with pytest.raises(HTTPException) as rejected:
+            await admission.acquire("b")
+        return admission, rejected.value
+
+    admission, error = asyncio.run(scenario())
+    assert (error.status_code, error.headers) == (503, {"Retry-After": "2"})
+    assert admission.rejections == {"timeout": 1}
+    assert admission.waiting == 0 and not admission.waiters
+    assert admission.in_flight == 1
+
+
+def test_cancelled_waiter_is_withdrawn():
+    async def scenario():
+        admission = controller()
+        await admission.acquire("a")
+        waiting = asyncio.create_task(admission.acquire("b"))
+        await settle()
+        waiting.cancel()
+        await settle()
+        assert admission.waiting == 0 and not admission.waiters
+
+        # The freed slot is not handed to the departed waiter
+        admission.release("a")
+        assert admission.in_flight == 0
+        await asyncio.wait_for(admission.acquire("c"), 1)
+        assert admission.stats()["tenants"] == {"c": {"in_flight": 1, "waiting": 0}}
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_after_grant_releases_its_slot():
+    async def scenario():
+        admission = controller()
+        await admission.acquire("a")
+        waiting = asyncio.create_task(admission.acquire("b"))
+        await settle()
+
+        # Slot handed over, but the client leaves before the waiter resumes
+        admission.release("a")
+        assert admission.tenant_in_flight["b"] == 1
+        waiting.cancel()
+        await settle()
+        assert waiting.cancelled()
+        assert admission.in_flight == 0 and not admission.tenant_in_flight
+
+    asyncio.run(scenario())
+
+
+def test_slot_releases_on_error():
+    async def scenario():
+        admission = controller()
+        with pytest.raises(RuntimeError):
+            async with admission.slot("a"):
+                assert admission.in_flight == 1
+                raise RuntimeError("query failed")
+        return admission
+
+    assert asyncio.run(scenario()).in_flight == 0
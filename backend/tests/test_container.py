@@ -0,0 +1,26 @@
+import threading
+from app.core.container import Container
+from app.services.inventory_service import InventoryService
+
+
+def resolve_with_timeout(fn, timeout=5):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "resolve did not return (deadlock)"
+    return result["value"]
+
+
+def test_resolve_inventory_service_on_fresh_container():
+    container = Container()
+    inventory = resolve_with_timeout(lambda: container.inventory_service)
+    assert isinstance(inventory, InventoryService)
+    assert container.inventory_service is inventory
+    assert container.instances["snowflake_service"] is container.snowflake_service
+
+
+def test_resolve_warehouse_warmer_on_fresh_container():
+    container = Container()
+    warmer = resolve_with_timeout(lambda: container.warehouse_warmer)
+    assert warmer.snowflake is container.snowflake_service
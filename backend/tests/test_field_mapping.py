@@ -0,0 +1,112 @@
+from decimal import Decimal
+
+import pytest
+
+import benchmarks  # noqa: F401 (puts the connector directory on sys.path)
+from field_mapping import DECIMAL, Amount, Constant, compile_table, scale_amount
+
+
+@pytest.mark.parametrize(
+    "unscaled, scale, expected",
+    [
+        ("-10550", "2", "-105.50"),
+        ("10550", "2", "105.50"),
+        ("5", "2", "0.05"),
+        ("-5", "3", "-0.005"),
+        ("0", "2", "0.00"),
+        ("1200", "0", "1200"),
+        ("12", "-2", "1200"),
+        ("1.5", "1", "0.15"),
+    ],
+)
+def test_scale_amount(unscaled, scale, expected):
+    result = scale_amount({"unscaledValue": unscaled, "scale": scale})
+    assert result == expected
+    assert Decimal(result) == Decimal(unscaled).scaleb(-int(scale))
+
+
+def test_scale_amount_missing_scale_is_zero():
+    assert scale_amount({"unscaledValue": "42"}) == "42"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        {},
+        {"scale": "2"},
+        {"unscaledValue": "12", "scale": "x"},
+        {"unscaledValue": "abc", "scale": "2"},
+    ],
+)
+def test_scale_amount_invalid_gives_none(value):
+    assert scale_amount(value) is None
+
+
+TABLE = compile_table(
+    "example",
+    ["id"],
+    {
+        "id": ("STRING", "id"),
+        "tenant_id": ("STRING", Constant("tenant_id")),
+        "name": ("STRING", "details.name"),
+        "booked": ("STRING", "details.dates.booked"),
+        "amount": (DECIMAL, Amount("details.amount")),
+    },
+)
+
+
+def test_compile_table_schema():
+    assert TABLE.schema() == {
+        "table": "example",
+        "primary_key": ["id"],
+        "columns": {
+            "id": "STRING",
+            "tenant_id": "STRING",
+            "name": "STRING",
+            "booked": "STRING",
+            "amount": DECIMAL,
+        },
+    }
+
+
+def test_compile_table_transform():
+    items = [
+        {
+            "id": "t1",
+            "details": {
+                "name": "Coffee",
+                "dates": {"booked": "2024-03-01"},
+                "amount": {"value": {"unscaledValue": "-4500", "scale": "2"}},
+            },
+        },
+        {"id": "t2", "details": {"dates": None}},
+        {"id": "t3"},
+    ]
+    assert TABLE.transform(items, tenant_id="tenant-a") == [
+        {
+            "id": "t1",
+            "tenant_id": "tenant-a",
+            "name": "Coffee",
+            "booked": "2024-03-01",
+            "amount": "-45.00",
+        },
+        {
+            "id": "t2",
+            "tenant_id": "tenant-a",
+            "name": None,
+            "booked": None,
+            "amount": None,
+        },
+        {
+            "id": "t3",
+            "tenant_id": "tenant-a",
+            "name": None,
+            "booked": None,
+            "amount": None,
+        },
+    ]
+
+
+def test_compile_table_binds_shared_prefix_once():
+    assert TABLE.source.count(".get('details')") == 1
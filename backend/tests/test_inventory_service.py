@@ -0,0 +1,64 @@
+import threading
+from app.services.inventory_service import InventoryService
+
+TENANT = "0973369a-1111-4111-8111-111111111111"
+
+
+class CountingInventory(InventoryService):
+    def __init__(self, ttl, value="2026-10-19T10:00:00", error=None):
+        super().__init__(snowflake=object(), freshness_ttl_seconds=ttl)
+        self.reads = 0
+        self.value = value
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_tenant_inventory(self, tenant_id):
+        self.reads += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return {"last_altered": self.value}
+
+
+def test_last_altered_is_cached():
+    inventory = CountingInventory(ttl=60)
+    assert inventory.last_altered(TENANT) == "2026-10-19T10:00:00"
+    assert inventory.last_altered(TENANT) == "2026-10-19T10:00:00"
+    assert inventory.reads == 1
+
+
+def test_expired_entry_is_read_again():
+    inventory = CountingInventory(ttl=0)
+    inventory.last_altered(TENANT)
+    inventory.last_altered(TENANT)
+    assert inventory.reads == 2
+
+
+def test_concurrent_callers_share_one_read():
+    inventory = CountingInventory(ttl=60)
+    inventory.release.clear()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(inventory.last_altered(TENANT)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while inventory.freshness_reads.in_flight() == 0:
+        pass
+    inventory.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["2026-10-19T10:00:00"] * 5
+    assert inventory.reads <= 2
+
+
+def test_errors_are_not_cached():
+    inventory = CountingInventory(ttl=60, error=RuntimeError("down"))
+    for _ in range(2):
+        try:
+            inventory.last_altered(TENANT)
+        except RuntimeError:
+            pass
+    assert inventory.reads == 2
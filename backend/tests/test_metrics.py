@@ -0,0 +1,59 @@
+import pytest
+from fastapi import HTTPException
+from snowflake.connector.errors import ProgrammingError
+
+from app.api.routes.metrics import query_tenant
+
+TENANT = "0973369a-1111-4111-8111-111111111111"
+
+
+class Tenants:
+    def get_tenant_by_id(self, tenant_id):
+        return {"tenant_id": tenant_id, "snowflake_role": "TENANT_0973369A_ROLE"}
+
+
+class FailingCursor:
+    def __init__(self, error):
+        self.error = error
+
+    def execute(self, sql, params=None):
+        raise self.error
+
+    def close(self):
+        pass
+
+
+class FailingConnection:
+    def __init__(self, error):
+        self.error = error
+
+    def cursor(self):
+        return FailingCursor(self.error)
+
+    def close(self):
+        pass
+
+
+class Snowflake:
+    def __init__(self, error):
+        self.error = error
+
+    def get_tenant_connection(self, role):
+        return FailingConnection(self.error)
+
+
+def test_missing_view_is_503_with_retry_after():
+    error = ProgrammingError(
+        msg="Object 'TINK_DAILY_SUMMARY_SECURE' does not exist or not authorized.",
+        errno=2003,
+    )
+    with pytest.raises(HTTPException) as raised:
+        query_tenant(TENANT, Tenants(), Snowflake(error), "monthly_revenue", months=6)
+    assert raised.value.status_code == 503
+    assert "Retry-After" in raised.value.headers
+
+
+def test_other_errors_propagate():
+    error = ProgrammingError(msg="SQL compilation error", errno=1003)
+    with pytest.raises(ProgrammingError):
+        query_tenant(TENANT, Tenants(), Snowflake(error), "monthly_revenue", months=6)
@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from app.services.query_registry import (
+    TEMPLATES,
+    QueryTemplate,
+    get_template,
+    months_ago,
+    tenant_schema,
+)
+
+TEMPLATE = QueryTemplate(
+    "example",
+    "SELECT * FROM {database}.{schema}.T WHERE a = ? AND b = ?",
+    params=("a", "b"),
+)
+
+
+def test_render_fills_identifiers():
+    assert TEMPLATE.render(database="ARCIMS_DB", schema="PUBLIC") == (
+        "SELECT * FROM ARCIMS_DB.PUBLIC.T WHERE a = ? AND b = ?"
+    )
+    assert TEMPLATE.query_hash(database="ARCIMS_DB", schema="PUBLIC") == (
+        TEMPLATE.query_hash(schema="PUBLIC", database="ARCIMS_DB")
+    )
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        "PUBLIC; DROP TABLE ENTITLEMENTS",
+        "PUBLIC.T --",
+        "1PUBLIC",
+        "PUB LIC",
+        "",
+        "A" * 256,
+    ],
+)
+def test_render_rejects_invalid_identifiers(schema):
+    with pytest.raises(ValueError, match="Invalid identifier for schema"):
+        TEMPLATE.render(database="ARCIMS_DB", schema=schema)
+
+
+def test_bind_orders_values_and_requires_all():
+    assert TEMPLATE.bind(b=2, a=1, extra=3) == [1, 2]
+    with pytest.raises(ValueError, match=r"\['b'\]"):
+        TEMPLATE.bind(a=1)
+
+
+def test_registered_templates_only_bind_values():
+    for name, template in TEMPLATES.items():
+        sql = template.render(database="DB", schema="PUBLIC")
+        assert sql.count("?") == len(template.params), name
+    with pytest.raises(KeyError):
+        get_template("unknown")
+
+
+def test_tenant_schema():
+    tenant_id = "0973369a-1111-4111-8111-111111111111"
+    assert tenant_schema("FORTNOX", tenant_id) == "FORTNOX_0973369A"
+    with pytest.raises(ValueError):
+        tenant_schema("FORTNOX", "0973369a'; --")
+    with pytest.raises(ValueError):
+        tenant_schema("OTHER", tenant_id)
+
+
+@pytest.mark.parametrize(
+    "today, months, expected",
+    [
+        (date(2024, 5, 15), 0, date(2024, 5, 15)),
+        (date(2024, 5, 15), 1, date(2024, 4, 15)),
+        (date(2024, 5, 15), 12, date(2023, 5, 15)),
+        (date(2024, 1, 10), 1, date(2023, 12, 10)),
+        (date(2024, 3, 31), 1, date(2024, 2, 29)),
+        (date(2023, 3, 31), 1, date(2023, 2, 28)),
+        (date(2024, 5, 31), 1, date(2024, 4, 30)),
+        (date(2024, 12, 31), 11, date(2024, 1, 31)),
+        (date(2024, 1, 31), 14, date(2022, 11, 30)),
+    ],
+)
+def test_months_ago(today, months, expected):
+    assert months_ago(months, today) == expected
@@ -0,0 +1,112 @@
+import re
+
+import pytest
+
+from app.services.snowflake_service import SnowflakeService
+
+ENTITLEMENTS = [
+    ("TENANT_0973369A_ROLE", "0973369a-1111-4111-8111-111111111111"),
+    ("TENANT_5B1C0E2F_ROLE", "5b1c0e2f-3333-4333-8333-333333333333"),
+]
+
+
+class FakeCursor:
+    description = [("number of rows inserted",), ("number of rows deleted",)]
+
+    def __init__(self):
+        self.statements = []
+        self.batches = []
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.statements.append(" ".join(sql.split()))
+
+    def executemany(self, sql, rows):
+        self.batches.append((sql, list(rows)))
+
+    def fetchone(self):
+        return (2, 1)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursor_ = FakeCursor()
+        self.closed = False
+
+    def cursor(self):
+        return self.cursor_
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = SnowflakeService()
+    service.connections = []
+
+    def get_connection(use_admin=False, workload=None):
+        assert use_admin
+        conn = FakeConnection()
+        service.connections.append(conn)
+        return conn
+
+    monkeypatch.setattr(service, "_get_connection", get_connection)
+    return service
+
+
+def test_empty_set_is_refused(service):
+    with pytest.raises(ValueError, match="empty set"):
+        service.reconcile_entitlements([])
+    with pytest.raises(ValueError):
+        service.reconcile_entitlements(iter(()))
+    assert service.connections == []
+
+
+def test_empty_set_with_allow_empty_merges_without_insert(service):
+    assert service.reconcile_entitlements([], allow_empty=True) == {
+        "inserted": 2,
+        "deleted": 1,
+    }
+    (conn,) = service.connections
+    assert conn.cursor_.batches == []
+    assert any(s.startswith("MERGE INTO") for s in conn.cursor_.statements)
+
+
+def test_staged_rows_are_bulk_loaded_and_merged(service):
+    result = service.reconcile_entitlements(ENTITLEMENTS)
+
+    assert result == {"inserted": 2, "deleted": 1}
+    (conn,) = service.connections
+    cursor = conn.cursor_
+    assert cursor.closed and conn.closed
+
+    ((insert, rows),) = cursor.batches
+    assert insert.endswith("ENTITLEMENTS_STAGE (role_name, tenant_id) VALUES (%s, %s)")
+    assert rows == ENTITLEMENTS
+
+    create, merge = cursor.statements
+    assert create.startswith("CREATE OR REPLACE TEMPORARY TABLE")
+    assert merge.startswith(
+        f"MERGE INTO {service.database}.{service.schema}.ENTITLEMENTS t"
+    )
+
+
+def test_merge_deletes_only_rows_flagged_as_orphans(service):
+    service.reconcile_entitlements(ENTITLEMENTS)
+    merge = service.connections[0].cursor_.statements[-1]
+
+    # Staged rows are never orphans; existing rows missing from the stage are
+    staged, existing = (
+        re.search(r"USING \((.*)\) src", merge).group(1).split("UNION ALL")
+    )
+    assert "FALSE AS orphan" in staged and "ENTITLEMENTS_STAGE" in staged
+    assert "TRUE AS orphan" in existing
+    assert "WHERE NOT EXISTS" in existing and "ENTITLEMENTS_STAGE s" in existing
+
+    assert "WHEN MATCHED AND src.orphan THEN DELETE" in merge
+    assert "WHEN MATCHED THEN DELETE" not in merge
+    assert "WHEN NOT MATCHED THEN INSERT" in merge
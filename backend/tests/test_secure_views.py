@@ -0,0 +1,39 @@
+from app.services.snowflake_service import secure_view_sql, tenants_by_schema_suffix
+
+ALICE = "0973369a-1111-4111-8111-111111111111"
+BOB = "0973369a-2222-4222-8222-222222222222"
+CAROL = "5b1c0e2f-3333-4333-8333-333333333333"
+
+
+def test_colliding_suffix_is_ambiguous():
+    tenants = tenants_by_schema_suffix([ALICE, BOB, CAROL])
+    assert tenants == {"0973369A": None, "5B1C0E2F": CAROL}
+
+
+def test_schema_of_colliding_tenants_is_not_exposed():
+    tenants = tenants_by_schema_suffix([ALICE, BOB, CAROL])
+    sql = secure_view_sql(
+        "DB",
+        "ACCOUNT",
+        {"FORTNOX_0973369A": ["NUMBER"], "FORTNOX_5B1C0E2F": ["NUMBER"]},
+        tenants,
+    )
+    assert "FORTNOX_0973369A" not in sql
+    assert ALICE not in sql and BOB not in sql
+    assert f"'{CAROL}' AS TENANT_ID" in sql
+
+
+def test_only_colliding_schemas_gives_no_view():
+    tenants = tenants_by_schema_suffix([ALICE, BOB])
+    assert (
+        secure_view_sql("DB", "ACCOUNT", {"FORTNOX_0973369A": ["NUMBER"]}, tenants)
+        is None
+    )
+
+
+def test_schemas_with_tenant_id_column_are_kept():
+    tenants = tenants_by_schema_suffix([ALICE, BOB])
+    sql = secure_view_sql(
+        "DB", "TRANSACTIONS", {"TINK_0973369A": ["TENANT_ID", "AMOUNT"]}, tenants
+    )
+    assert 'FROM DB."TINK_0973369A"."TRANSACTIONS"' in sql
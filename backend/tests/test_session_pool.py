@@ -0,0 +1,54 @@
+from app.services.session_pool import SessionPool
+
+
+class Connection:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect(role):
+        opened.append(Connection())
+        return opened[-1]
+
+    pool = SessionPool(
+        connect=connect, check=lambda conn: None, max_idle=2, idle_seconds=60, **kwargs
+    )
+    return pool, opened
+
+
+def test_reused_session_needs_no_round_trip():
+    pool, opened = make_pool()
+    session = pool.acquire("TENANT_A")
+    session.close()
+    again = pool.acquire("TENANT_A")
+    assert again.conn is opened[0]
+    assert len(opened) == 1
+    assert pool.stats()["hits"] == 1
+
+
+def test_reset_failure_drops_the_session():
+    def reset(conn):
+        raise RuntimeError("session expired")
+
+    pool, opened = make_pool(reset=reset)
+    pool.acquire("TENANT_A").close()
+    session = pool.acquire("TENANT_A")
+    assert opened[0].closed
+    assert session.conn is opened[1]
+
+
+def test_closed_session_is_not_pooled():
+    pool, opened = make_pool()
+    session = pool.acquire("TENANT_A")
+    session.conn.close()
+    session.close()
+    assert pool.idle_count("TENANT_A") == 0
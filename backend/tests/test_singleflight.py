@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.instrumentation import SINGLEFLIGHT_CALLS
+from app.core.singleflight import SingleFlight
+
+
+class Leader:
+    """fn for SingleFlight.do that blocks until released, counting runs."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.runs += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def wait_for_followers(flight, count):
+    # Followers count themselves as "shared" just before waiting on the call
+    key = (flight.group, "shared")
+    deadline = time.monotonic() + 5
+    while SINGLEFLIGHT_CALLS.values.get(key, 0) < count:
+        assert time.monotonic() < deadline, "followers did not join the call"
+        time.sleep(0.01)
+
+
+def run_concurrently(flight, key, fn, followers=3):
+    pool = ThreadPoolExecutor(followers + 1)
+    leader = pool.submit(flight.do, key, fn)
+    assert fn.started.wait(5)
+    others = [pool.submit(flight.do, key, fn) for _ in range(followers)]
+    wait_for_followers(flight, followers)
+    fn.release.set()
+    pool.shutdown(wait=True)
+    return leader, others
+
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight("test_result")
+    fn = Leader(result=[1, 2])
+    leader, others = run_concurrently(flight, "k", fn)
+
+    assert fn.runs == 1
+    assert leader.result() == [1, 2]
+    assert all(f.result() is leader.result() for f in others)
+    assert flight.in_flight() == 0
+
+
+def test_leader_exception_reaches_every_follower():
+    flight = SingleFlight("test_error")
+    error = RuntimeError("warehouse suspended")
+    fn = Leader(error=error)
+    leader, others = run_concurrently(flight, "k", fn)
+
+    assert fn.runs == 1
+    assert leader.exception() is error
+    assert all(f.exception() is error for f in others)
+    assert flight.in_flight() == 0
+
+
+def test_failure_is_not_cached():
+    flight = SingleFlight("test")
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    fn = Leader(result="a")
+    with ThreadPoolExecutor(1) as pool:
+        first = pool.submit(flight.do, "a", fn)
+        assert fn.started.wait(5)
+        assert flight.do("b", lambda: "b") == "b"
+        assert flight.in_flight() == 1
+        fn.release.set()
+        assert first.result() == "a"
@@ -0,0 +1,45 @@
+import threading
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app import main
+from app.main import app
+
+
+def test_startup_with_warmup_and_no_history_collector(monkeypatch, tmp_path):
+    # The warmer is then the first thing to build the Snowflake service
+    monkeypatch.setattr(settings, "warmup_enabled", True)
+    monkeypatch.setattr(settings, "query_history_interval_seconds", 0)
+    monkeypatch.setattr(settings, "secure_views_refresh_on_startup", False)
+    monkeypatch.setattr(settings, "warmup_state_path", str(tmp_path / "arrivals.json"))
+
+    started = threading.Event()
+
+    def run():
+        with TestClient(app):
+            started.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "app startup did not finish"
+    assert started.is_set()
+
+
+def test_startup_refreshes_secure_views(monkeypatch):
+    monkeypatch.setattr(settings, "query_history_interval_seconds", 0)
+    monkeypatch.setattr(settings, "secure_views_refresh_on_startup", True)
+    refreshed = threading.Event()
+    monkeypatch.setattr(
+        main, "refresh_secure_views", lambda snowflake_service: refreshed.set()
+    )
+
+    with TestClient(app):
+        assert refreshed.wait(5)
+
+
+def test_failed_refresh_does_not_stop_startup():
+    class Failing:
+        def refresh_secure_views(self):
+            raise RuntimeError("warehouse unavailable")
+
+    main.refresh_secure_views(Failing())
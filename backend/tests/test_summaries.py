@@ -0,0 +1,145 @@
+import benchmarks  # noqa: F401 (puts the connector directory on sys.path)
+import connector
+from summaries import DailySummary
+
+
+def row(booked_date, amount, account_id="acc-1", currency="SEK"):
+    return {
+        "account_id": account_id,
+        "booked_date": booked_date,
+        "amount": amount,
+        "currency": currency,
+    }
+
+
+def payload(id, booked, unscaled):
+    return {
+        "id": id,
+        "amount": {
+            "value": {"unscaledValue": unscaled, "scale": "2"},
+            "currencyCode": "SEK",
+        },
+        "dates": {"booked": booked},
+    }
+
+
+class RecordingSink:
+    def __init__(self):
+        self.upserts = {}
+
+    def upsert(self, table, rows):
+        self.upserts.setdefault(table, []).extend(rows)
+
+
+def test_day_totals_inflow_outflow_and_count():
+    summary = DailySummary("tenant-a")
+    summary.add(
+        [
+            row("2024-03-01", "100.00"),
+            row("2024-03-01", "-40.50"),
+            row("2024-03-01", "-9.50"),
+            row("2024-03-02", "5.00"),
+            row("2024-03-01", "1.00", currency="EUR"),
+            row("2024-03-01", "-2.00", account_id="acc-2"),
+        ]
+    )
+    by_key = {
+        (r["account_id"], r["summary_date"], r["currency"]): r for r in summary.rows()
+    }
+    assert by_key[("acc-1", "2024-03-01", "SEK")] == {
+        "tenant_id": "tenant-a",
+        "account_id": "acc-1",
+        "summary_date": "2024-03-01",
+        "currency": "SEK",
+        "inflow": "100.00",
+        "outflow": "50.00",
+        "transaction_count": 3,
+    }
+    assert by_key[("acc-1", "2024-03-02", "SEK")]["inflow"] == "5.00"
+    assert by_key[("acc-1", "2024-03-01", "EUR")]["transaction_count"] == 1
+    assert by_key[("acc-2", "2024-03-01", "SEK")]["outflow"] == "2.00"
+    assert len(by_key) == 4
+
+
+def test_unbooked_and_amountless_rows_are_skipped():
+    summary = DailySummary("tenant-a")
+    summary.add([row(None, "10.00"), row("2024-03-01", None)])
+    assert summary.rows() == []
+
+
+def test_rows_since_and_load_round_trip():
+    summary = DailySummary("tenant-a")
+    summary.add([row("2024-03-01", "1.00"), row("2024-03-03", "-3.00")])
+    assert [r["summary_date"] for r in summary.rows(since="2024-03-02")] == [
+        "2024-03-03"
+    ]
+
+    resumed = DailySummary("tenant-a")
+    resumed.load(summary.rows())
+    resumed.add([row("2024-03-03", "-1.00")])
+    (day,) = resumed.rows(since="2024-03-03")
+    assert (day["outflow"], day["transaction_count"]) == ("4.00", 2)
+
+
+def test_incremental_sync_summarizes_whole_days(monkeypatch):
+    # The cursor day was already partly synced; the fetch from it returns the
+    # whole day, so its summary replaces the earlier one instead of adding to it.
+    transactions = [
+        payload("t1", "2024-03-01", "-1000"),
+        payload("t2", "2024-03-01", "-500"),
+        payload("t3", "2024-03-02", "2500"),
+    ]
+
+    def fetch_transactions(**kwargs):
+        raise AssertionError("no day outside the fetched range")
+
+    monkeypatch.setattr(connector, "fetch_transactions", fetch_transactions)
+    sink = RecordingSink()
+    connector.upsert_transactions(
+        sink, None, "tenant-a", "acc-1", transactions, "2024-03-01"
+    )
+
+    assert len(sink.upserts["transactions"]) == 3
+    days = {r["summary_date"]: r for r in sink.upserts["daily_summary"]}
+    assert days["2024-03-01"]["outflow"] == "15.00"
+    assert days["2024-03-01"]["transaction_count"] == 2
+    assert days["2024-03-02"]["inflow"] == "25.00"
+
+
+def test_late_booked_day_is_refetched_in_full(monkeypatch):
+    # t1 was booked on a day before the fetched range; summarizing only it
+    # would overwrite that day's summary with a partial one.
+    fetched = [
+        payload("t1", "2024-02-27", "-1000"),
+        payload("t2", "2024-03-01", "-500"),
+    ]
+    late_day = [
+        payload("t0", "2024-02-27", "-2000"),
+        payload("t1", "2024-02-27", "-1000"),
+        payload("t9", "2024-02-28", "-9900"),
+    ]
+    calls = []
+
+    def fetch_transactions(**kwargs):
+        calls.append(kwargs)
+        return late_day
+
+    monkeypatch.setattr(connector, "fetch_transactions", fetch_transactions)
+    sink = RecordingSink()
+    connector.upsert_transactions(
+        sink, "token", "tenant-a", "acc-1", fetched, "2024-03-01"
+    )
+
+    assert calls == [
+        {
+            "token": "token",
+            "account_id": "acc-1",
+            "booked_date_gte": "2024-02-27",
+            "booked_date_lte": "2024-02-27",
+            "strict": True,
+        }
+    ]
+    days = {r["summary_date"]: r for r in sink.upserts["daily_summary"]}
+    assert set(days) == {"2024-02-27", "2024-03-01"}
+    assert days["2024-02-27"]["outflow"] == "30.00"
+    assert days["2024-02-27"]["transaction_count"] == 2
@@ -0,0 +1,47 @@
+import json
+from app.core.telemetry import (
+    MAX_QUERY_TAG_LENGTH,
+    new_request_context,
+    query_tag,
+    request_context,
+)
+
+TENANT = "0973369a-1111-4111-8111-111111111111"
+
+
+def context_for(tenant_id=None, request_id=None):
+    token = new_request_context("/metrics/{tenant_id}/runway", tenant_id, request_id)
+    try:
+        return request_context.get()
+    finally:
+        request_context.reset(token)
+
+
+def test_valid_request_id_is_kept():
+    context = context_for(TENANT, "req-123.abc_X")
+    assert context["request_id"] == "req-123.abc_X"
+    assert context["tenant_id"] == TENANT
+
+
+def test_oversized_or_odd_request_id_is_replaced():
+    for request_id in ["x" * 5000, "a b", "'); DROP TABLE x; --", ""]:
+        context = context_for(TENANT, request_id)
+        assert context["request_id"] != request_id
+        assert len(context["request_id"]) == 32
+
+
+def test_invalid_tenant_id_is_dropped():
+    assert context_for("t" * 3000)["tenant_id"] is None
+
+
+def test_query_tag_does_not_carry_request_fields():
+    token = new_request_context("/x", TENANT, "req-1")
+    try:
+        tag = json.loads(query_tag(workload="interactive"))
+    finally:
+        request_context.reset(token)
+    assert tag == {"app": "arcims-api", "workload": "interactive"}
+
+
+def test_query_tag_is_truncated():
+    assert len(query_tag(workload="x" * 3000)) == MAX_QUERY_TAG_LENGTH
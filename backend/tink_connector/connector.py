@@ -1,8 +1,97 @@
 from fivetran_connector_sdk import Connector
 from fivetran_connector_sdk import Operations as op
 from fivetran_connector_sdk import Logging as log
+import base64
+import copy
+import hashlib
+import json
+import queue
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from cryptography.fernet import Fernet, InvalidToken
 from datetime import datetime, timedelta
+from typing import Optional
+from field_mapping import DECIMAL, Amount, Constant, compile_table
+from summaries import (
+    BALANCE_SNAPSHOTS_SCHEMA,
+    DAILY_SUMMARY_SCHEMA,
+    DailySummary,
+    balance_snapshots,
+)
+
+DEFAULT_TINK_API_URL = "https://api.tink.com"
+
+# Retries for throttled (429) or failing (5xx) Tink data API calls
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0
+
+# Renew the user token this long before Tink says it expires
+TOKEN_EXPIRY_MARGIN_SECONDS = 120
+
+# Defaults for optional configuration keys (Fivetran passes values as strings)
+DEFAULT_INITIAL_LOOKBACK_DAYS = 90
+DEFAULT_BACKFILL_WINDOW_DAYS = 30
+DEFAULT_BACKFILL_WORKERS = 4
+DEFAULT_MOCK_ACCOUNTS = 1
+DEFAULT_MOCK_TRANSACTIONS = 10
+DEFAULT_MOCK_SEED = 42
+DEFAULT_FLEET_WORKERS = 4
+DEFAULT_RESYNC_LOOKBACK_DAYS = 730
+
+# Bumped when rows written by older versions must be fetched again
+# (see migrate_state)
+STATE_VERSION = 2
+
+# Pages buffered between fleet workers and the thread writing to Fivetran
+FLEET_QUEUE_SIZE = 64
+# How often a worker blocked on a full queue checks whether the fleet stopped
+FLEET_PUT_POLL_SECONDS = 1.0
+
+# One pooled HTTP session for all Tink calls, so pages, windows and tenants
+# reuse connections instead of opening one per request
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+
+# Column declarations: (type, source path in the Tink payload).
+# They drive both schema() and the compiled row extraction in update().
+ACCOUNTS = compile_table(
+    "accounts",
+    primary_key=["id"],
+    columns={
+        "id": ("STRING", "id"),
+        "tenant_id": ("STRING", Constant("tenant_id")),
+        "financial_institution_id": ("STRING", "financialInstitutionId"),
+        "name": ("STRING", "name"),
+        "type": ("STRING", "type"),
+        "balance_amount": (DECIMAL, Amount("balances.booked.amount")),
+        "balance_currency": ("STRING", "balances.booked.amount.currencyCode"),
+        "iban": ("STRING", "identifiers.iban.iban"),
+        "last_refreshed": ("STRING", "dates.lastRefreshed"),
+    },
+)
+
+TRANSACTIONS = compile_table(
+    "transactions",
+    primary_key=["id"],
+    columns={
+        "id": ("STRING", "id"),
+        "tenant_id": ("STRING", Constant("tenant_id")),
+        "account_id": ("STRING", Constant("account_id")),
+        "amount": (DECIMAL, Amount("amount")),
+        "currency": ("STRING", "amount.currencyCode"),
+        "booked_date": ("NAIVE_DATE", "dates.booked"),
+        "value_date": ("NAIVE_DATE", "dates.value"),
+        "description": ("STRING", "descriptions.display"),
+        "merchant_name": ("STRING", "merchantInformation.merchantName"),
+        "status": ("STRING", "status"),
+        "type": ("STRING", "types.type"),
+    },
+)
 
 
 def schema(configuration: dict):
@@ -11,38 +100,10 @@ def schema(configuration: dict):
     Schema matches Tink API response structure.
     """
     return [
-        {
-            "table": "accounts",
-            "primary_key": ["id"],
-            "columns": {
-                "id": "STRING",
-                "tenant_id": "STRING",
-                "financial_institution_id": "STRING",
-                "name": "STRING",
-                "type": "STRING",
-                "balance_amount": {"type": "DECIMAL", "precision": 18, "scale": 2},
-                "balance_currency": "STRING",
-                "iban": "STRING",
-                "last_refreshed": "STRING",
-            },
-        },
-        {
-            "table": "transactions",
-            "primary_key": ["id"],
-            "columns": {
-                "id": "STRING",
-                "tenant_id": "STRING",
-                "account_id": "STRING",
-                "amount": {"type": "DECIMAL", "precision": 18, "scale": 2},
-                "currency": "STRING",
-                "booked_date": "NAIVE_DATE",
-                "value_date": "NAIVE_DATE",
-                "description": "STRING",
-                "merchant_name": "STRING",
-                "status": "STRING",
-                "type": "STRING",
-            },
-        },
+        ACCOUNTS.schema(),
+        TRANSACTIONS.schema(),
+        DAILY_SUMMARY_SCHEMA,
+        BALANCE_SNAPSHOTS_SCHEMA,
     ]
 
 
@@ -55,8 +116,30 @@ def update(configuration: dict, state: dict):
     - tink_client_secret: Tink client secret
     - tenant_id: Arcim tenant ID
     - tink_user_id: Tink user ID (use "MOCK" for testing)
+    - tink_api_base_url: Tink API base URL (default https://api.tink.com),
+      e.g. a local fake server for benchmarks
+    - initial_lookback_days: history pulled by the first incremental sync (default 90)
+    - backfill_start_date: optional YYYY-MM-DD, enables historical backfill
+    - backfill_window_days: size of each backfill window (default 30)
+    - backfill_workers: windows fetched in parallel (default 4)
+    - mock_accounts / mock_transactions / mock_seed: MOCK mode data size and seed
+    - mock_delta_transactions: new MOCK transactions per later sync
+      (default: a tenth of mock_transactions)
+    - tenant_manifest: optional JSON list of {"tenant_id", "tink_user_id", ...}
+      entries; syncs all of them in one run (fleet mode, see run_fleet_sync)
+    - fleet_workers: tenants synced concurrently in fleet mode (default 4)
+    - resync_lookback_days: history fetched again when state from an older
+      connector version is migrated without a backfill plan (default 730)
     """
+    if configuration.get("tenant_manifest"):
+        run_fleet_sync(configuration, state)
+        return
 
+    sync_tenant(configuration, state, OperationsSink())
+
+
+def sync_tenant(configuration: dict, state: dict, sink):
+    """Sync one tenant. `state` is that tenant's own state partition."""
     tenant_id = configuration["tenant_id"]
     tink_user_id = configuration.get("tink_user_id")
 
@@ -65,85 +148,33 @@ def update(configuration: dict, state: dict):
     # === MOCK MODE for testing ===
     if tink_user_id == "MOCK":
         log.info("Running in MOCK mode")
-
-        # Mock account
-        op.upsert(
-            table="accounts",
-            data={
-                "id": "mock_account_1",
-                "tenant_id": tenant_id,
-                "financial_institution_id": "swedbank",
-                "name": "Business Checking",
-                "type": "CHECKING",
-                "balance_amount": "150000.50",
-                "balance_currency": "SEK",
-                "iban": "SE1234567890123456",
-                "last_refreshed": datetime.utcnow().isoformat(),
-            },
-        )
-
-        # Mock transactions
-        base_date = datetime.utcnow()
-        for i in range(10):
-            op.upsert(
-                table="transactions",
-                data={
-                    "id": f"mock_txn_{i}",
-                    "tenant_id": tenant_id,
-                    "account_id": "mock_account_1",
-                    "amount": str(-1500.00 - (i * 100)),
-                    "currency": "SEK",
-                    "booked_date": (base_date - timedelta(days=i)).strftime("%Y-%m-%d"),
-                    "value_date": (base_date - timedelta(days=i)).strftime("%Y-%m-%d"),
-                    "description": f"Payment to supplier {i}",
-                    "merchant_name": f"Supplier AB {i}",
-                    "status": "BOOKED",
-                    "type": "DEFAULT",
-                },
-            )
-
-        op.checkpoint(state={"last_sync_date": datetime.utcnow().strftime("%Y-%m-%d")})
-        log.info("Mock sync complete: 1 account, 10 transactions")
+        run_mock_sync(configuration, state, sink)
         return
     # === END MOCK MODE ===
 
-    # Get Tink access token
-    access_token = get_user_access_token(
+    state = migrate_state(configuration, state)
+
+    # Reuse the user token cached in state, run the grant chain only when needed
+    token = TinkUserToken(
         configuration["tink_client_id"],
         configuration["tink_client_secret"],
         tink_user_id,
+        base_url=configuration.get("tink_api_base_url", DEFAULT_TINK_API_URL),
     )
+    if state.get("tink_token"):
+        token.load(state["tink_token"])
 
-    if not access_token:
-        log.severe("Failed to get Tink access token")
-        return
+    if not token.get():
+        # Fails the sync (or, in fleet mode, this tenant) so it is retried
+        raise TinkAPIError(f"Failed to get Tink access token for tenant {tenant_id}")
 
     # Fetch accounts
     log.info("Fetching accounts")
-    accounts = fetch_accounts(access_token)
+    accounts = fetch_accounts(token)
 
-    for account in accounts:
-        op.upsert(
-            table="accounts",
-            data={
-                "id": account["id"],
-                "tenant_id": tenant_id,
-                "financial_institution_id": account.get("financialInstitutionId"),
-                "name": account.get("name"),
-                "type": account.get("type"),
-                "balance_amount": account.get("balances", {})
-                .get("booked", {})
-                .get("amount", {})
-                .get("value", {})
-                .get("unscaledValue"),
-                "balance_currency": account.get("balances", {})
-                .get("booked", {})
-                .get("amount", {})
-                .get("currencyCode"),
-                "iban": account.get("identifiers", {}).get("iban", {}).get("iban"),
-                "last_refreshed": account.get("dates", {}).get("lastRefreshed"),
-            },
-        )
+    account_rows = ACCOUNTS.transform(accounts, tenant_id=tenant_id)
+    sink.upsert("accounts", account_rows)
+    sink.upsert("balance_snapshots", balance_snapshots(account_rows, datetime.utcnow()))
 
     log.info(f"Upserted {len(accounts)} accounts")
 
@@ -151,63 +182,603 @@ def update(configuration: dict, state: dict):
     last_sync = state.get("last_sync_date")
 
     if not last_sync:
-        # First sync - get last 90 days
-        last_sync = (datetime.utcnow() - timedelta(days=90)).strftime("%Y-%m-%d")
+        lookback_days = int(
+            configuration.get("initial_lookback_days", DEFAULT_INITIAL_LOOKBACK_DAYS)
+        )
+        last_sync = (datetime.utcnow() - timedelta(days=lookback_days)).strftime(
+            "%Y-%m-%d"
+        )
         log.info(f"Initial sync from {last_sync}")
 
+    # Backfill covers everything before the incremental cursor started
+    backfill = plan_backfill(configuration, state.get("backfill"), last_sync)
+
     total_transactions = 0
+    failed_accounts = 0
 
     for account in accounts:
         account_id = account["id"]
         log.info(f"Fetching transactions for account {account_id}")
 
-        transactions = fetch_transactions(
-            access_token=access_token, account_id=account_id, booked_date_gte=last_sync
-        )
-
-        for txn in transactions:
-            op.upsert(
-                table="transactions",
-                data={
-                    "id": txn["id"],
-                    "tenant_id": tenant_id,
-                    "account_id": account_id,
-                    "amount": txn.get("amount", {})
-                    .get("value", {})
-                    .get("unscaledValue"),
-                    "currency": txn.get("amount", {}).get("currencyCode"),
-                    "booked_date": txn.get("dates", {}).get("booked"),
-                    "value_date": txn.get("dates", {}).get("value"),
-                    "description": txn.get("descriptions", {}).get("display"),
-                    "merchant_name": txn.get("merchantInformation", {}).get(
-                        "merchantName"
-                    ),
-                    "status": txn.get("status"),
-                    "type": txn.get("types", {}).get("type"),
-                },
+        try:
+            transactions = fetch_transactions(
+                token=token,
+                account_id=account_id,
+                booked_date_gte=last_sync,
+                strict=True,
             )
+        except TinkAPIError as e:
+            # A partial fetch would give partial daily summaries
+            log.warning(f"Skipping account {account_id} until next sync: {e}")
+            failed_accounts += 1
+            continue
+
+        upsert_transactions(sink, token, tenant_id, account_id, transactions, last_sync)
 
         total_transactions += len(transactions)
         log.info(f"Upserted {len(transactions)} transactions for account {account_id}")
 
-    # Update state
-    new_state = {"last_sync_date": datetime.utcnow().strftime("%Y-%m-%d")}
+    # Update state; keep the cursor if an account failed so its range is retried
+    new_state = {
+        "last_sync_date": (
+            last_sync if failed_accounts else datetime.utcnow().strftime("%Y-%m-%d")
+        ),
+        "tink_token": token.dump(),
+        "version": STATE_VERSION,
+    }
+    if backfill:
+        new_state["backfill"] = backfill
 
-    op.checkpoint(state=new_state)
+    sink.checkpoint(new_state)
 
     log.info(
         f"Sync complete: {len(accounts)} accounts, {total_transactions} transactions"
     )
 
+    if backfill and not backfill["complete"]:
+        run_backfill(configuration, new_state, token, accounts, sink)
+
+
+def migrate_state(configuration: dict, state: dict) -> dict:
+    """
+    Rewind the cursors of state checkpointed by an older connector version,
+    so the history it wrote is fetched again and its rows replaced.
+
+    Version 2: amounts used to be written unscaled (100x too large for
+    Tink's usual scale 2). Re-fetching rewrites every transaction by its
+    primary key with the scaled amount and rebuilds its daily summaries.
+    With a backfill plan its windows are redone and the incremental cursor
+    goes back to where the plan ends; otherwise the cursor goes back
+    resync_lookback_days.
+    """
+    if "last_sync_date" not in state or state.get("version", 1) >= STATE_VERSION:
+        return state
+
+    state = dict(state)
+    backfill = state.get("backfill")
+    if backfill:
+        state["backfill"] = {**backfill, "done": {}, "complete": False}
+        state["last_sync_date"] = backfill["end_date"]
+    else:
+        lookback_days = int(
+            configuration.get("resync_lookback_days", DEFAULT_RESYNC_LOOKBACK_DAYS)
+        )
+        state["last_sync_date"] = (
+            datetime.utcnow() - timedelta(days=lookback_days)
+        ).strftime("%Y-%m-%d")
+    log.info(
+        f"Migrating state from version {state.get('version', 1)}: "
+        f"re-syncing from {state['last_sync_date']}"
+    )
+    return state
+
+
+class OperationsSink:
+    """Writes straight to the SDK. Used when a single tenant syncs."""
+
+    def upsert(self, table: str, rows: list):
+        for row in rows:
+            op.upsert(table=table, data=row)
+
+    def checkpoint(self, state: dict):
+        op.checkpoint(state=state)
 
-def get_user_access_token(client_id: str, client_secret: str, user_id: str) -> str:
+
+class FleetCancelled(Exception):
+    """Raised in a fleet worker once run_fleet_sync has stopped reading."""
+
+
+class FleetSink:
+    """
+    Hands one tenant's writes to the thread running run_fleet_sync, which
+    owns all SDK operations. The bounded queue applies backpressure.
+    """
+
+    def __init__(self, tenant_id: str, messages: queue.Queue, stop: threading.Event):
+        self.tenant_id = tenant_id
+        self.messages = messages
+        self.stop = stop
+
+    def upsert(self, table: str, rows: list):
+        self.send(("upsert", table, rows))
+
+    def checkpoint(self, state: dict):
+        # The worker keeps mutating its state (e.g. backfill windows)
+        self.send(("checkpoint", self.tenant_id, copy.deepcopy(state)))
+
+    def send(self, message: tuple):
+        # A plain put() would block forever on a full queue nobody reads
+        while not self.stop.is_set():
+            try:
+                self.messages.put(message, timeout=FLEET_PUT_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+        raise FleetCancelled()
+
+
+def run_fleet_sync(configuration: dict, state: dict):
+    """
+    Sync every tenant in tenant_manifest in one connector run.
+
+    Tenants sync concurrently on fleet_workers threads. Each tenant gets its
+    own state partition under state["tenants"][tenant_id]. Rows go to the
+    shared accounts/transactions tables and carry their tenant_id, which the
+    secure views filter on. Manifest entries override top-level configuration
+    keys for that tenant. A failing tenant is logged and the others continue;
+    the run then fails, naming the failed tenants.
+    If writing to Fivetran fails, the workers are stopped and the error is
+    raised.
+    """
+    manifest = json.loads(configuration["tenant_manifest"])
+    workers = int(configuration.get("fleet_workers", DEFAULT_FLEET_WORKERS))
+    shared = {
+        key: value for key, value in configuration.items() if key != "tenant_manifest"
+    }
+
+    partitions = copy.deepcopy(state.get("tenants", {}))
+    fleet_state = {"tenants": partitions}
+    messages = queue.Queue(maxsize=FLEET_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def run(entry: dict, tenant_state: dict):
+        tenant_id = entry["tenant_id"]
+        sink = FleetSink(tenant_id, messages, stop)
+        try:
+            sync_tenant({**shared, **entry}, tenant_state, sink)
+            outcome = ("done", tenant_id, None)
+        except FleetCancelled:
+            return
+        except Exception as e:
+            outcome = ("failed", tenant_id, e)
+        try:
+            sink.send(outcome)
+        except FleetCancelled:
+            pass
+
+    log.info(f"Fleet sync: {len(manifest)} tenants, {workers} workers")
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for entry in manifest:
+                tenant_state = copy.deepcopy(partitions.get(entry["tenant_id"], {}))
+                pool.submit(run, entry, tenant_state)
+
+            remaining = len(manifest)
+            while remaining:
+                kind, key, payload = messages.get()
+                if kind == "upsert":
+                    for row in payload:
+                        op.upsert(table=key, data=row)
+                elif kind == "checkpoint":
+                    partitions[key] = payload
+                    op.checkpoint(state=fleet_state)
+                elif kind == "failed":
+                    failed.append(key)
+                    log.severe(f"Sync failed for tenant {key}: {payload}")
+                    remaining -= 1
+                else:
+                    remaining -= 1
+        except BaseException:
+            # Unblock workers waiting on the queue so the pool can shut down
+            stop.set()
+            pool.shutdown(cancel_futures=True)
+            raise
+
+    log.info(
+        f"Fleet sync complete: {len(manifest) - len(failed)} tenants synced, "
+        f"{len(failed)} failed"
+    )
+    if failed:
+        # The other tenants' progress is checkpointed; fail the run so the
+        # failed tenants show up and are retried
+        raise TinkAPIError(f"Sync failed for tenants: {', '.join(failed)}")
+
+
+def run_mock_sync(configuration: dict, state: dict, sink):
+    """
+    Emit seeded synthetic data instead of calling Tink.
+
+    The first run generates mock_transactions rows spread over the initial
+    look-back. Each later run adds mock_delta_transactions new rows booked
+    since the previous run and refreshes account balances.
+    """
+    # numpy is only needed for MOCK mode
+    from mock_data import MockDataGenerator, batch_rows
+
+    tenant_id = configuration["tenant_id"]
+    mock_state = state.get("mock", {})
+    run = mock_state.get("run", 0)
+    first_index = mock_state.get("transaction_count", 0)
+
+    generator = MockDataGenerator(
+        tenant_id,
+        seed=int(configuration.get("mock_seed", DEFAULT_MOCK_SEED)),
+        num_accounts=int(configuration.get("mock_accounts", DEFAULT_MOCK_ACCOUNTS)),
+    )
+    initial_count = int(
+        configuration.get("mock_transactions", DEFAULT_MOCK_TRANSACTIONS)
+    )
+
+    today = datetime.utcnow().date()
+    if run == 0:
+        lookback_days = int(
+            configuration.get("initial_lookback_days", DEFAULT_INITIAL_LOOKBACK_DAYS)
+        )
+        start = today - timedelta(days=lookback_days)
+        count = initial_count
+    else:
+        start = datetime.strptime(mock_state["last_date"], "%Y-%m-%d").date()
+        count = int(
+            configuration.get("mock_delta_transactions", max(initial_count // 10, 1))
+        )
+
+    accounts = generator.accounts(run)
+    sink.upsert("accounts", accounts)
+    sink.upsert("balance_snapshots", balance_snapshots(accounts, datetime.utcnow()))
+
+    # Later runs add rows to days already summarised, so the totals for the
+    # last day are carried over in state and the new rows are added to them
+    summary = DailySummary(tenant_id)
+    summary.load(mock_state.get("open_summary", []))
+    for batch in generator.transactions(run, first_index, count, start, today):
+        rows = list(batch_rows(batch, tenant_id))
+        sink.upsert("transactions", rows)
+        summary.add(rows)
+    sink.upsert("daily_summary", summary.rows())
+
+    new_state = dict(state)
+    new_state["last_sync_date"] = today.strftime("%Y-%m-%d")
+    new_state["mock"] = {
+        "run": run + 1,
+        "transaction_count": first_index + count,
+        "last_date": today.strftime("%Y-%m-%d"),
+        "open_summary": summary.rows(since=today.strftime("%Y-%m-%d")),
+    }
+    sink.checkpoint(new_state)
+    log.info(f"Mock sync complete: {len(accounts)} accounts, {count} transactions")
+
+
+def upsert_transactions(
+    sink,
+    token: "TinkUserToken",
+    tenant_id: str,
+    account_id: str,
+    transactions: list,
+    booked_from: str,
+    booked_to: str = None,
+):
+    """
+    Flatten Tink transactions, upsert them and their daily summary.
+
+    `transactions` is a complete fetch of the account's booked dates from
+    booked_from to booked_to (inclusive, open-ended if None), so each day in
+    that range is summarized from them in full. A transaction booked late,
+    on a day outside the range, would replace that day's summary with a
+    partial one; those days are fetched again in full and summarized from
+    that.
+    """
+    rows = TRANSACTIONS.transform(
+        transactions, tenant_id=tenant_id, account_id=account_id
+    )
+    sink.upsert("transactions", rows)
+
+    summary = DailySummary(tenant_id)
+    summary.add(row for row in rows if in_range(row, booked_from, booked_to))
+
+    late_days = sorted(
+        {
+            row["booked_date"]
+            for row in rows
+            if row["booked_date"] and not in_range(row, booked_from, booked_to)
+        }
+    )
+    if late_days:
+        try:
+            refetched = fetch_transactions(
+                token=token,
+                account_id=account_id,
+                booked_date_gte=late_days[0],
+                booked_date_lte=late_days[-1],
+                strict=True,
+            )
+        except TinkAPIError as e:
+            log.warning(
+                f"Not summarizing {len(late_days)} late-booked days for account "
+                f"{account_id}: {e}"
+            )
+        else:
+            late_rows = TRANSACTIONS.transform(
+                refetched, tenant_id=tenant_id, account_id=account_id
+            )
+            summary.add(row for row in late_rows if row["booked_date"] in late_days)
+
+    sink.upsert("daily_summary", summary.rows())
+
+
+def in_range(row: dict, booked_from: str, booked_to: str = None) -> bool:
+    booked = row["booked_date"]
+    return (
+        bool(booked)
+        and booked >= booked_from
+        and (not booked_to or booked <= booked_to)
+    )
+
+
+def plan_backfill(configuration: dict, backfill: dict, end_date: str) -> dict:
+    """
+    Backfill state for this sync, or None if backfill is not configured.
+
+    The history between backfill_start_date and the first incremental cursor
+    is split into fixed date windows per account. Completed windows are
+    recorded in state so a restarted backfill only fetches what is left.
+    Changing backfill_start_date or backfill_window_days starts a new plan.
+    """
+    start_date = configuration.get("backfill_start_date")
+    if not start_date:
+        return None
+
+    window_days = int(
+        configuration.get("backfill_window_days", DEFAULT_BACKFILL_WINDOW_DAYS)
+    )
+
+    if (
+        backfill
+        and backfill["start_date"] == start_date
+        and backfill["window_days"] == window_days
+    ):
+        return backfill
+
+    log.info(f"Planning backfill from {start_date} to {end_date}")
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "window_days": window_days,
+        "done": {},
+        "complete": start_date >= end_date,
+    }
+
+
+def backfill_windows(backfill: dict) -> list:
+    """(window_start, window_end) date strings covering the backfill range."""
+    start = datetime.strptime(backfill["start_date"], "%Y-%m-%d")
+    end = datetime.strptime(backfill["end_date"], "%Y-%m-%d")
+    step = timedelta(days=backfill["window_days"])
+
+    windows = []
+    while start <= end:
+        window_end = min(start + step - timedelta(days=1), end)
+        windows.append((start.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
+def run_backfill(
+    configuration: dict, state: dict, token: "TinkUserToken", accounts: list, sink
+):
+    """
+    Fetch the remaining backfill windows in parallel.
+
+    Windows are fetched on a thread pool; upserts and checkpoints happen on
+    this thread as each window completes. A failed window stays pending and
+    is retried on the next sync.
+    """
+    tenant_id = configuration["tenant_id"]
+    backfill = state["backfill"]
+    workers = int(configuration.get("backfill_workers", DEFAULT_BACKFILL_WORKERS))
+    windows = backfill_windows(backfill)
+
+    jobs = [
+        (account["id"], window_start, window_end)
+        for account in accounts
+        for window_start, window_end in windows
+        if window_start not in backfill["done"].get(account["id"], [])
+    ]
+    log.info(f"Backfill: {len(jobs)} windows left, {workers} workers")
+
+    def fetch_window(job):
+        account_id, window_start, window_end = job
+        return fetch_transactions(
+            token=token,
+            account_id=account_id,
+            booked_date_gte=window_start,
+            booked_date_lte=window_end,
+            strict=True,
+        )
+
+    failed = 0
+    for job, transactions, error in fetch_in_parallel(jobs, fetch_window, workers):
+        account_id, window_start, window_end = job
+        if error:
+            failed += 1
+            log.warning(
+                f"Backfill window {window_start}..{window_end} failed for "
+                f"account {account_id}: {error}"
+            )
+            continue
+
+        upsert_transactions(
+            sink, token, tenant_id, account_id, transactions, window_start, window_end
+        )
+
+        backfill["done"].setdefault(account_id, []).append(window_start)
+        state["tink_token"] = token.dump()
+        sink.checkpoint(state)
+
+    if not failed:
+        backfill["complete"] = True
+        sink.checkpoint(state)
+        log.info("Backfill complete")
+    else:
+        log.warning(f"Backfill incomplete: {failed} windows will be retried")
+
+
+def fetch_in_parallel(jobs: list, fetch, workers: int):
+    """
+    Run fetch(job) on a thread pool, yielding (job, result, error) as jobs finish.
+    Keeps at most 2 * workers jobs in flight so results don't pile up in memory.
+    """
+    jobs = iter(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_next():
+            job = next(jobs, None)
+            if job is not None:
+                pending[pool.submit(fetch, job)] = job
+
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                error = future.exception()
+                yield job, None if error else future.result(), error
+                submit_next()
+
+
+class TinkAPIError(Exception):
+    pass
+
+
+class TinkUserToken:
+    """
+    User access token for one Tink user.
+    Cached encrypted in connector state between syncs and renewed
+    transparently (refresh token first, full grant chain as fallback).
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        user_id: str,
+        base_url: str = DEFAULT_TINK_API_URL,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.user_id = user_id
+        self.base_url = base_url.rstrip("/")
+        self.access_token = None
+        self.refresh_token = None
+        self.expires_at = 0.0
+        # Backfill workers share one token
+        self._lock = threading.Lock()
+
+    def _fernet(self) -> Fernet:
+        # Key is derived from the client secret, so only this connector can read it
+        key = hashlib.sha256(self.client_secret.encode()).digest()
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def load(self, encrypted: str) -> bool:
+        """Restore a token cached in state. Returns False if it can't be used."""
+        try:
+            payload = json.loads(self._fernet().decrypt(encrypted.encode()))
+        except (InvalidToken, ValueError):
+            log.warning("Ignoring unreadable cached Tink token")
+            return False
+
+        if payload.get("user_id") != self.user_id:
+            return False
+
+        self.access_token = payload.get("access_token")
+        self.refresh_token = payload.get("refresh_token")
+        self.expires_at = payload.get("expires_at", 0.0)
+        return True
+
+    def dump(self) -> Optional[str]:
+        """Encrypted token payload for connector state."""
+        if not self.access_token:
+            return None
+
+        payload = {
+            "user_id": self.user_id,
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "expires_at": self.expires_at,
+        }
+        return self._fernet().encrypt(json.dumps(payload).encode()).decode()
+
+    def get(self) -> Optional[str]:
+        """Return a valid access token, renewing it if it is about to expire."""
+        with self._lock:
+            if self.access_token and time.time() < (
+                self.expires_at - TOKEN_EXPIRY_MARGIN_SECONDS
+            ):
+                return self.access_token
+            return self._renew()
+
+    def renew(self, rejected: str = None) -> Optional[str]:
+        """
+        Get a new access token from Tink.
+        If `rejected` is given and another thread already replaced that
+        token, the newer one is returned instead of renewing again.
+        """
+        with self._lock:
+            if rejected and self.access_token and self.access_token != rejected:
+                return self.access_token
+            return self._renew()
+
+    def _renew(self) -> Optional[str]:
+        response = None
+        if self.refresh_token:
+            response = refresh_user_access_token(
+                self.client_id, self.client_secret, self.refresh_token, self.base_url
+            )
+        if not response:
+            log.info("Running full Tink authorization flow")
+            response = get_user_access_token(
+                self.client_id, self.client_secret, self.user_id, self.base_url
+            )
+
+        if not response:
+            self.access_token = None
+            return None
+
+        self.access_token = response["access_token"]
+        # Tink doesn't always rotate the refresh token
+        self.refresh_token = response.get("refresh_token", self.refresh_token)
+        self.expires_at = time.time() + int(response.get("expires_in", 0))
+        return self.access_token
+
+
+def get_user_access_token(
+    client_id: str,
+    client_secret: str,
+    user_id: str,
+    base_url: str = DEFAULT_TINK_API_URL,
+) -> dict:
     """
     Get user access token from Tink.
     Implements authorization flow from Tink docs.
+    Returns the token response (access_token, refresh_token, expires_in).
     """
     # Step 1: Get client access token
-    response = requests.post(
-        "https://api.tink.com/api/v1/oauth/token",
+    response = session.post(
+        f"{base_url}/api/v1/oauth/token",
         data={
             "client_id": client_id,
             "client_secret": client_secret,
@@ -223,8 +794,8 @@ def get_user_access_token(client_id: str, client_secret: str, user_id: str) -> s
     client_token = response.json()["access_token"]
 
     # Step 2: Generate authorization code for user
-    response = requests.post(
-        "https://api.tink.com/api/v1/oauth/authorization-grant",
+    response = session.post(
+        f"{base_url}/api/v1/oauth/authorization-grant",
         headers={"Authorization": f"Bearer {client_token}"},
         data={
             "user_id": user_id,
@@ -239,8 +810,8 @@ def get_user_access_token(client_id: str, client_secret: str, user_id: str) -> s
     auth_code = response.json()["code"]
 
     # Step 3: Exchange code for user access token
-    response = requests.post(
-        "https://api.tink.com/api/v1/oauth/token",
+    response = session.post(
+        f"{base_url}/api/v1/oauth/token",
         data={
             "code": auth_code,
             "client_id": client_id,
@@ -253,16 +824,74 @@ def get_user_access_token(client_id: str, client_secret: str, user_id: str) -> s
         log.severe(f"Failed to get user token: {response.text}")
         return None
 
-    return response.json()["access_token"]
+    return response.json()
 
 
-def fetch_accounts(access_token: str) -> list:
-    """Fetch accounts from Tink API."""
-    response = requests.get(
-        "https://api.tink.com/data/v2/accounts",
-        headers={"Authorization": f"Bearer {access_token}"},
+def refresh_user_access_token(
+    client_id: str,
+    client_secret: str,
+    refresh_token: str,
+    base_url: str = DEFAULT_TINK_API_URL,
+) -> Optional[dict]:
+    """Exchange a refresh token for a new user access token."""
+    response = session.post(
+        f"{base_url}/api/v1/oauth/token",
+        data={
+            "refresh_token": refresh_token,
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "grant_type": "refresh_token",
+        },
     )
 
+    if response.status_code != 200:
+        log.warning(f"Failed to refresh user token: {response.text}")
+        return None
+
+    return response.json()
+
+
+def tink_get(token: TinkUserToken, path: str, params: dict = None):
+    """
+    GET from the Tink data API.
+    Renews the token once if it is rejected, and retries throttled or
+    failing requests with backoff (honouring Retry-After).
+    """
+    url = f"{token.base_url}{path}"
+    access_token = token.get()
+    renewed = False
+
+    for attempt in range(MAX_RETRIES + 1):
+        response = session.get(
+            url, headers={"Authorization": f"Bearer {access_token}"}, params=params
+        )
+
+        if response.status_code == 401 and not renewed:
+            renewed = True
+            access_token = token.renew(rejected=access_token)
+            if not access_token:
+                return response
+            log.info("Tink token expired mid-sync, renewed")
+            continue
+
+        if response.status_code != 429 and response.status_code < 500:
+            return response
+
+        if attempt < MAX_RETRIES:
+            delay = RETRY_BACKOFF_SECONDS * 2**attempt
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            log.warning(f"Tink returned {response.status_code}, retrying in {delay}s")
+            time.sleep(delay)
+
+    return response
+
+
+def fetch_accounts(token: TinkUserToken) -> list:
+    """Fetch accounts from Tink API."""
+    response = tink_get(token, "/data/v2/accounts")
+
     if response.status_code != 200:
         log.severe(f"Failed to fetch accounts: {response.text}")
         return []
@@ -271,9 +900,17 @@ def fetch_accounts(access_token: str) -> list:
 
 
 def fetch_transactions(
-    access_token: str, account_id: str, booked_date_gte: str
+    token: TinkUserToken,
+    account_id: str,
+    booked_date_gte: str,
+    booked_date_lte: str = None,
+    strict: bool = False,
 ) -> list:
-    """Fetch transactions from Tink API with pagination."""
+    """
+    Fetch transactions from Tink API with pagination.
+    With strict=True a failed page raises TinkAPIError instead of
+    returning the pages fetched so far.
+    """
     all_transactions = []
     page_token = None
 
@@ -284,16 +921,19 @@ def fetch_transactions(
             "pageSize": 100,
         }
 
+        if booked_date_lte:
+            params["bookedDateLte"] = booked_date_lte
+
         if page_token:
             params["pageToken"] = page_token
 
-        response = requests.get(
-            "https://api.tink.com/data/v2/transactions",
-            headers={"Authorization": f"Bearer {access_token}"},
-            params=params,
-        )
+        response = tink_get(token, "/data/v2/transactions", params=params)
 
         if response.status_code != 200:
+            if strict:
+                raise TinkAPIError(
+                    f"Failed to fetch transactions: {response.status_code} {response.text}"
+                )
             log.warning(f"Failed to fetch transactions: {response.text}")
             break
 
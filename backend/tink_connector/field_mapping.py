@@ -0,0 +1,142 @@
+"""
+Declarative mapping from Tink API payloads to connector rows.
+
+Each table declares its columns once as (type, source). The declarations
+drive both schema() and row extraction: compile_table() turns them into a
+generated Python function that flattens a whole page of payloads in one
+loop, with every nested lookup resolved once per row.
+
+Sources:
+- "a.b.c": nested key path into the payload (missing keys give None)
+- Amount("a.b"): Tink amount object at that path, scaled to a decimal string
+- Constant("name"): value passed in by the caller (e.g. tenant_id)
+"""
+
+from decimal import Decimal, InvalidOperation
+
+
+class Amount:
+    """
+    Tink amount: {"value": {"unscaledValue": "-10550", "scale": "2"}}.
+    The path points at the object holding "value".
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+class Constant:
+    """Column filled from a keyword argument of the compiled transform."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+DECIMAL = {"type": "DECIMAL", "precision": 18, "scale": 2}
+
+
+def scale_amount(value: dict):
+    """Decimal string for an {"unscaledValue", "scale"} pair, None if absent."""
+    if not value:
+        return None
+    unscaled = value.get("unscaledValue")
+    if unscaled is None:
+        return None
+    try:
+        scale = int(value.get("scale") or 0)
+    except ValueError:
+        return None
+
+    # Fast path: plain integer string, shift the decimal point as text
+    negative = unscaled[:1] == "-"
+    digits = unscaled[1:] if negative else unscaled
+    if scale > 0 and digits.isdigit():
+        digits = digits.rjust(scale + 1, "0")
+        sign = "-" if negative else ""
+        return f"{sign}{digits[:-scale]}.{digits[-scale:]}"
+
+    try:
+        return format(Decimal(unscaled).scaleb(-scale), "f")
+    except InvalidOperation:
+        return None
+
+
+class CompiledTable:
+    """A table declaration plus its generated transform function."""
+
+    def __init__(self, name: str, primary_key: list, columns: dict):
+        self.name = name
+        self.primary_key = primary_key
+        self.columns = columns
+        self.constants = sorted(
+            {
+                source.name
+                for _, source in columns.values()
+                if isinstance(source, Constant)
+            }
+        )
+        self.source = generate_source(columns, self.constants)
+        namespace = {"scale_amount": scale_amount, "EMPTY": {}}
+        exec(compile(self.source, f"<mapping {name}>", "exec"), namespace)
+        self._transform = namespace["transform"]
+
+    def schema(self) -> dict:
+        return {
+            "table": self.name,
+            "primary_key": self.primary_key,
+            "columns": {
+                name: column_type for name, (column_type, _) in self.columns.items()
+            },
+        }
+
+    def transform(self, items: list, **constants) -> list:
+        """Flatten a page of payloads into rows for this table."""
+        return self._transform(items, **constants)
+
+
+def generate_source(columns: dict, constants: list) -> str:
+    """
+    Python source for `transform(items, <constants>)`.
+
+    Intermediate objects are bound to locals once per row, so paths that
+    share a prefix (balances.booked.amount.*) only walk it once.
+    """
+    params = ", ".join(["items"] + constants)
+    lines = [
+        f"def transform({params}):",
+        "    rows = []",
+        "    append = rows.append",
+        "    for item in items:",
+    ]
+
+    bound = {(): "item"}
+
+    def bind(path: tuple) -> str:
+        """Local variable holding the dict at `path`, emitting lookups as needed."""
+        if path in bound:
+            return bound[path]
+        parent = bind(path[:-1])
+        var = f"v{len(bound)}"
+        lines.append(f"        {var} = {parent}.get({path[-1]!r}) or EMPTY")
+        bound[path] = var
+        return var
+
+    values = []
+    for name, (_, source) in columns.items():
+        if isinstance(source, Constant):
+            values.append((name, source.name))
+        elif isinstance(source, Amount):
+            holder = bind(tuple(source.path.split(".")))
+            values.append((name, f"scale_amount({holder}.get('value'))"))
+        else:
+            *parents, key = source.split(".")
+            values.append((name, f"{bind(tuple(parents))}.get({key!r})"))
+
+    lines.append("        append({")
+    lines += [f"            {name!r}: {expression}," for name, expression in values]
+    lines += ["        })", "    return rows"]
+    return "\n".join(lines) + "\n"
+
+
+def compile_table(name: str, primary_key: list, columns: dict) -> CompiledTable:
+    return CompiledTable(name, primary_key, columns)
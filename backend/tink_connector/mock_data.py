@@ -0,0 +1,265 @@
+"""
+Seeded synthetic Tink data for the connector's MOCK mode.
+
+Transactions are generated column-wise with numpy in fixed-size batches,
+so tens of millions of rows can be produced for load tests without
+holding them all in memory. The same seed always produces the same
+accounts and the same transactions for a given run.
+"""
+
+from datetime import date, datetime
+
+import numpy as np
+
+CURRENCIES = np.array(["SEK", "EUR", "USD", "NOK"])
+CURRENCY_WEIGHTS = [0.70, 0.18, 0.08, 0.04]
+# Approximate SEK per unit, used to keep amounts realistic per currency
+SEK_PER_UNIT = np.array([1.0, 11.5, 10.7, 1.0])
+
+ACCOUNT_TYPES = np.array(["CHECKING", "SAVINGS", "CREDIT_CARD"])
+ACCOUNT_TYPE_WEIGHTS = [0.6, 0.3, 0.1]
+BANKS = np.array(["swedbank", "seb", "handelsbanken", "nordea", "danske-bank"])
+
+MERCHANT_PREFIXES = [
+    "Nordic",
+    "Svea",
+    "Bergs",
+    "Lunds",
+    "Stockholms",
+    "Göta",
+    "Norrlands",
+    "Vasa",
+    "Kungs",
+    "Skåne",
+    "Malmö",
+    "Öresund",
+    "Fjäll",
+    "Hav",
+    "Ek",
+]
+MERCHANT_SUFFIXES = [
+    "Konsult AB",
+    "Logistik AB",
+    "Bygg AB",
+    "IT AB",
+    "Kontor AB",
+    "Café",
+    "Redovisning AB",
+    "Transport AB",
+    "Media AB",
+    "Energi AB",
+    "Hyra AB",
+    "Livs",
+    "El AB",
+    "Försäkring AB",
+    "Data AB",
+    "Städ AB",
+    "Tryck AB",
+]
+
+# Share of transactions that are incoming payments
+INFLOW_SHARE = 0.2
+# Transactions this close to the run date may still be pending
+PENDING_DAYS = 3
+
+
+class MockDataGenerator:
+    """
+    Generates accounts and transactions for one tenant.
+
+    Accounts are derived from the seed only, so they are stable across
+    runs. Transactions are derived from (seed, run, batch), so a run can
+    be regenerated exactly and each run adds new rows.
+    """
+
+    def __init__(
+        self,
+        tenant_id: str,
+        seed: int = 42,
+        num_accounts: int = 1,
+        batch_size: int = 100_000,
+    ):
+        self.tenant_id = tenant_id
+        self.seed = seed
+        self.num_accounts = num_accounts
+        self.batch_size = batch_size
+        self.id_prefix = f"mock_{tenant_id.replace('-', '')[:8]}"
+
+        rng = np.random.default_rng([seed, 0])
+        self.account_ids = np.array(
+            [f"{self.id_prefix}_acc_{i}" for i in range(num_accounts)]
+        )
+        self.account_currency = rng.choice(
+            len(CURRENCIES), size=num_accounts, p=CURRENCY_WEIGHTS
+        )
+        self.account_type = rng.choice(
+            len(ACCOUNT_TYPES), size=num_accounts, p=ACCOUNT_TYPE_WEIGHTS
+        )
+        self.account_bank = rng.integers(len(BANKS), size=num_accounts)
+        self.account_base_balance = rng.lognormal(np.log(250_000), 1.0, num_accounts)
+        # A few accounts carry most of the activity
+        activity = rng.pareto(1.5, num_accounts) + 1
+        self.account_weights = activity / activity.sum()
+
+        merchants = [f"{p} {s}" for p in MERCHANT_PREFIXES for s in MERCHANT_SUFFIXES]
+        order = rng.permutation(len(merchants))
+        # Indexed by popularity rank; descriptions are precomputed per merchant
+        self.merchants = np.array(merchants)[order]
+        self.incoming = np.char.add("Payment from ", self.merchants)
+        self.outgoing = np.char.add("Payment to ", self.merchants)
+
+    def accounts(self, run: int) -> list:
+        """Account rows for a run. Balances drift from run to run."""
+        rng = np.random.default_rng([self.seed, run, 1])
+        drift = rng.normal(1.0, 0.05, self.num_accounts)
+        balances = np.round(
+            self.account_base_balance * drift / SEK_PER_UNIT[self.account_currency], 2
+        )
+        refreshed = datetime.utcnow().isoformat()
+
+        return [
+            {
+                "id": str(self.account_ids[i]),
+                "tenant_id": self.tenant_id,
+                "financial_institution_id": str(BANKS[self.account_bank[i]]),
+                "name": f"Business account {i + 1}",
+                "type": str(ACCOUNT_TYPES[self.account_type[i]]),
+                "balance_amount": f"{balances[i]:.2f}",
+                "balance_currency": str(CURRENCIES[self.account_currency[i]]),
+                "iban": f"SE{(self.seed * 7919 + i) % 10**22:022d}",
+                "last_refreshed": refreshed,
+            }
+            for i in range(self.num_accounts)
+        ]
+
+    def transactions(
+        self, run: int, first_index: int, count: int, start: date, end: date
+    ):
+        """
+        Yield batches of transaction columns (dict of numpy arrays).
+        Row ids are `first_index` .. `first_index + count - 1`, booked
+        between `start` and `end` inclusive.
+        """
+        days, day_weights, date_strings = self._calendar(start, end)
+
+        for batch_no, offset in enumerate(range(0, count, self.batch_size)):
+            size = min(self.batch_size, count - offset)
+            rng = np.random.default_rng([self.seed, run, 2, batch_no])
+            yield self._batch(
+                rng, first_index + offset, size, days, day_weights, date_strings
+            )
+
+    def account_day(self, account: int, day: date, count: int, today: date) -> dict:
+        """
+        The `count` transactions of a single account booked on `day`. Rows
+        depend only on (account, day, index), so a fake API serves the same
+        transaction whatever date range it was requested with.
+        """
+        rng = np.random.default_rng([self.seed, 3, account, day.toordinal()])
+        days, day_weights, date_strings = self._calendar(day, day)
+        return self._batch(
+            rng,
+            0,
+            count,
+            days,
+            day_weights,
+            date_strings,
+            account=account,
+            id_prefix=f"{self.id_prefix}_{account}_{day:%Y%m%d}",
+            recent=(today - day).days <= PENDING_DAYS,
+        )
+
+    def _calendar(self, start: date, end: date):
+        days = max((end - start).days + 1, 1)
+        # One extra day so value dates can fall after the last booked date
+        date_strings = (np.datetime64(start) + np.arange(days + 1)).astype(str)
+        return days, self.day_weights(start, days), date_strings
+
+    def day_weights(self, start: date, days: int) -> np.ndarray:
+        """Fewer transactions on weekends, a peak around the 25th (salaries, rent)."""
+        day_numbers = np.datetime64(start) + np.arange(days)
+        weekday = (day_numbers.astype("datetime64[D]").view("int64") - 4) % 7
+        day_of_month = (
+            day_numbers - day_numbers.astype("datetime64[M]").astype("datetime64[D]")
+        ).astype(int) + 1
+
+        weights = np.where(weekday >= 5, 0.25, 1.0)
+        weights = weights * np.where(np.abs(day_of_month - 25) <= 1, 2.5, 1.0)
+        return weights / weights.sum()
+
+    def _batch(
+        self,
+        rng,
+        first_index,
+        size,
+        days,
+        day_weights,
+        date_strings,
+        account=None,
+        id_prefix=None,
+        recent=None,
+    ):
+        if account is None:
+            accounts = rng.choice(self.num_accounts, size=size, p=self.account_weights)
+        else:
+            accounts = np.full(size, account)
+        currency = self.account_currency[accounts]
+
+        booked = rng.choice(days, size=size, p=day_weights)
+        value = booked + (rng.random(size) < 0.1)
+
+        inflow = rng.random(size) < INFLOW_SHARE
+        amount_sek = np.where(
+            inflow,
+            rng.lognormal(np.log(15_000), 1.0, size),
+            -rng.lognormal(np.log(800), 1.2, size),
+        )
+        cents = np.rint(amount_sek / SEK_PER_UNIT[currency] * 100).astype(np.int64)
+
+        # Zipf-distributed merchants: a handful of suppliers dominate
+        merchant = np.minimum(rng.zipf(1.3, size), len(self.merchants)) - 1
+
+        if recent is None:
+            recent = booked >= days - PENDING_DAYS
+        pending = recent & (rng.random(size) < 0.5)
+
+        ids = np.char.add(
+            f"{id_prefix or self.id_prefix}_txn_",
+            np.arange(first_index, first_index + size).astype(str),
+        )
+
+        return {
+            "id": ids,
+            "account_id": self.account_ids[accounts],
+            "amount": format_cents(cents),
+            "currency": CURRENCIES[currency],
+            "booked_date": date_strings[booked],
+            "value_date": date_strings[value],
+            "description": np.where(
+                inflow, self.incoming[merchant], self.outgoing[merchant]
+            ),
+            "merchant_name": self.merchants[merchant],
+            "status": np.where(pending, "PENDING", "BOOKED"),
+            "type": np.where(inflow, "TRANSFER", "DEFAULT"),
+        }
+
+
+# ".00" .. ".99", indexed by the cents part of an amount
+CENT_STRINGS = np.array([f".{i:02d}" for i in range(100)])
+
+
+def format_cents(cents: np.ndarray) -> np.ndarray:
+    """Decimal strings ("-1234.50") for integer cent amounts, without a Python loop."""
+    magnitude = np.abs(cents)
+    units = np.char.add(np.where(cents < 0, "-", ""), (magnitude // 100).astype(str))
+    return np.char.add(units, CENT_STRINGS[magnitude % 100])
+
+
+def batch_rows(batch: dict, tenant_id: str):
+    """Turn a column batch into row dicts ready for op.upsert."""
+    columns = list(batch)
+    values = [batch[name].tolist() for name in columns]
+    for row in zip(*values):
+        data = dict(zip(columns, row))
+        data["tenant_id"] = tenant_id
+        yield data
@@ -0,0 +1,123 @@
+"""
+Pre-aggregated tables emitted next to the raw Tink rows.
+
+- daily_summary: inflow, outflow and transaction count per
+  (tenant, account, booked date, currency)
+- balance_snapshots: each account's booked balance at every sync
+
+Dashboard trend and burn queries read these instead of scanning every
+transaction. Summary rows are built from the transaction rows a sync
+upserts, always from every transaction of the day (see
+connector.upsert_transactions), so the upsert simply replaces the row.
+Summaries for history synced before this table existed are built in
+Snowflake by SnowflakeService.backfill_daily_summaries.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from field_mapping import DECIMAL
+
+DAILY_SUMMARY_SCHEMA = {
+    "table": "daily_summary",
+    "primary_key": ["tenant_id", "account_id", "summary_date", "currency"],
+    "columns": {
+        "tenant_id": "STRING",
+        "account_id": "STRING",
+        "summary_date": "NAIVE_DATE",
+        "currency": "STRING",
+        "inflow": DECIMAL,
+        "outflow": DECIMAL,
+        "transaction_count": "INT",
+    },
+}
+
+BALANCE_SNAPSHOTS_SCHEMA = {
+    "table": "balance_snapshots",
+    "primary_key": ["tenant_id", "account_id", "snapshot_at"],
+    "columns": {
+        "tenant_id": "STRING",
+        "account_id": "STRING",
+        "snapshot_at": "UTC_DATETIME",
+        "snapshot_date": "NAIVE_DATE",
+        "balance_amount": DECIMAL,
+        "balance_currency": "STRING",
+    },
+}
+
+ZERO = Decimal(0)
+
+
+class DailySummary:
+    """
+    Running daily totals for one tenant.
+
+    Outflow is stored as a positive amount, so burn is SUM(outflow).
+    Rows without a booked date (not yet booked) are left out.
+    """
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.totals = {}
+
+    def add(self, rows):
+        totals = self.totals
+        for row in rows:
+            booked = row["booked_date"]
+            amount = row["amount"]
+            if not booked or amount is None:
+                continue
+            key = (row["account_id"], booked, row["currency"])
+            total = totals.get(key)
+            if total is None:
+                total = totals[key] = [ZERO, ZERO, 0]
+            amount = Decimal(amount)
+            if amount >= 0:
+                total[0] += amount
+            else:
+                total[1] -= amount
+            total[2] += 1
+
+    def rows(self, since: str = None) -> list:
+        """daily_summary rows, optionally only for dates on or after `since`."""
+        rows = []
+        for (account_id, summary_date, currency), total in self.totals.items():
+            if since is not None and summary_date < since:
+                continue
+            rows.append(
+                {
+                    "tenant_id": self.tenant_id,
+                    "account_id": account_id,
+                    "summary_date": summary_date,
+                    "currency": currency,
+                    "inflow": str(total[0]),
+                    "outflow": str(total[1]),
+                    "transaction_count": total[2],
+                }
+            )
+        return rows
+
+    def load(self, rows: list):
+        """Continue from previously emitted summary rows (see MOCK mode)."""
+        for row in rows:
+            key = (row["account_id"], row["summary_date"], row["currency"])
+            self.totals[key] = [
+                Decimal(row["inflow"]),
+                Decimal(row["outflow"]),
+                row["transaction_count"],
+            ]
+
+
+def balance_snapshots(accounts: list, synced_at: datetime) -> list:
+    """One balance_snapshots row per account row, stamped with the sync time."""
+    return [
+        {
+            "tenant_id": account["tenant_id"],
+            "account_id": account["id"],
+            "snapshot_at": synced_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "snapshot_date": synced_at.strftime("%Y-%m-%d"),
+            "balance_amount": account["balance_amount"],
+            "balance_currency": account["balance_currency"],
+        }
+        for account in accounts
+    ]
@@ -1,5 +1,7 @@
 from app.services.snowflake_service import SnowflakeService
 from app.services.tenant_service import TenantService
+from app.services.inventory_service import InventoryService
+from app.services.query_registry import tenant_schema
 
 # Get your test tenant - use actual Clerk user ID
 tenant_service = TenantService()
@@ -51,36 +53,28 @@ for schema in schemas:
         print(f"  ✓ {schema}")
 
 # Look for this tenant's Fortnox schema
-tenant_short_id = tenant["tenant_id"].replace("-", "_")[:8].upper()
-fortnox_schema = f"FORTNOX_{tenant_short_id}"
+fortnox_schema = tenant_schema("FORTNOX", tenant["tenant_id"])
 
 print(f"\n🔍 Looking for schema: {fortnox_schema}")
 
 if fortnox_schema in schemas:
     print(f"✓ Schema exists!")
 
-    # Check tables
-    cursor.execute(f"SHOW TABLES IN SCHEMA ARCIMS_PROD.{fortnox_schema}")
-    tables = cursor.fetchall()
-
-    if tables:
-        print(f"✓ Found {len(tables)} tables:")
-        for table in tables[:10]:  # Show first 10
-            table_name = table[1]
-            # Get row count
-            cursor.execute(
-                f"SELECT COUNT(*) FROM ARCIMS_PROD.{fortnox_schema}.{table_name}"
+    # Row counts come from table metadata, no COUNT(*) per table
+    inventory = InventoryService().list_tables([fortnox_schema])
+
+    if inventory:
+        print(f"✓ Found {len(inventory)} tables:")
+        for table in inventory[:10]:  # Show first 10
+            print(
+                f"  - {table['table']}: {table['row_count']} rows "
+                f"(last altered {table['last_altered']})"
             )
-            count = cursor.fetchone()[0]
-            print(f"  - {table_name}: {count} rows")
 
         # Sample data from first table with data
-        for table in tables:
-            table_name = table[1]
-            cursor.execute(
-                f"SELECT COUNT(*) FROM ARCIMS_PROD.{fortnox_schema}.{table_name}"
-            )
-            if cursor.fetchone()[0] > 0:
+        for table in inventory:
+            if table["row_count"] > 0:
+                table_name = table["table"]
                 print(f"\n📊 Sample from {table_name}:")
                 cursor.execute(
                     f"SELECT * FROM ARCIMS_PROD.{fortnox_schema}.{table_name} LIMIT 3"